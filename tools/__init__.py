@@ -0,0 +1,87 @@
+"""
+CreateOS tools: the in-process API behind the tools/*.py command-line scripts.
+
+Submodules (tools.tasks, tools.add_memory_entry, ...) are imported on first
+attribute access, so `import tools` is cheap and callers only pay for the
+parts they use:
+
+  import tools
+  tools.load_tasks()                      # tasks (tasks.json or event store)
+  tools.append_memory([{"event": "x", "reasoning": "y"}])
+  tools.latest_progress()                 # progress catalog
+  with tools.open_index() as index:       # compact file index
+      "README.md" in index
+
+Paths default to creation.yaml's `paths` block (see tools.config).
+
+The documented entry points stay `python tools/<tool>.py ...` (CI workflows,
+agent prompts), which puts tools/ rather than the repository root on
+sys.path. Each tool therefore prepends the root itself, but only when it has
+no __package__, i.e. when it runs as a script; imported as tools.<tool> or
+run with `python -m tools.<tool>` it leaves sys.path alone. Tools import
+their heavier dependencies (other tools, the daemon client) inside the
+functions that use them, so a CLI path only loads what it touches.
+"""
+
+import importlib
+
+_SUBMODULES = {
+    "add_memory_entry",
+    "close_session",
+    "config",
+    "createosd",
+    "fleet",
+    "fsutil",
+    "git_refs",
+    "index_query",
+    "index_watch",
+    "memory_index",
+    "memory_segments",
+    "progress_catalog",
+    "refresh_index",
+    "start_session",
+    "task_store",
+    "tasks",
+    "tracing",
+}
+
+# Public name -> (submodule, attribute)
+_API = {
+    # tasks
+    "TaskGraph": ("tasks", "TaskGraph"),
+    "load_tasks": ("tasks", "load_tasks"),
+    "commit_operations": ("tasks", "commit_operations"),
+    # memory
+    "append_memory": ("add_memory_entry", "append_entries"),
+    "iter_memory": ("add_memory_entry", "iter_entries"),
+    "memory_tail": ("add_memory_entry", "query_tail"),
+    "memory_since": ("add_memory_entry", "query_since"),
+    "memory_with_event": ("add_memory_entry", "query_event"),
+    # progress
+    "latest_progress": ("progress_catalog", "latest"),
+    "progress_records": ("progress_catalog", "load"),
+    "progress_in_range": ("progress_catalog", "in_range"),
+    # index
+    "open_index": ("index_query", "open_compact_index"),
+    # sessions
+    "session_boot_report": ("start_session", "cached_boot_report"),
+    "session_close": ("close_session", "close_session"),
+    "fleet_boot_reports": ("fleet", "run_fleet"),
+}
+
+__all__ = sorted(_API)
+
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        return importlib.import_module(f"{__name__}.{name}")
+    if name in _API:
+        module, attribute = _API[name]
+        value = getattr(importlib.import_module(f"{__name__}.{module}"), attribute)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | _SUBMODULES | set(_API))
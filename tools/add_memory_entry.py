@@ -6,21 +6,58 @@ Creation: C01 – CreateOS Bootstrap
 """
 
 import os
+import re
+import sys
+import json
 import datetime
 import argparse
 
-MEMORY_FILE_PATH = "creation/05-memory/memory.md"
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+# Script mode only; see tools/__init__.py
+if not __package__ and REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
 
+from tools import config
 
-def load_existing_memory():
-    if not os.path.exists(MEMORY_FILE_PATH):
-        raise FileNotFoundError(f"Memory file not found at: {MEMORY_FILE_PATH}")
-    with open(MEMORY_FILE_PATH, "r", encoding="utf-8") as f:
-        return f.read()
+MEMORY_FILE_PATH = config.MEMORY_FILE
 
+ENTRY_HEADER_RE = re.compile(r"^### \[([^\]]*)\]")
+ENTRY_FIELDS = ("event", "reasoning", "changes")
+REVERSE_BLOCK_SIZE = 8192
 
-def append_entry(event, reasoning, changes):
-    timestamp = datetime.datetime.utcnow().isoformat() + "Z"
+
+def load_existing_memory(since=None, until=None, memory_path=MEMORY_FILE_PATH):
+    """Return the memory log text, including entries sealed into segments.
+
+    With since/until (ISO-8601), only sealed segments overlapping that range
+    are decompressed; the active memory.md is always included.
+    """
+    from tools import memory_segments
+
+    if not os.path.exists(memory_path):
+        raise FileNotFoundError(f"Memory file not found at: {memory_path}")
+    active = "".join(_active_lines(memory_path))
+    segments = memory_segments.segments_in_range(memory_path, since, until)
+    if not segments:
+        return active
+    cut = _first_entry_offset(active)
+    sealed = "".join(memory_segments.read_segment(memory_path, s).decode("utf-8") for s in segments)
+    return active[:cut] + sealed + active[cut:]
+
+
+def _first_entry_offset(text):
+    """Offset of the first entry header line in text (len(text) if none)."""
+    pos = 0
+    for line in text.splitlines(keepends=True):
+        if ENTRY_HEADER_RE.match(line):
+            return pos
+        pos += len(line)
+    return len(text)
+
+
+def append_entry(event, reasoning, changes, timestamp=None):
+    if timestamp is None:
+        timestamp = datetime.datetime.utcnow().isoformat() + "Z"
 
     changes_block = ""
     for c in changes:
@@ -36,33 +73,323 @@ changes:
     return new_entry
 
 
-def write_memory_entry(entry_text):
-    with open(MEMORY_FILE_PATH, "a", encoding="utf-8") as f:
-        f.write(entry_text)
+def parse_entry(lines):
+    """Parse one entry's lines (header first) into a structured dict.
+
+    Lines that are not `field:` or `  - change` items continue the previous
+    field, so multi-line reasoning survives.
+    """
+    entry = {"timestamp": None, "event": None, "reasoning": None, "changes": []}
+    field = None
+    for raw in lines:
+        line = raw.rstrip("\r\n")
+        match = ENTRY_HEADER_RE.match(line)
+        if match and entry["timestamp"] is None:
+            entry["timestamp"] = match.group(1)
+            continue
+        key, sep, value = line.partition(":")
+        if sep and key in ENTRY_FIELDS and not line.startswith(" "):
+            field = key
+            if key != "changes":
+                entry[key] = value.strip()
+            continue
+        stripped = line.strip()
+        if not stripped:
+            continue
+        if field == "changes":
+            entry["changes"].append(stripped[2:] if stripped.startswith("- ") else stripped)
+        elif field is not None:
+            entry[field] = f"{entry[field]}\n{stripped}" if entry[field] else stripped
+    return entry
+
+
+def _iter_entries_from_lines(lines):
+    current = None
+    for line in lines:
+        if ENTRY_HEADER_RE.match(line):
+            if current is not None:
+                yield parse_entry(current)
+            current = [line]
+        elif current is not None:
+            current.append(line)
+    if current is not None:
+        yield parse_entry(current)
+
+
+def _active_lines(memory_path):
+    """Lines of the active memory.md, minus a range a crashed seal left behind."""
+    from tools import memory_segments
+
+    span = memory_segments.pending_cut(memory_path)
+    if span is None:
+        with open(memory_path, "r", encoding="utf-8") as f:
+            yield from f
+        return
+    with open(memory_path, "rb") as f:
+        data = f.read()
+    start, end = span
+    yield from (data[:start] + data[end:]).decode("utf-8").splitlines(keepends=True)
+
+
+def iter_entries(memory_path=MEMORY_FILE_PATH, since=None, until=None):
+    """Yield parsed entries oldest-first, holding one entry in memory at a time.
+
+    Sealed segments are streamed first (only those overlapping since/until),
+    then the active memory.md.
+    """
+    from tools import memory_segments
+
+    for segment in memory_segments.segments_in_range(memory_path, since, until):
+        with memory_segments.open_segment_text(memory_path, segment) as f:
+            yield from _iter_entries_from_lines(f)
+    yield from _iter_entries_from_lines(_active_lines(memory_path))
+
+
+def _iter_lines_reverse(f, block_size):
+    """Yield decoded lines from the end of a binary file backwards, block by block."""
+    pos = f.seek(0, os.SEEK_END)
+    remainder = b""
+    while pos > 0:
+        step = min(block_size, pos)
+        pos -= step
+        f.seek(pos)
+        chunk = f.read(step) + remainder
+        lines = chunk.split(b"\n")
+        # The first piece may be the tail of a line that starts in an earlier block
+        remainder = lines.pop(0)
+        for line in reversed(lines):
+            yield line.decode("utf-8", "replace")
+    yield remainder.decode("utf-8", "replace")
+
+
+def iter_entries_reverse(memory_path=MEMORY_FILE_PATH, block_size=REVERSE_BLOCK_SIZE):
+    """Yield parsed entries newest-first, reading the file backwards in blocks.
+
+    Stopping after N entries only touches the last few blocks of the file.
+    """
+    from tools import memory_segments
+
+    if memory_segments.pending_cut(memory_path) is not None:
+        # Rare: a crashed seal left sealed entries in memory.md; read it forwards
+        yield from reversed(list(_iter_entries_from_lines(_active_lines(memory_path))))
+    else:
+        with open(memory_path, "rb") as f:
+            pending = []
+            for line in _iter_lines_reverse(f, block_size):
+                pending.append(line)
+                if ENTRY_HEADER_RE.match(line):
+                    pending.reverse()
+                    yield parse_entry(pending)
+                    pending = []
+    # Older entries live in sealed segments; each one is decompressed only if
+    # the caller keeps iterating.
+    for segment in reversed(memory_segments.load_manifest(memory_path)["segments"]):
+        with memory_segments.open_segment_text(memory_path, segment) as f:
+            entries = list(_iter_entries_from_lines(f))
+        yield from reversed(entries)
+
+
+def query_tail(n, memory_path=MEMORY_FILE_PATH):
+    """Last n entries, oldest-first."""
+    entries = []
+    if n > 0:
+        for entry in iter_entries_reverse(memory_path):
+            entries.append(entry)
+            if len(entries) >= n:
+                break
+    entries.reverse()
+    return entries
+
+
+def query_since(since, memory_path=MEMORY_FILE_PATH):
+    from tools import memory_index
+
+    threshold = memory_index.parse_timestamp(since)
+    if threshold is None:
+        raise ValueError(f"Invalid timestamp: {since}")
+    for entry in iter_entries(memory_path, since=since):
+        ts = memory_index.parse_timestamp(entry["timestamp"] or "")
+        if ts is not None and ts >= threshold:
+            yield entry
+
+
+def query_event(event, memory_path=MEMORY_FILE_PATH):
+    for entry in iter_entries(memory_path):
+        if entry["event"] == event:
+            yield entry
+
+
+def write_memory_entries(entry_texts, memory_path=MEMORY_FILE_PATH, fsync=False):
+    """Append several rendered entries with one open, one lock and one write.
+
+    An exclusive advisory lock (fcntl.flock) on memory.md is held for the
+    whole append and sidecar update, so concurrent writers never interleave
+    partial entries. With fsync=True the data is flushed to disk once for the
+    whole batch.
+    """
+    from tools import memory_index, memory_segments, tracing
+    from tools.fsutil import locked
+
+    data = "".join(entry_texts).encode("utf-8")
+    if not data:
+        return
+    with tracing.span("memory.write", entries=len(entry_texts)) as span, open(memory_path, "ab") as f, locked(f):
+        span.add("bytes_written", len(data))
+        # Finish an interrupted seal and bring the sidecar up to date first so
+        # the new records extend a valid index
+        memory_segments.recover(memory_path)
+        memory_index.sync_index(memory_path)
+        offset = f.seek(0, os.SEEK_END)
+        f.write(data)
+        f.flush()
+        if fsync:
+            os.fsync(f.fileno())
+        memory_index.record_append(memory_path, offset, data)
+        memory_segments.maybe_roll(memory_path, f, offset + len(data))
+
+
+def write_memory_entry(entry_text, memory_path=MEMORY_FILE_PATH):
+    write_memory_entries([entry_text], memory_path)
+
+
+def read_batch(stream):
+    """Parse entries from JSON Lines (or a single JSON array) into dicts."""
+    text = stream.read()
+    if text.lstrip().startswith("["):
+        items = json.loads(text)
+    else:
+        items = [json.loads(line) for line in text.splitlines() if line.strip()]
+    for i, item in enumerate(items, 1):
+        if not isinstance(item, dict) or "event" not in item or "reasoning" not in item:
+            raise ValueError(f"Batch item {i} must be an object with 'event' and 'reasoning'.")
+    return items
+
+
+def append_entries(items, memory_path=MEMORY_FILE_PATH, fsync=False):
+    """Render and append many {event, reasoning, changes[, timestamp]} items as one batch."""
+    texts = [
+        append_entry(
+            event=item["event"],
+            reasoning=item["reasoning"],
+            changes=item.get("changes") or [],
+            timestamp=item.get("timestamp"),
+        )
+        for item in items
+    ]
+    write_memory_entries(texts, memory_path, fsync=fsync)
+    return len(texts)
+
+
+def _run_append(items, memory_path=MEMORY_FILE_PATH, fsync=False):
+    from tools import createosd
+
+    try:
+        return createosd.call("memory.append", path=os.path.abspath(memory_path), items=items, fsync=fsync)
+    except createosd.Unavailable:
+        return append_entries(items, memory_path, fsync=fsync)
+
+
+def _run_query(query, memory_path=MEMORY_FILE_PATH, **params):
+    from tools import createosd, tracing
+
+    try:
+        return createosd.call("memory.query", path=os.path.abspath(memory_path), query=query, **params)
+    except createosd.Unavailable:
+        pass
+    with tracing.span("memory.query", query=query):
+        if query == "tail":
+            return query_tail(params["n"], memory_path)
+        if query == "since":
+            return list(query_since(params["timestamp"], memory_path))
+        return list(query_event(params["event"], memory_path))
+
+
+def query_main(argv):
+    from tools import tracing
+
+    parser = argparse.ArgumentParser(
+        prog="add_memory_entry.py query",
+        description="Read structured memory entries as JSON.",
+    )
+    parser.add_argument("--memory-file", default=MEMORY_FILE_PATH, help="Path to memory.md.")
+    subparsers = parser.add_subparsers(dest="query", required=True)
+
+    tail_parser = subparsers.add_parser("tail", help="Last N entries (reads the file backwards).")
+    tail_parser.add_argument("-n", type=int, default=10, help="Number of entries (default: 10).")
+    since_parser = subparsers.add_parser("since", help="Entries at or after an ISO-8601 timestamp.")
+    since_parser.add_argument("timestamp")
+    event_parser = subparsers.add_parser("event", help="Entries whose event matches exactly.")
+    event_parser.add_argument("event")
+    for subparser in (tail_parser, since_parser, event_parser):
+        tracing.add_arguments(subparser)
+
+    args = parser.parse_args(argv)
+    tracing.start_from_args("add_memory_entry.query", args)
+
+    try:
+        if args.query == "tail":
+            entries = _run_query("tail", args.memory_file, n=args.n)
+        elif args.query == "since":
+            entries = _run_query("since", args.memory_file, timestamp=args.timestamp)
+        else:
+            entries = _run_query("event", args.memory_file, event=args.event)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(2)
+    with tracing.span("output"):
+        print(json.dumps(entries, indent=2, ensure_ascii=False))
 
 
 def main():
-    parser = argparse.ArgumentParser(description="Append a structured memory entry.")
-    parser.add_argument("--event", required=True, help="Short description of what happened.")
-    parser.add_argument("--reasoning", required=True, help="Why the action occurred.")
+    if len(sys.argv) > 1 and sys.argv[1] == "query":
+        query_main(sys.argv[2:])
+        return
+    from tools import tracing
+
+    parser = argparse.ArgumentParser(
+        description="Append a structured memory entry (or read entries: add_memory_entry.py query --help)."
+    )
+    parser.add_argument("--event", help="Short description of what happened.")
+    parser.add_argument("--reasoning", help="Why the action occurred.")
     parser.add_argument(
         "--changes",
         nargs="*",
         default=[],
         help="List of changes (e.g., file_created: X).",
     )
+    parser.add_argument(
+        "--batch",
+        nargs="?",
+        const="-",
+        metavar="FILE",
+        help="Append entries from JSON Lines ({event, reasoning, changes[, timestamp]} per line) "
+        "in FILE or stdin ('-') as one locked write.",
+    )
+    parser.add_argument("--fsync", action="store_true", help="fsync memory.md once after writing.")
+    tracing.add_arguments(parser)
 
     args = parser.parse_args()
+    tracing.start_from_args("add_memory_entry", args)
 
-    # Construct entry
-    entry = append_entry(
-        event=args.event,
-        reasoning=args.reasoning,
-        changes=args.changes,
-    )
+    if args.batch:
+        try:
+            if args.batch == "-":
+                items = read_batch(sys.stdin)
+            else:
+                with open(args.batch, "r", encoding="utf-8") as f:
+                    items = read_batch(f)
+        except (OSError, ValueError) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(2)
+        count = _run_append(items, fsync=args.fsync)
+        print(f"{count} memory entries appended successfully.")
+        return
+
+    if not args.event or not args.reasoning:
+        parser.error("--event and --reasoning are required unless --batch is used")
 
-    # Write to file
-    write_memory_entry(entry)
+    # Render and write the entry (through createosd when it is running)
+    _run_append([{"event": args.event, "reasoning": args.reasoning, "changes": args.changes}], fsync=args.fsync)
     print("Memory entry appended successfully.")
 
 
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Tool: bench_memory_append.py
+Purpose: Stress-test concurrent memory appends (N parallel writer processes)
+Creation: C01 – CreateOS Bootstrap
+
+Each writer process appends --entries entries to a scratch memory.md, in
+batches of --batch-size, through write_memory_entries(). Afterwards every
+entry is parsed back and checked to be intact and unique, and the sidecar
+index is compared with a full rescan.
+
+Example:
+  python tools/bench_memory_append.py --writers 8 --entries 500 --batch-size 1
+  python tools/bench_memory_append.py --writers 8 --entries 500 --batch-size 50 --fsync
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import multiprocessing
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Script mode only; see tools/__init__.py
+if not __package__ and REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from tools import memory_index
+from tools.add_memory_entry import append_entries, iter_entries
+
+MEMORY_PREAMBLE = "# Memory Log – benchmark\n\n---\n"
+
+
+def _writer(memory_path, writer_id, entries, batch_size, fsync, start_event):
+    start_event.wait()
+    for first in range(0, entries, batch_size):
+        batch = [
+            {
+                "event": f"bench_w{writer_id}",
+                "reasoning": f"writer {writer_id} entry {seq} " + "x" * 200,
+                "changes": [f"writer: {writer_id}", f"seq: {seq}"],
+            }
+            for seq in range(first, min(first + batch_size, entries))
+        ]
+        append_entries(batch, memory_path, fsync=fsync)
+
+
+def verify(memory_path, writers, entries):
+    seen = set()
+    for entry in iter_entries(memory_path):
+        changes = dict(c.split(": ", 1) for c in entry["changes"])
+        key = (int(changes["writer"]), int(changes["seq"]))
+        expected_reasoning = f"writer {key[0]} entry {key[1]} " + "x" * 200
+        if entry["event"] != f"bench_w{key[0]}" or entry["reasoning"] != expected_reasoning:
+            raise SystemExit(f"Corrupted entry: {entry}")
+        if key in seen:
+            raise SystemExit(f"Duplicate entry: {key}")
+        seen.add(key)
+    if len(seen) != writers * entries:
+        raise SystemExit(f"Expected {writers * entries} entries, found {len(seen)}")
+
+    incremental = [(r["offset"], r["event"]) for r in memory_index.load_records(memory_path)]
+    rescanned = [(r["offset"], r["event"]) for r in memory_index.rebuild_index(memory_path)]
+    if incremental != rescanned:
+        raise SystemExit("Sidecar index diverged from a full rescan")
+
+
+def run(writers, entries, batch_size, fsync):
+    workdir = tempfile.mkdtemp(prefix="createos-memory-bench-")
+    memory_path = os.path.join(workdir, "memory.md")
+    with open(memory_path, "w", encoding="utf-8") as f:
+        f.write(MEMORY_PREAMBLE)
+    try:
+        start_event = multiprocessing.Event()
+        procs = [
+            multiprocessing.Process(
+                target=_writer, args=(memory_path, w, entries, batch_size, fsync, start_event)
+            )
+            for w in range(writers)
+        ]
+        for p in procs:
+            p.start()
+        started = time.perf_counter()
+        start_event.set()
+        for p in procs:
+            p.join()
+        elapsed = time.perf_counter() - started
+        if any(p.exitcode for p in procs):
+            raise SystemExit("A writer process failed")
+
+        verify(memory_path, writers, entries)
+        total = writers * entries
+        return {
+            "writers": writers,
+            "entries_per_writer": entries,
+            "batch_size": batch_size,
+            "fsync": fsync,
+            "seconds": round(elapsed, 4),
+            "entries_per_second": round(total / elapsed, 1) if elapsed else None,
+            "bytes": os.path.getsize(memory_path),
+            "verified": True,
+        }
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stress-test concurrent memory appends.")
+    parser.add_argument("--writers", type=int, default=8, help="Parallel writer processes.")
+    parser.add_argument("--entries", type=int, default=200, help="Entries per writer.")
+    parser.add_argument("--batch-size", type=int, default=1, help="Entries per locked write.")
+    parser.add_argument("--fsync", action="store_true", help="fsync once per batch.")
+    args = parser.parse_args()
+
+    result = run(args.writers, args.entries, max(1, args.batch_size), args.fsync)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
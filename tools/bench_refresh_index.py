@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Tool: bench_refresh_index.py
+Purpose: Compare the os.walk and parallel scandir walkers used by refresh_index.py
+Creation: C01 – CreateOS Bootstrap
+
+Builds synthetic trees in a temporary directory (default 10k, 100k and 1M
+files), times each walker on them and checks both produce the same files list.
+
+Example:
+  python tools/bench_refresh_index.py --sizes 10000,100000 --workers 8,32
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Script mode only; see tools/__init__.py
+if not __package__ and REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from tools.refresh_index import build_index, DEFAULT_WORKERS
+
+
+def make_tree(root, file_count, files_per_dir=100, fanout=10):
+    """Create file_count empty files spread over a balanced directory tree."""
+    dir_count = max(1, -(-file_count // files_per_dir))
+    created = 0
+    for d in range(dir_count):
+        # Spread leaf directories over nested levels: 3/7/2/... -> d3/d7/d2
+        parts = []
+        n = d
+        while True:
+            parts.append(f"d{n % fanout}")
+            n //= fanout
+            if n == 0:
+                break
+        dirpath = os.path.join(root, *reversed(parts), "leaf")
+        os.makedirs(dirpath, exist_ok=True)
+        for i in range(min(files_per_dir, file_count - created)):
+            open(os.path.join(dirpath, f"f{i}.md"), "w").close()
+        created += files_per_dir
+    # A few ignored directories so filtering is exercised too
+    for ignored in (".git", "__pycache__"):
+        os.makedirs(os.path.join(root, ignored), exist_ok=True)
+        open(os.path.join(root, ignored, "skip.txt"), "w").close()
+
+
+def time_walker(fn, repeat):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def run(sizes, workers_list, repeat, keep):
+    results = []
+    for size in sizes:
+        root = tempfile.mkdtemp(prefix=f"createos-bench-{size}-")
+        try:
+            start = time.perf_counter()
+            make_tree(root, size)
+            print(f"[{size}] tree built in {time.perf_counter() - start:.1f}s at {root}", file=sys.stderr)
+
+            base_time, base = time_walker(lambda: build_index(root), repeat)
+            row = {"files": base["file_count"], "os_walk_s": round(base_time, 4), "parallel": []}
+            for workers in workers_list:
+                t, idx = time_walker(lambda: build_index(root, workers), repeat)
+                if idx["files"] != base["files"]:
+                    raise SystemExit(f"Mismatch between walkers at size={size}, workers={workers}")
+                row["parallel"].append({
+                    "workers": workers,
+                    "seconds": round(t, 4),
+                    "speedup": round(base_time / t, 2) if t else None,
+                })
+            results.append(row)
+            print(json.dumps(row), file=sys.stderr)
+        finally:
+            if not keep:
+                shutil.rmtree(root, ignore_errors=True)
+    return results
+
+
+def parse_int_list(s):
+    return [int(x) for x in s.split(",") if x.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark refresh_index tree walkers.")
+    parser.add_argument("--sizes", default="10000,100000,1000000", help="Comma-separated file counts.")
+    parser.add_argument("--workers", default=f"4,{DEFAULT_WORKERS}", help="Comma-separated worker counts.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per walker; the best time is reported.")
+    parser.add_argument("--keep", action="store_true", help="Keep the generated trees.")
+    args = parser.parse_args()
+
+    results = run(parse_int_list(args.sizes), parse_int_list(args.workers), args.repeat, args.keep)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+Tool: bench_tools.py
+Purpose: Time each tool's hot path on synthetic Creations and store the results as JSON
+Creation: C01 – CreateOS Bootstrap
+
+`run` generates a Creation with gen_creation.py (or reuses --root) and runs
+every case in a fresh interpreter started from the Creation's own tools/
+copy, so paths resolve through its creation.yaml exactly as in a real
+Creation. Each run reports the wall time of the hot path alone (imports and
+setup excluded), the process's peak RSS and, from an audit hook, the files
+read and written, directories listed and subprocesses spawned during the
+call. Cases after "memory.append" modify the Creation. Everything runs
+locally; the daemon is disabled for the children.
+
+`compare` reads two result files and flags cases whose median wall time
+grew by more than --threshold.
+
+Examples:
+  python tools/bench_tools.py run --files 100000 --memory-entries 50000 --output bench.json
+  python tools/bench_tools.py run --root /tmp/c-large --cases tasks.analyze,memory.tail
+  python tools/bench_tools.py compare before.json after.json
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import datetime
+import platform
+import statistics
+import subprocess
+import tempfile
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Script mode only; see tools/__init__.py
+if not __package__ and REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+RESULTS_VERSION = 1
+CASE_TIMEOUT = 600
+
+
+# --- cases (run inside the Creation) ---------------------------------------
+# Each case maps to setup() -> callable; only the callable is measured.
+
+
+def _case_index_build():
+    from tools.refresh_index import build_index
+
+    return lambda: build_index(REPO_ROOT)
+
+
+def _case_index_build_parallel():
+    from tools.refresh_index import build_index, DEFAULT_WORKERS
+
+    return lambda: build_index(REPO_ROOT, DEFAULT_WORKERS)
+
+
+def _case_tasks_analyze():
+    from tools.tasks import TaskGraph
+
+    def run():
+        graph = TaskGraph.load()
+        return graph.ranked_ready(graph.analyze())
+
+    return run
+
+
+def _case_memory_tail():
+    from tools.add_memory_entry import query_tail
+
+    return lambda: query_tail(20)
+
+
+def _case_memory_since():
+    from tools.add_memory_entry import query_since, query_tail
+
+    newest = query_tail(1)
+    since = newest[0]["timestamp"][:10] if newest else "1970-01-01"
+    return lambda: list(query_since(since))
+
+
+def _case_memory_scan():
+    from tools.add_memory_entry import iter_entries
+
+    return lambda: sum(1 for _ in iter_entries())
+
+
+def _case_progress_latest():
+    from tools import progress_catalog
+
+    return progress_catalog.latest
+
+
+def _case_progress_rebuild():
+    from tools import progress_catalog
+
+    return progress_catalog.rebuild
+
+
+def _case_session_boot_report():
+    from tools import start_session
+
+    head_sha = start_session.get_head_sha("main")
+    return lambda: start_session.generate_boot_report("ARCH_BENCH", "main", head_sha, dry_run=True)
+
+
+def _case_memory_append():
+    from tools.add_memory_entry import append_entries
+
+    item = {"event": "bench", "reasoning": "Benchmark append.", "changes": ["case: memory.append"]}
+    return lambda: append_entries([item])
+
+
+def _case_tasks_commit():
+    from tools.tasks import TaskGraph, commit_operations
+
+    graph = TaskGraph.load()
+    pending = next((t["id"] for t in graph.tasks if t.get("status") == "pending"), None)
+    ops = [{"op": "update-status", "id": pending, "status": "in_progress"}] if pending else []
+    return lambda: commit_operations(ops)
+
+
+def _case_session_close():
+    from tools.close_session import close_session
+
+    return lambda: close_session("2026-01-01", "Benchmark close.", [], [], "")
+
+
+CASES = {
+    "index.build": _case_index_build,
+    "index.build_parallel": _case_index_build_parallel,
+    "tasks.analyze": _case_tasks_analyze,
+    "memory.tail": _case_memory_tail,
+    "memory.since": _case_memory_since,
+    "memory.scan": _case_memory_scan,
+    "progress.latest": _case_progress_latest,
+    "progress.rebuild": _case_progress_rebuild,
+    "session.boot_report": _case_session_boot_report,
+    # Mutating cases last
+    "memory.append": _case_memory_append,
+    "tasks.commit": _case_tasks_commit,
+    "session.close": _case_session_close,
+}
+
+
+class FileAudit:
+    """Counts file and process activity via sys.addaudithook while active."""
+
+    WRITE_FLAGS = os.O_WRONLY | os.O_RDWR | os.O_CREAT | os.O_APPEND
+
+    def __init__(self):
+        self.active = False
+        self.read = set()
+        self.written = set()
+        self.dirs_listed = 0
+        self.subprocesses = 0
+        sys.addaudithook(self._hook)
+
+    def _hook(self, event, args):
+        if not self.active:
+            return
+        if event == "open":
+            path, mode, flags = args
+            if isinstance(path, (str, bytes)):
+                path = os.fsdecode(path)
+                writing = (flags or 0) & self.WRITE_FLAGS or (mode and any(c in mode for c in "wax+"))
+                (self.written if writing else self.read).add(path)
+        elif event in ("os.rename", "os.replace"):
+            self.written.add(os.fsdecode(args[1]))
+        elif event in ("os.scandir", "os.listdir"):
+            self.dirs_listed += 1
+        elif event in ("subprocess.Popen", "os.posix_spawn", "os.exec"):
+            self.subprocesses += 1
+
+    def summary(self):
+        return {
+            "files_read": len(self.read - self.written),
+            "files_written": len(self.written),
+            "dirs_listed": self.dirs_listed,
+            "subprocesses": self.subprocesses,
+        }
+
+
+def _peak_rss_kb():
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak  # bytes on macOS, KiB elsewhere
+
+
+def run_case(name):
+    """Measure one case in this process; returns the JSON-ready measurements."""
+    fn = CASES[name]()
+    audit = FileAudit()
+    rss_before = _peak_rss_kb()
+    audit.active = True
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    audit.active = False
+    rss_after = _peak_rss_kb()
+    return {"seconds": elapsed, "peak_rss_kb": rss_after, "rss_growth_kb": rss_after - rss_before, **audit.summary()}
+
+
+# --- runner ------------------------------------------------------------------
+
+
+def _spawn_case(root, name):
+    env = dict(os.environ, CREATEOS_NO_DAEMON="1")
+    result = subprocess.run(
+        [sys.executable, os.path.join(root, "tools", "bench_tools.py"), "case", name],
+        cwd=root,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=CASE_TIMEOUT,
+        check=False,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"{name} failed:\n{result.stderr.strip()}")
+    return json.loads(result.stdout)
+
+
+def summarize(runs):
+    times = [r["seconds"] for r in runs]
+    last = runs[-1]
+    return {
+        "runs": len(runs),
+        "min_s": round(min(times), 6),
+        "median_s": round(statistics.median(times), 6),
+        "max_s": round(max(times), 6),
+        "peak_rss_kb": max(r["peak_rss_kb"] for r in runs),
+        "rss_growth_kb": max(r["rss_growth_kb"] for r in runs),
+        "files_read": last["files_read"],
+        "files_written": last["files_written"],
+        "dirs_listed": last["dirs_listed"],
+        "subprocesses": last["subprocesses"],
+    }
+
+
+def run(root, names, repeat):
+    cases = {}
+    for name in names:
+        try:
+            cases[name] = summarize([_spawn_case(root, name) for _ in range(repeat)])
+        except (RuntimeError, subprocess.TimeoutExpired) as e:
+            cases[name] = {"error": str(e)}
+        print(f"[{name}] {json.dumps(cases[name])}", file=sys.stderr)
+    return cases
+
+
+def results_document(params, repeat, cases):
+    from tools import git_refs
+
+    return {
+        "version": RESULTS_VERSION,
+        "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat().replace("+00:00", "Z"),
+        "commit": git_refs.head_sha(REPO_ROOT),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "creation": params,
+        "repeat": repeat,
+        "cases": cases,
+    }
+
+
+def compare(base, new, threshold):
+    """Rows of (case, base median, new median, ratio, regressed) for cases in both files."""
+    rows = []
+    for name, after in new["cases"].items():
+        before = base["cases"].get(name)
+        if not before or "median_s" not in before or "median_s" not in after:
+            continue
+        ratio = after["median_s"] / before["median_s"] if before["median_s"] else None
+        rows.append((name, before["median_s"], after["median_s"], ratio, ratio is not None and ratio > threshold))
+    return rows
+
+
+def parse_list(s):
+    return [x.strip() for x in s.split(",") if x.strip()]
+
+
+def main():
+    from tools import gen_creation
+
+    parser = argparse.ArgumentParser(description="Benchmark CreateOS tools on synthetic Creations.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Generate a Creation and benchmark every case.")
+    run_parser.add_argument("--root", help="Benchmark this existing Creation instead of generating one.")
+    run_parser.add_argument("--cases", help=f"Comma-separated subset of: {', '.join(CASES)}.")
+    run_parser.add_argument("--repeat", type=int, default=3, help="Fresh-process runs per case.")
+    run_parser.add_argument("--output", help="Write results JSON here (default: stdout).")
+    run_parser.add_argument("--keep", action="store_true", help="Keep the generated Creation.")
+    gen_creation.add_size_arguments(run_parser)
+
+    compare_parser = subparsers.add_parser("compare", help="Compare two result files.")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument("--threshold", type=float, default=1.25,
+                                help="Median-time ratio above which a case counts as regressed.")
+
+    case_parser = subparsers.add_parser("case", help="Run one case in this Creation (used by `run`).")
+    case_parser.add_argument("name", choices=list(CASES))
+
+    args = parser.parse_args()
+
+    if args.command == "case":
+        print(json.dumps(run_case(args.name)))
+        return
+
+    if args.command == "compare":
+        with open(args.base, "r", encoding="utf-8") as f:
+            base = json.load(f)
+        with open(args.new, "r", encoding="utf-8") as f:
+            new = json.load(f)
+        rows = compare(base, new, args.threshold)
+        for name, before, after, ratio, regressed in rows:
+            flag = "  REGRESSION" if regressed else ""
+            print(f"{name:22s} {before * 1000:10.2f} ms -> {after * 1000:10.2f} ms  x{ratio or 0:.2f}{flag}")
+        if any(row[4] for row in rows):
+            sys.exit(1)
+        return
+
+    names = parse_list(args.cases) if args.cases else list(CASES)
+    unknown = [n for n in names if n not in CASES]
+    if unknown:
+        parser.error(f"unknown cases: {', '.join(unknown)}")
+
+    workdir = None
+    if args.root:
+        root = os.path.abspath(args.root)
+        params = {"root": root}
+    else:
+        workdir = tempfile.mkdtemp(prefix="createos-bench-")
+        root = os.path.join(workdir, "creation")
+        start = time.perf_counter()
+        params = gen_creation.generate(root, **gen_creation.size_arguments(args))
+        print(f"Creation generated in {time.perf_counter() - start:.1f}s at {root}", file=sys.stderr)
+    try:
+        if not os.path.exists(os.path.join(root, "tools", "bench_tools.py")):
+            parser.error(f"{root} has no tools/ copy (generate it without --no-tools)")
+        document = results_document(params, args.repeat, run(root, names, max(1, args.repeat)))
+    finally:
+        if workdir and not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    text = json.dumps(document, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
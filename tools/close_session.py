@@ -1,58 +1,60 @@
 #!/usr/bin/env python3
 from __future__ import annotations
-import json
 import os
 import argparse
 import datetime
-import subprocess
 import sys
 
 REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-PROGRESS_DIR = os.path.join(REPO_ROOT, "creation", "08-progress")
-TASKS_FILE = os.path.join(REPO_ROOT, "creation", "07-tasks", "tasks.json")
-MEMORY_SCRIPT = os.path.join(REPO_ROOT, "tools", "add_memory_entry.py")
 
 # Ensure we can import local tools when running from arbitrary working directories
-# Insert REPO_ROOT at front of sys.path so "from tools.add_memory_entry import ..." resolves
-if REPO_ROOT not in sys.path:
+# (script mode only; see tools/__init__.py)
+if not __package__ and REPO_ROOT not in sys.path:
     sys.path.insert(0, REPO_ROOT)
 
-# Preferred import helpers (if available)
-try:
-    from tools.add_memory_entry import append_entry as _append_entry_func
-    from tools.add_memory_entry import write_memory_entry as _write_memory_entry_func
-except Exception:
-    _append_entry_func = None
-    _write_memory_entry_func = None
+from tools import config
+
+PROGRESS_DIR = config.PROGRESS_DIR
+TASKS_FILE = config.TASKS_FILE
+MEMORY_FILE = config.MEMORY_FILE
+
 
 def ensure_dir(path):
     os.makedirs(path, exist_ok=True)
 
 
 def load_tasks():
-    if not os.path.exists(TASKS_FILE):
+    from tools import tasks as tasks_tool
+
+    try:
+        return tasks_tool.load_tasks(TASKS_FILE)
+    except FileNotFoundError:
         return []
-    with open(TASKS_FILE, "r", encoding="utf-8") as f:
-        return json.load(f)
 
 
-def save_tasks(tasks):
-    with open(TASKS_FILE, "w", encoding="utf-8") as f:
-        json.dump(tasks, f, indent=2, ensure_ascii=False)
-        f.write("\n")
+def completion_operations(completed_ids, graph=None):
+    """update-status ops for known, not-yet-complete tasks (order preserved).
+
+    graph is the current TaskGraph; it is loaded when not given.
+    """
+    from tools import tasks as tasks_tool
+
+    if graph is None:
+        graph = tasks_tool.TaskGraph(load_tasks())
+    return [
+        {"op": "update-status", "id": cid, "status": "complete"}
+        for cid in dict.fromkeys(completed_ids)
+        if cid in graph.by_id and graph.by_id[cid].get("status") != "complete"
+    ]
 
 
 def update_tasks(completed_ids):
-    tasks = load_tasks()
-    id_map = {t.get("id"): t for t in tasks if isinstance(t, dict) and "id" in t}
-    changed = False
-    for cid in completed_ids:
-        t = id_map.get(cid)
-        if t and t.get("status") != "complete":
-            t["status"] = "complete"
-            changed = True
-    if changed:
-        save_tasks(list(id_map.values()))
+    """Mark known, not-yet-complete tasks complete in one commit (order preserved)."""
+    from tools import tasks as tasks_tool
+
+    ops = completion_operations(completed_ids)
+    if ops:
+        tasks_tool.commit_operations(ops, TASKS_FILE)
 
 
 def _format_changes_for_memory(changes):
@@ -66,79 +68,58 @@ def _format_changes_for_memory(changes):
     return formatted if formatted else ["no changes recorded"]
 
 
-def append_memory_entry(date_iso, summary, changes):
-    entry = {
-        "timestamp": date_iso,
-        "event": "session_close",
-        "reasoning": summary,
-        "changes": changes,
-    }
-
-    # Attempt import-based call first (preferred)
-    try:
-        if _append_entry_func and _write_memory_entry_func:
-            change_items = _format_changes_for_memory(changes)
-            try:
-                entry_text = _append_entry_func(event="session_close", reasoning=summary, changes=change_items)
-            except TypeError:
-                # fallback if signature differs: call with positional args
-                entry_text = _append_entry_func("session_close", summary, change_items)
-            try:
-                _write_memory_entry_func(entry_text)
-            except Exception:
-                # If write helper expects the raw object, call with object
-                _write_memory_entry_func(entry)
-            return True
-    except Exception as e:
-        print("Warning: import-based memory append failed:", e, file=sys.stderr)
+def append_memory_entry(date_iso, summary, changes, fsync=False):
+    """Append the session_close entry in-process (no second interpreter)."""
+    from tools.add_memory_entry import append_entry, write_memory_entries
 
-    # CLI fallback: use add_memory_entry.py with explicit flags
     try:
-        subprocess.run(
-            [
-                sys.executable,
-                MEMORY_SCRIPT,
-                "--event",
-                "session_close",
-                "--reasoning",
-                summary,
-                "--changes",
-                json.dumps(changes),
-            ],
-            check=True,
+        entry_text = append_entry(
+            event="session_close",
+            reasoning=summary,
+            changes=_format_changes_for_memory(changes),
+            timestamp=date_iso,
         )
+        write_memory_entries([entry_text], MEMORY_FILE, fsync=fsync)
         return True
     except Exception as e:
-        print("Warning: CLI memory append failed:", e, file=sys.stderr)
+        print("Warning: memory append failed:", e, file=sys.stderr)
         return False
 
 
+def render_progress_file(date, summary, completed, next_steps, sha):
+    lines = [f"# Progress Log — {date}\n\n", "## Summary of Work Completed\n\n", f"- {summary}\n\n"]
+    if completed:
+        lines.append("## Completed Tasks\n\n")
+        lines.extend(f"- {c}\n" for c in completed)
+        lines.append("\n")
+    if next_steps:
+        lines.append("## Next Steps\n\n")
+        lines.extend(f"- {n}\n" for n in next_steps)
+        lines.append("\n")
+    if sha:
+        lines.append("## Commit\n\n")
+        lines.append(f"- HEAD SHA: {sha}\n")
+    return "".join(lines)
+
+
 def write_progress_file(date, summary, completed, next_steps, sha):
+    from tools import progress_catalog
+    from tools.fsutil import write_text_atomic
+
     ensure_dir(PROGRESS_DIR)
     filename = f"{date}.md"
     filepath = os.path.join(PROGRESS_DIR, filename)
-    with open(filepath, "w", encoding="utf-8") as f:
-        f.write(f"# Progress Log — {date}\n\n")
-        f.write("## Summary of Work Completed\n\n")
-        f.write(f"- {summary}\n\n")
-        if completed:
-            f.write("## Completed Tasks\n\n")
-            for c in completed:
-                f.write(f"- {c}\n")
-            f.write("\n")
-        if next_steps:
-            f.write("## Next Steps\n\n")
-            for n in next_steps:
-                f.write(f"- {n}\n")
-            f.write("\n")
-        if sha:
-            f.write("## Commit\n\n")
-            f.write(f"- HEAD SHA: {sha}\n")
+    write_text_atomic(filepath, render_progress_file(date, summary, completed, next_steps, sha))
+    progress_catalog.record(progress_catalog.make_record(date, filename, summary, completed, sha), PROGRESS_DIR)
     return filepath, filename
 
 
-def write_latest_json(date, filename, sha, summary, next_steps):
-    latest = {
+def _rel(path):
+    return os.path.relpath(path, REPO_ROOT).replace(os.sep, "/")
+
+
+def latest_document(date, filename, sha, summary, next_steps):
+    return {
         "date": date,
         "file": filename,
         "sha": sha or "",
@@ -146,13 +127,88 @@ def write_latest_json(date, filename, sha, summary, next_steps):
         "next_steps": next_steps,
         "generated_at": datetime.datetime.utcnow().isoformat() + "Z",
     }
+
+
+def write_latest_json(date, filename, sha, summary, next_steps):
+    from tools.fsutil import write_json_atomic
+
     latest_path = os.path.join(PROGRESS_DIR, "LATEST.json")
-    with open(latest_path, "w", encoding="utf-8") as f:
-        json.dump(latest, f, indent=2, ensure_ascii=False)
-        f.write("\n")
+    write_json_atomic(latest_path, latest_document(date, filename, sha, summary, next_steps), trailing_newline=True)
     return latest_path
 
 
+def close_session(date, summary, completed, next_steps, sha, fsync=True):
+    """Write every session-close output as one transaction.
+
+    The progress file, catalog, tasks.json (legacy backend) and LATEST.json
+    are staged as temp files and fsynced in one batch before anything is
+    renamed into place. Task events (event-store backend) and the memory
+    entry are then appended in-process, and LATEST.json is published last,
+    so it never points at a progress file that was not fully written. A
+    failure while staging leaves every file untouched.
+    """
+    from tools import progress_catalog, task_store, tracing
+    from tools import tasks as tasks_tool
+    from tools.fsutil import StagedWrites
+
+    filename = f"{date}.md"
+    progress_path = os.path.join(PROGRESS_DIR, filename)
+    catalog_path = progress_catalog.catalog_path(PROGRESS_DIR)
+    latest_path = os.path.join(PROGRESS_DIR, "LATEST.json")
+    ensure_dir(PROGRESS_DIR)
+
+    with tracing.span("tasks.plan"):
+        graph = tasks_tool.TaskGraph(load_tasks())
+        ops = completion_operations(completed, graph)
+        legacy_tasks = None
+        if ops and not task_store.enabled(TASKS_FILE):
+            tasks_tool.apply_operations(graph, ops)
+            legacy_tasks = graph.tasks
+
+    with StagedWrites() as staged:
+        with tracing.span("stage"):
+            staged.add(progress_path, render_progress_file(date, summary, completed, next_steps, sha))
+            record = progress_catalog.make_record(date, filename, summary, completed, sha)
+            staged.add_json(
+                catalog_path,
+                progress_catalog.catalog_document(progress_catalog.with_record(record, PROGRESS_DIR)),
+                trailing_newline=True,
+            )
+            if legacy_tasks is not None:
+                staged.add_json(TASKS_FILE, legacy_tasks, trailing_newline=True)
+            staged.add_json(
+                latest_path,
+                latest_document(date, _rel(progress_path), sha, summary, next_steps),
+                trailing_newline=True,
+            )
+        if fsync:
+            staged.flush()
+
+        with tracing.span("publish"):
+            staged.publish(progress_path)
+            staged.publish(catalog_path)
+            if legacy_tasks is not None:
+                staged.publish(TASKS_FILE)
+        if legacy_tasks is None and ops:
+            tasks_tool.commit_operations(ops, TASKS_FILE, fsync=fsync)
+        with tracing.span("memory.append"):
+            appended = append_memory_entry(
+                datetime.datetime.utcnow().isoformat() + "Z",
+                summary,
+                {"completed": completed, "next_steps": next_steps},
+                fsync=fsync,
+            )
+        with tracing.span("publish.latest"):
+            staged.publish(latest_path, fsync=fsync)
+
+    return {
+        "progress_path": progress_path,
+        "latest_path": latest_path,
+        "tasks_updated": len(ops),
+        "memory_appended": appended,
+    }
+
+
 def parse_csv(s):
     if not s:
         return []
@@ -160,30 +216,40 @@ def parse_csv(s):
 
 
 def main():
+    from tools import createosd, tracing
+
     parser = argparse.ArgumentParser()
     parser.add_argument("--date", required=False, help="YYYY-MM-DD")
     parser.add_argument("--summary", required=True)
     parser.add_argument("--completed", required=False, help="comma-separated task ids")
     parser.add_argument("--next", required=False, help="comma-separated next-step task ids")
     parser.add_argument("--sha", required=False, help="HEAD SHA for reference")
+    parser.add_argument("--no-fsync", action="store_true", help="skip the batched fsync (faster, not crash-safe)")
+    tracing.add_arguments(parser)
     args = parser.parse_args()
+    tracing.start_from_args("close_session", args)
 
     date = args.date or datetime.date.today().isoformat()
     completed = parse_csv(args.completed)
     next_steps = parse_csv(args.next)
 
-    progress_path, filename = write_progress_file(date, args.summary, completed, next_steps, args.sha)
-    latest_path = write_latest_json(date, f"creation/08-progress/{filename}", args.sha or "", args.summary, next_steps)
-
-    if completed:
-        update_tasks(completed)
-
-    appended = append_memory_entry(datetime.datetime.utcnow().isoformat() + "Z", args.summary, {"completed": completed, "next_steps": next_steps})
+    params = {
+        "date": date,
+        "summary": args.summary,
+        "completed": completed,
+        "next_steps": next_steps,
+        "sha": args.sha or "",
+        "fsync": not args.no_fsync,
+    }
+    try:
+        result = createosd.call("session.close", **params)
+    except createosd.Unavailable:
+        result = close_session(**params)
 
     print("Session closed.")
-    print("Progress file:", progress_path)
-    print("LATEST.json updated at", latest_path)
-    print("Memory append successful:", appended)
+    print("Progress file:", result["progress_path"])
+    print("LATEST.json updated at", result["latest_path"])
+    print("Memory append successful:", result["memory_appended"])
 
 
 if __name__ == "__main__":
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Tool: config.py
+Purpose: Creation paths shared by every CreateOS tool, read once from creation.yaml
+Creation: C01 – CreateOS Bootstrap
+
+Paths come from the `paths:` block of creation.yaml (relative to the
+repository root) with the defaults below for keys it does not list. Other
+flat blocks (e.g. `memory:`) are available through section(). Only flat
+`key: value` blocks are read, so no YAML library is needed.
+
+Example:
+  python tools/config.py
+"""
+
+import os
+import sys
+import json
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+CONFIG_FILE = os.path.join(REPO_ROOT, "creation.yaml")
+
+DEFAULT_PATHS = {
+    "goals_dir": "creation/01-goals",
+    "roadmap_dir": "creation/02-roadmap",
+    "v0_dir": "creation/03-v0",
+    "artifacts_dir": "creation/04-artifacts",
+    "memory_file": "creation/05-memory/memory.md",
+    "decisions_dir": "creation/06-decisions",
+    "tasks_file": "creation/07-tasks/tasks.json",
+    "progress_dir": "creation/08-progress",
+    "state_dir": ".createos",
+}
+
+_paths_cache = {}
+_section_cache = {}
+
+
+def _read_block(config_file: str, name: str) -> dict:
+    """Flat `key: value` pairs under the top-level `name:` key."""
+    values = {}
+    try:
+        with open(config_file, "r", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return values
+    inside = False
+    for line in lines:
+        if not line.strip() or line.lstrip().startswith("#"):
+            continue
+        if not line[0].isspace():
+            inside = line.split("#", 1)[0].strip() == f"{name}:"
+            continue
+        if inside:
+            key, sep, value = line.split(" #", 1)[0].strip().partition(":")
+            value = value.strip().strip("'\"")
+            if sep and value:
+                values[key.strip()] = value
+    return values
+
+
+def creation_paths(root: str = REPO_ROOT) -> dict:
+    """Absolute Creation paths for root, parsed once per process."""
+    paths = _paths_cache.get(root)
+    if paths is None:
+        relative = {**DEFAULT_PATHS, **_read_block(os.path.join(root, "creation.yaml"), "paths")}
+        paths = {key: os.path.normpath(os.path.join(root, value)) for key, value in relative.items()}
+        _paths_cache[root] = paths
+    return paths
+
+
+def path(name: str, root: str = REPO_ROOT) -> str:
+    return creation_paths(root)[name]
+
+
+def section(name: str, root: str = REPO_ROOT) -> dict:
+    """Raw string values of a flat top-level block of creation.yaml ({} if absent)."""
+    key = (root, name)
+    values = _section_cache.get(key)
+    if values is None:
+        values = _section_cache[key] = _read_block(os.path.join(root, "creation.yaml"), name)
+    return values
+
+
+def owning_root(file_path: str):
+    """Root of the Creation holding file_path, or None.
+
+    That is the nearest directory above file_path with a creation.yaml.
+    """
+    directory = os.path.dirname(os.path.abspath(file_path))
+    while True:
+        if os.path.isfile(os.path.join(directory, "creation.yaml")):
+            return directory
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return None
+        directory = parent
+
+
+MEMORY_FILE = path("memory_file")
+TASKS_FILE = path("tasks_file")
+PROGRESS_DIR = path("progress_dir")
+STATE_DIR = path("state_dir")
+
+
+def main():
+    json.dump(creation_paths(), sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
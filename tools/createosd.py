@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Tool: createosd.py
+Purpose: Optional resident state daemon serving CreateOS tools over a Unix socket
+Creation: C01 – CreateOS Bootstrap
+
+The daemon keeps the parsed task graph, the active memory segment's entries
+and the compact file index in memory and answers requests on
+.createos/createosd.sock. Every request re-stats the files behind the state
+it touches (size, mtime, inode) and reloads what changed. Writes made by
+direct file access are picked up on the next request, and mutations go
+through the same locked writers the CLIs use.
+
+The daemon only touches the Creation it was started for: task, memory and
+index requests must name the paths configured in creation.yaml (see
+tools.config), and anything else is refused with "forbidden", on which
+call() raises Unavailable so the client does the work itself, with its own
+permissions. The socket is created owner-only (0600).
+
+Protocol: one JSON object per line in each direction.
+  -> {"op": "tasks.query", "args": {"path": "...", "command": "ready"}}
+  <- {"ok": true, "result": [...]}      or  {"ok": false, "error": "...", "forbidden": true?}
+
+tasks.py, add_memory_entry.py, start_session.py, close_session.py and
+index_query.py call call() first and fall back to direct file access when it
+raises Unavailable (no daemon, or CREATEOS_NO_DAEMON=1). Apart from
+tools.config, tools.tracing and tools.fsutil this module imports only the
+standard library until serve() runs, so clients stay cheap.
+
+Examples:
+  python tools/createosd.py start
+  python tools/createosd.py status
+  python tools/createosd.py stop
+  python tools/createosd.py serve          # foreground
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Script mode only; see tools/__init__.py
+if not __package__ and REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from tools import config
+from tools import tracing
+from tools.fsutil import fingerprint, is_racy
+
+SOCKET_PATH = os.path.join(config.STATE_DIR, "createosd.sock")
+LOG_PATH = os.path.join(config.STATE_DIR, "createosd.log")
+DISABLE_ENV = "CREATEOS_NO_DAEMON"
+CONNECT_TIMEOUT = 0.5
+
+
+class Unavailable(Exception):
+    """No daemon is listening; the caller should use direct file access."""
+
+
+class RemoteError(ValueError):
+    """The daemon ran the request and it failed (message is the error text)."""
+
+
+class Forbidden(ValueError):
+    """The request names a file the daemon does not serve."""
+
+
+def call(op, socket_path=SOCKET_PATH, **args):
+    """Send one request to the daemon and return its result.
+
+    Raises Unavailable if the daemon is disabled, not running or the
+    connection fails before a response arrives; RemoteError if the request
+    itself failed.
+    """
+    if os.environ.get(DISABLE_ENV) or not os.path.exists(socket_path):
+        raise Unavailable()
+    import socket
+
+    if not hasattr(socket, "AF_UNIX"):
+        raise Unavailable()
+    with tracing.span("daemon." + op) as span:
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.settimeout(CONNECT_TIMEOUT)
+                sock.connect(socket_path)
+                sock.settimeout(None)
+                sock.sendall(json.dumps({"op": op, "args": args}).encode("utf-8") + b"\n")
+                with sock.makefile("rb") as f:
+                    line = f.readline()
+        except OSError:
+            raise Unavailable() from None
+        if not line:
+            raise Unavailable()
+        span.add("bytes_read", len(line))
+        response = json.loads(line)
+    if response.get("forbidden"):
+        raise Unavailable()
+    if not response.get("ok"):
+        raise RemoteError(response.get("error", "daemon request failed"))
+    return response.get("result")
+
+
+# --- server -----------------------------------------------------------------
+
+
+class StateCache:
+    """Values derived from files, reloaded when any of the files changes."""
+
+    def __init__(self):
+        self._entries = {}
+        self.loads = 0
+        self.hits = 0
+
+    def get(self, key, paths, loader):
+        fp = [fingerprint(path, inode=True) for path in paths]
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == fp and not entry[2]:
+            self.hits += 1
+            return entry[1]
+        if entry is not None and hasattr(entry[1], "close"):
+            entry[1].close()
+        value = loader()
+        self.loads += 1
+        now = time.time_ns()
+        # Files modified just before the load are re-read on the next request
+        racy = any(f is not None and is_racy(f[1], now) for f in fp)
+        self._entries[key] = (fp, value, racy)
+        return value
+
+
+class Handlers:
+    """Request handlers; each takes the request args and returns JSON data."""
+
+    def __init__(self):
+        # Imported here so that clients importing this module stay lightweight
+        from tools import tasks, task_store, memory_segments, index_query, add_memory_entry
+        from tools import start_session, close_session
+
+        self.tasks = tasks
+        self.task_store = task_store
+        self.memory_segments = memory_segments
+        self.index_query = index_query
+        self.memory = add_memory_entry
+        self.start_session = start_session
+        self.close_session = close_session
+        self.cache = StateCache()
+
+    @staticmethod
+    def _served_path(args, key, configured):
+        """configured, if args[key] (default: configured) resolves to the same file; else Forbidden."""
+        requested = args.get(key) or configured
+        if not isinstance(requested, str) or os.path.realpath(requested) != os.path.realpath(configured):
+            raise Forbidden(f"createosd only serves {configured}, not {requested!r}")
+        return configured
+
+    def _graph(self, path):
+        paths = [path, self.task_store.events_path(path), self.task_store.snapshot_path(path)]
+        return self.cache.get(("tasks", path), paths, lambda: self.tasks.TaskGraph.load(path))
+
+    def op_ping(self, args):
+        return {"pid": os.getpid(), "root": REPO_ROOT, "loads": self.cache.loads, "hits": self.cache.hits}
+
+    def op_tasks_query(self, args):
+        path = self._served_path(args, "path", config.TASKS_FILE)
+        return self.tasks.query(self._graph(path), args["command"])
+
+    def op_tasks_commit(self, args):
+        path = self._served_path(args, "path", config.TASKS_FILE)
+        return self.tasks.commit_operations(args["ops"], path, fsync=args.get("fsync", False))
+
+    def _active_entries(self, path):
+        manifest = os.path.join(self.memory_segments.segments_dir(path), self.memory_segments.MANIFEST_NAME)
+
+        def load():
+            return list(self.memory._iter_entries_from_lines(self.memory._active_lines(path)))
+
+        return self.cache.get(("memory", path), [path, manifest], load)
+
+    def op_memory_query(self, args):
+        path = self._served_path(args, "path", config.MEMORY_FILE)
+        kind = args["query"]
+        if kind == "tail":
+            n = args["n"]
+            active = self._active_entries(path)
+            if n <= len(active):
+                return active[-n:] if n > 0 else []
+            return self.memory.query_tail(n, path)
+        if kind == "since":
+            return list(self.memory.query_since(args["timestamp"], path))
+        if kind == "event":
+            return list(self.memory.query_event(args["event"], path))
+        raise ValueError(f"unknown memory query {kind!r}")
+
+    def op_memory_append(self, args):
+        path = self._served_path(args, "path", config.MEMORY_FILE)
+        return self.memory.append_entries(args["items"], path, fsync=args.get("fsync", False))
+
+    def op_index_query(self, args):
+        root = self._served_path(args, "root", REPO_ROOT)
+        path = os.path.join(root, self.index_query.COMPACT_INDEX_REL_PATH)
+        paths = [os.path.join(root, self.index_query.INDEX_REL_PATH), path]
+        index = self.cache.get(("index", path), paths, lambda: self.index_query.open_compact_index(root))
+        kind = args["query"]
+        if kind == "prefix":
+            return list(index.prefix(args["prefix"]))
+        if kind == "glob":
+            return list(index.glob(args["pattern"]))
+        if kind == "has":
+            return args["path"] in index
+        raise ValueError(f"unknown index query {kind!r}")
+
+    def op_session_boot_report(self, args):
+        report, status = self.start_session.cached_boot_report(
+            args["session_id"], args["branch"], args["head_sha"], args["dry_run"], use_cache=args["use_cache"]
+        )
+        return {"report": report, "cache": status}
+
+    def op_session_close(self, args):
+        return self.close_session.close_session(
+            args["date"], args["summary"], args["completed"], args["next_steps"], args["sha"], fsync=args["fsync"]
+        )
+
+    def dispatch(self, request):
+        handler = getattr(self, "op_" + str(request.get("op", "")).replace(".", "_"), None)
+        if handler is None:
+            raise ValueError(f"unknown op {request.get('op')!r}")
+        return handler(request.get("args") or {})
+
+
+def serve(socket_path=SOCKET_PATH):
+    import threading
+    import socketserver
+
+    handlers = Handlers()
+    lock = threading.Lock()
+
+    class RequestHandler(socketserver.StreamRequestHandler):
+        def handle(self):
+            for line in self.rfile:
+                if not line.strip():
+                    continue
+                try:
+                    request = json.loads(line)
+                    if request.get("op") == "shutdown":
+                        response = {"ok": True, "result": None}
+                        threading.Thread(target=server.shutdown, daemon=True).start()
+                    else:
+                        # One request at a time: handlers share caches and file locks
+                        with lock:
+                            response = {"ok": True, "result": handlers.dispatch(request)}
+                except Forbidden as e:
+                    response = {"ok": False, "error": str(e), "forbidden": True}
+                except Exception as e:
+                    response = {"ok": False, "error": str(e)}
+                self.wfile.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+                self.wfile.flush()
+
+    class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+    if os.path.exists(socket_path):
+        try:
+            call("ping", socket_path=socket_path)
+        except Unavailable:
+            os.unlink(socket_path)  # left behind by a daemon that died
+        else:
+            raise SystemExit(f"createosd is already running on {socket_path}")
+    os.makedirs(os.path.dirname(socket_path), exist_ok=True)
+    # Owner-only from the moment it is bound: anyone who can connect can write to the Creation
+    umask = os.umask(0o177)
+    try:
+        server = Server(socket_path, RequestHandler)
+    finally:
+        os.umask(umask)
+    os.chmod(socket_path, 0o600)
+    try:
+        print(f"createosd listening on {socket_path} (pid {os.getpid()})", flush=True)
+        server.serve_forever()
+    finally:
+        server.server_close()
+        try:
+            os.unlink(socket_path)
+        except OSError:
+            pass
+
+
+def start(socket_path=SOCKET_PATH):
+    """Launch `serve` as a detached background process and wait until it answers."""
+    import subprocess
+
+    os.makedirs(os.path.dirname(LOG_PATH), exist_ok=True)
+    with open(LOG_PATH, "ab") as log:
+        proc = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "--socket", socket_path, "serve"],
+            stdin=subprocess.DEVNULL,
+            stdout=log,
+            stderr=log,
+            start_new_session=True,
+        )
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        try:
+            return call("ping", socket_path=socket_path)
+        except Unavailable:
+            if proc.poll() is not None:
+                raise SystemExit(f"createosd exited with status {proc.returncode}; see {LOG_PATH}")
+            time.sleep(0.05)
+    raise SystemExit(f"createosd did not come up; see {LOG_PATH}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resident CreateOS state daemon.")
+    parser.add_argument("--socket", default=SOCKET_PATH, help="Unix socket path.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("serve", help="Run in the foreground.")
+    subparsers.add_parser("start", help="Start in the background.")
+    subparsers.add_parser("stop", help="Ask a running daemon to exit.")
+    subparsers.add_parser("status", help="Show whether a daemon is running.")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        serve(args.socket)
+        return
+    try:
+        if args.command == "start":
+            info = start(args.socket)
+            print(f"createosd running (pid {info['pid']}) on {args.socket}")
+        elif args.command == "stop":
+            call("shutdown", socket_path=args.socket)
+            print("createosd stopped.")
+        else:
+            print(json.dumps(call("ping", socket_path=args.socket), indent=2))
+    except Unavailable:
+        print("createosd is not running.", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
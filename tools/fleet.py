@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Tool: fleet.py
+Purpose: Build boot reports for many Creations concurrently into one aggregated JSON report
+Creation: C01 – CreateOS Bootstrap
+
+A Creation root is a directory with creation.yaml or .createos/manifest.json.
+Each root's report is produced by that root's own tools/start_session.py,
+run in a separate interpreter with the same flags a single-repo run would
+use, so every report is exactly what `python tools/start_session.py` prints
+there. At most --jobs of these processes run at once (default: one per
+core); a process still running after --timeout seconds is killed and
+recorded as a failure. Reports are read-only (dry run) unless --commit is
+given.
+
+Output: {"summary": {...}, "reports": [...], "failures": [...]}, both lists
+in input order. Exits 1 when any root failed.
+
+Examples:
+  python tools/fleet.py ../c01 ../c02 ../c03
+  python tools/fleet.py --discover ~/creations --jobs 8 --timeout 30 --output fleet.json
+  python tools/fleet.py --roots-file roots.txt --no-cache
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import datetime
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+FLEET_VERSION = 1
+DEFAULT_TIMEOUT = 60.0
+STDERR_TAIL = 2000
+MARKERS = ("creation.yaml", os.path.join(".createos", "manifest.json"))
+
+
+def is_creation_root(path):
+    return any(os.path.isfile(os.path.join(path, marker)) for marker in MARKERS)
+
+
+def creation_id(root):
+    """creation_id from creation.yaml (top-level key) or .createos/manifest.json, else None."""
+    try:
+        with open(os.path.join(root, "creation.yaml"), "r", encoding="utf-8") as f:
+            for line in f:
+                key, sep, value = line.partition(":")
+                if sep and key == "creation_id":
+                    return value.split(" #", 1)[0].strip().strip("'\"") or None
+    except OSError:
+        pass
+    try:
+        with open(os.path.join(root, ".createos", "manifest.json"), "r", encoding="utf-8") as f:
+            return json.load(f).get("creation_id")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def discover(directory):
+    """directory itself and its immediate subdirectories that are Creation roots, sorted."""
+    roots = [directory] if is_creation_root(directory) else []
+    with os.scandir(directory) as it:
+        roots.extend(sorted(e.path for e in it if e.is_dir() and is_creation_root(e.path)))
+    return roots
+
+
+def start_session_command(root, branch, commit, no_cache):
+    argv = [sys.executable, os.path.join(root, "tools", "start_session.py"), "--branch", branch]
+    argv.append("--commit" if commit else "--dry-run")
+    if no_cache:
+        argv.append("--no-cache")
+    return argv
+
+
+def _cache_status(stderr):
+    for line in stderr.splitlines():
+        if line.startswith("Boot report cache: "):
+            return line.split(": ", 1)[1].strip()
+    return None
+
+
+def boot_report(root, branch="main", commit=False, no_cache=False, timeout=DEFAULT_TIMEOUT):
+    """Run one root's start_session.py; returns ("report" | "failure", record)."""
+    record = {"root": root, "creation_id": creation_id(root)}
+    started = time.perf_counter()
+
+    def failed(kind, error, stderr=""):
+        record.update(kind=kind, error=error, elapsed_s=round(time.perf_counter() - started, 3))
+        if stderr:
+            record["stderr"] = stderr[-STDERR_TAIL:]
+        return "failure", record
+
+    if not is_creation_root(root):
+        return failed("invalid", "not a Creation root (no creation.yaml or .createos/manifest.json)")
+    if not os.path.isfile(os.path.join(root, "tools", "start_session.py")):
+        return failed("invalid", "no tools/start_session.py in this Creation")
+    try:
+        result = subprocess.run(
+            start_session_command(root, branch, commit, no_cache),
+            cwd=root,
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+            check=False,
+        )
+    except subprocess.TimeoutExpired as e:
+        stderr = e.stderr.decode("utf-8", "replace") if isinstance(e.stderr, bytes) else (e.stderr or "")
+        return failed("timeout", f"no report after {timeout:g}s", stderr)
+    except OSError as e:
+        return failed("exec", str(e))
+    if result.returncode != 0:
+        return failed("exit", f"start_session.py exited with status {result.returncode}", result.stderr)
+    try:
+        report = json.loads(result.stdout)
+    except ValueError as e:
+        return failed("output", f"report is not valid JSON: {e}", result.stderr)
+    record.update(elapsed_s=round(time.perf_counter() - started, 3), cache=_cache_status(result.stderr), report=report)
+    return "report", record
+
+
+def run_fleet(roots, jobs=None, timeout=DEFAULT_TIMEOUT, branch="main", commit=False, no_cache=False):
+    """Boot reports for every root, at most jobs at a time; returns the aggregated document."""
+    roots = list(dict.fromkeys(os.path.abspath(r) for r in roots))
+    jobs = max(1, min(jobs or os.cpu_count() or 1, len(roots) or 1))
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        outcomes = list(pool.map(lambda root: boot_report(root, branch, commit, no_cache, timeout), roots))
+    reports = [record for kind, record in outcomes if kind == "report"]
+    failures = [record for kind, record in outcomes if kind == "failure"]
+    return {
+        "version": FLEET_VERSION,
+        "summary": {
+            "generated_at": datetime.datetime.now(datetime.timezone.utc).isoformat().replace("+00:00", "Z"),
+            "roots": len(roots),
+            "succeeded": len(reports),
+            "failed": len(failures),
+            "jobs": jobs,
+            "timeout_s": timeout,
+            "branch": branch,
+            "dry_run": not commit,
+            "elapsed_s": round(time.perf_counter() - started, 3),
+        },
+        "reports": reports,
+        "failures": failures,
+    }
+
+
+def read_roots_file(path):
+    stream = sys.stdin if path == "-" else open(path, "r", encoding="utf-8")
+    with stream:
+        return [line.strip() for line in stream if line.strip() and not line.lstrip().startswith("#")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build boot reports for many Creations in parallel.")
+    parser.add_argument("roots", nargs="*", help="Creation root directories.")
+    parser.add_argument("--roots-file", metavar="FILE", help="Read roots from FILE, one per line ('-' for stdin).")
+    parser.add_argument("--discover", metavar="DIR", help="Add DIR and its subdirectories that are Creation roots.")
+    parser.add_argument("--jobs", "-j", type=int, default=0, help="Reports built at once (default: CPU count).")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="Seconds allowed per Creation.")
+    parser.add_argument("--branch", default="main", help="Branch passed to each start_session.py (default: main).")
+    parser.add_argument("--commit", action="store_true", help="Run start_session.py --commit in every Creation.")
+    parser.add_argument("--no-cache", action="store_true", help="Pass --no-cache to every start_session.py.")
+    parser.add_argument("--output", help="Write the aggregated JSON here (default: stdout).")
+    args = parser.parse_args()
+
+    roots = list(args.roots)
+    try:
+        if args.roots_file:
+            roots.extend(read_roots_file(args.roots_file))
+        if args.discover:
+            roots.extend(discover(args.discover))
+    except OSError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(2)
+    if not roots:
+        parser.error("no Creation roots given (pass roots, --roots-file or --discover)")
+
+    document = run_fleet(roots, args.jobs, args.timeout, args.branch, args.commit, args.no_cache)
+    text = json.dumps(document, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    summary = document["summary"]
+    print(
+        f"{summary['succeeded']}/{summary['roots']} boot reports in {summary['elapsed_s']}s "
+        f"({summary['jobs']} jobs)",
+        file=sys.stderr,
+    )
+    for failure in document["failures"]:
+        print(f"  FAILED {failure['root']}: {failure['error']}", file=sys.stderr)
+    if document["failures"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Tool: fsutil.py
+Purpose: Shared filesystem helpers (atomic and staged writes, locking) for CreateOS tools
+Creation: C01 – CreateOS Bootstrap
+"""
+
+import os
+import json
+import contextlib
+
+from tools import tracing
+
+try:
+    import fcntl
+except ImportError:  # Windows: advisory locks are a no-op
+    fcntl = None
+
+# Files modified this close to a read are not trusted by stat-keyed caches: a
+# second change landing in the same mtime tick would leave the stat unchanged.
+RACY_WINDOW_NS = 2_000_000_000
+
+
+def fingerprint(path, inode=False):
+    """[size, mtime_ns] (plus the inode number with inode=True) of path, or None if it cannot be stat'ed."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns, st.st_ino] if inode else [st.st_size, st.st_mtime_ns]
+
+
+def is_racy(mtime_ns, now_ns):
+    """True if a file with this mtime may still change without its stat changing (see RACY_WINDOW_NS)."""
+    return mtime_ns >= now_ns - RACY_WINDOW_NS
+
+
+def _default_mode(path):
+    """Permission bits the written file should end up with."""
+    try:
+        return os.stat(path).st_mode & 0o777
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
+def _write_temp(path, data, fsync=False):
+    """Write data to a new temp file next to path and return the temp path."""
+    import tempfile
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            tracing.add("bytes_written", len(data))
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.chmod(tmp_path, _default_mode(path))
+    except BaseException:
+        _unlink_quietly(tmp_path)
+        raise
+    return tmp_path
+
+
+def _unlink_quietly(path):
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+def _fsync_path(path):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def write_bytes_atomic(path, data, fsync=False):
+    """Write bytes to path via a temp file in the same directory + os.replace.
+
+    Readers either see the previous contents or the new contents, never a
+    partially written file.
+    """
+    tmp_path = _write_temp(path, data, fsync=fsync)
+    try:
+        os.replace(tmp_path, path)
+    except BaseException:
+        _unlink_quietly(tmp_path)
+        raise
+
+
+def write_text_atomic(path, text, fsync=False):
+    """Atomically write UTF-8 text (newlines are written as-is)."""
+    write_bytes_atomic(path, text.encode("utf-8"), fsync=fsync)
+
+
+def write_json_atomic(path, data, indent=2, ensure_ascii=False, trailing_newline=False, fsync=False):
+    """Serialize data as JSON and write it atomically."""
+    text = json.dumps(data, indent=indent, ensure_ascii=ensure_ascii)
+    if trailing_newline:
+        text += "\n"
+    write_text_atomic(path, text, fsync=fsync)
+
+
+class StagedWrites:
+    """Several atomic file writes that become visible together, in order.
+
+    add() writes each file's new contents to a temp file beside it; flush()
+    then fsyncs all temp files in one pass, and publish() renames them into
+    place in the order they were added (optionally one at a time, so the
+    caller can interleave other work before the last rename). Leaving the
+    with-block removes any temp file that was not published.
+    """
+
+    def __init__(self):
+        self._staged = []
+        self._directories = set()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.discard()
+        return False
+
+    def add(self, path, data):
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        self._staged.append((path, _write_temp(path, data)))
+
+    def add_json(self, path, data, indent=2, ensure_ascii=False, trailing_newline=False):
+        text = json.dumps(data, indent=indent, ensure_ascii=ensure_ascii)
+        self.add(path, text + "\n" if trailing_newline else text)
+
+    def flush(self):
+        with tracing.span("fsync", files=len(self._staged)):
+            for _, tmp_path in self._staged:
+                _fsync_path(tmp_path)
+
+    def publish(self, path=None, fsync=False):
+        """Rename the staged file for path (default: every staged file) into place.
+
+        With fsync=True the affected directories are synced afterwards, making
+        the renames themselves durable.
+        """
+        remaining = []
+        for target, tmp_path in self._staged:
+            if path is None or target == path:
+                os.replace(tmp_path, target)
+                self._directories.add(os.path.dirname(os.path.abspath(target)))
+            else:
+                remaining.append((target, tmp_path))
+        self._staged = remaining
+        if fsync:
+            for directory in self._directories:
+                try:
+                    _fsync_path(directory)
+                except OSError:  # not supported everywhere (e.g. Windows)
+                    pass
+            self._directories.clear()
+
+    def discard(self):
+        for _, tmp_path in self._staged:
+            _unlink_quietly(tmp_path)
+        self._staged = []
+
+
+def read_last_jsonl_record(path, chunk_size=4096):
+    """Return the last JSON record of a JSON Lines file, reading it from the end."""
+    try:
+        with open(path, "rb") as f:
+            pos = f.seek(0, os.SEEK_END)
+            buf = b""
+            while pos > 0:
+                step = min(chunk_size, pos)
+                pos -= step
+                f.seek(pos)
+                buf = f.read(step) + buf
+                lines = buf.rstrip(b"\n").split(b"\n")
+                if len(lines) > 1 or pos == 0:
+                    last = lines[-1]
+                    return json.loads(last) if last.strip() else None
+    except (OSError, ValueError):
+        return None
+    return None
+
+
+@contextlib.contextmanager
+def locked(f, shared=False):
+    """Hold an advisory lock (flock) on an open file for the block.
+
+    Exclusive by default; shared=True allows concurrent readers. Locks belong
+    to the open file description, so code already holding the lock must not
+    re-open and re-lock the same path.
+    """
+    if fcntl is None:
+        yield f
+        return
+    fcntl.flock(f.fileno(), fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+    try:
+        yield f
+    finally:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Tool: gen_creation.py
+Purpose: Fabricate a synthetic Creation of configurable size for benchmarks
+Creation: C01 – CreateOS Bootstrap
+
+Writes creation.yaml, .createos/manifest.json, an artifact tree of --files
+files nested --depth directories deep, a memory.md with --memory-entries
+entries, a tasks.json of --tasks tasks with up to --fanout dependencies each
+(always on earlier tasks, so the graph is acyclic) and one progress log per
+weekday over --years years, plus catalog.json and LATEST.json. Output is
+deterministic for a given --seed. A copy of this repository's tools/ is
+included so the Creation is self-contained, as real Creations are, and the
+result is committed to a fresh local git repository on branch main (no
+network access is needed).
+
+Examples:
+  python tools/gen_creation.py /tmp/c-small
+  python tools/gen_creation.py /tmp/c-large --files 100000 --depth 4 \\
+      --memory-entries 50000 --tasks 5000 --fanout 4 --years 5
+"""
+
+import os
+import sys
+import json
+import random
+import shutil
+import argparse
+import datetime
+import subprocess
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Script mode only; see tools/__init__.py
+if not __package__ and REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from tools import config
+
+DEFAULTS = {
+    "files": 1000,
+    "depth": 3,
+    "files_per_dir": 50,
+    "memory_entries": 1000,
+    "tasks": 200,
+    "fanout": 3,
+    "years": 1,
+    "seed": 0,
+}
+END_DATE = datetime.date(2025, 12, 31)
+EVENTS = ("session_boot", "session_close", "decision", "artifact_update", "task_update")
+WORDS = (
+    "memory task graph index progress session boot close artifact roadmap "
+    "decision runtime agent spec demo review plan refresh commit snapshot"
+).split()
+# Local state the tools regenerate; mirrors this repository's .gitignore
+GITIGNORE = (
+    "__pycache__/\n/.createos/index-cache.json\n/creation/05-memory/memory.md.idx\n"
+    "/.createos/boot-cache.json\n/.createos/createosd.sock\n/.createos/createosd.log\n/.createos/traces/\n"
+)
+MEMORY_PREAMBLE = (
+    "# Memory Log – {name}\n\n"
+    "This file stores structured memory entries for the {name} Creation.\n"
+    "Each entry records a meaningful state change in the system.\n\n---\n"
+)
+
+
+def _sentence(rng, n):
+    return " ".join(rng.choice(WORDS) for _ in range(n)).capitalize() + "."
+
+
+def _dir_parts(index, depth, width):
+    parts = []
+    for _ in range(depth):
+        parts.append(f"d{index % width:02d}")
+        index //= width
+    return parts[::-1]
+
+
+def write_artifacts(artifacts_dir, count, depth, files_per_dir, rng):
+    """count markdown files spread over a balanced tree depth levels deep."""
+    dir_count = max(1, -(-count // files_per_dir))
+    width = max(2, round(dir_count ** (1 / depth)) + 1) if depth else 1
+    for i in range(count):
+        dirpath = os.path.join(artifacts_dir, *_dir_parts(i // files_per_dir, depth, width))
+        if i % files_per_dir == 0:
+            os.makedirs(dirpath, exist_ok=True)
+        with open(os.path.join(dirpath, f"a{i:06d}.md"), "w", encoding="utf-8") as f:
+            f.write(f"# Artifact {i}\n\n{_sentence(rng, 12)}\n")
+
+
+def make_tasks(count, fanout, rng):
+    """Acyclic tasks; earlier ones are more likely to be complete."""
+    tasks = []
+    for i in range(count):
+        done = i < count * 0.4 and rng.random() < 0.9
+        status = "complete" if done else rng.choice(("pending", "pending", "pending", "in_progress"))
+        deps = sorted(rng.sample(range(i), min(i, rng.randint(0, fanout))))
+        tasks.append({
+            "id": f"T{i + 1:05d}",
+            "description": _sentence(rng, 8),
+            "status": status,
+            "dependencies": [f"T{d + 1:05d}" for d in deps],
+        })
+    return tasks
+
+
+def write_memory(memory_path, name, count, start, end, rng):
+    from tools.add_memory_entry import append_entry
+
+    span = (end - start).total_seconds()
+    with open(memory_path, "w", encoding="utf-8") as f:
+        f.write(MEMORY_PREAMBLE.format(name=name))
+        for i in range(count):
+            moment = start + datetime.timedelta(seconds=span * i / max(1, count))
+            f.write(append_entry(
+                event=rng.choice(EVENTS),
+                reasoning=_sentence(rng, 15),
+                changes=[f"{rng.choice(WORDS)}: {_sentence(rng, 4)}" for _ in range(rng.randint(1, 4))],
+                timestamp=moment.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            ))
+
+
+def write_progress(progress_dir, tasks, years, rng):
+    """One log per weekday over the last `years` years; returns the newest log's fields."""
+    from tools.close_session import render_progress_file
+
+    day = END_DATE - datetime.timedelta(days=round(365.25 * years) - 1)
+    ids = [t["id"] for t in tasks]
+    newest = None
+    while day <= END_DATE:
+        if day.weekday() < 5:
+            date = day.isoformat()
+            summary = _sentence(rng, 10)
+            completed = rng.sample(ids, min(len(ids), rng.randint(0, 3)))
+            next_steps = rng.sample(ids, min(len(ids), rng.randint(0, 2)))
+            sha = f"{rng.getrandbits(160):040x}"
+            with open(os.path.join(progress_dir, f"{date}.md"), "w", encoding="utf-8") as f:
+                f.write(render_progress_file(date, summary, completed, next_steps, sha))
+            newest = (date, f"{date}.md", summary, next_steps, sha)
+        day += datetime.timedelta(days=1)
+    return newest
+
+
+def write_descriptor(root, creation_id, name):
+    paths = "\n".join(f"  {key}: {value}" for key, value in config.DEFAULT_PATHS.items())
+    with open(os.path.join(root, "creation.yaml"), "w", encoding="utf-8") as f:
+        f.write(
+            f"creation_name: {name}\ncreation_id: {creation_id}\nversion: 0.1.0\n\n"
+            f"description: >\n  Synthetic Creation generated by tools/gen_creation.py.\n\n"
+            f"paths:\n{paths}\n"
+        )
+
+
+def init_git(root):
+    """Commit root to a new repository on main with a fixed identity and date."""
+    stamp = f"{END_DATE.isoformat()}T18:00:00Z"
+    env = dict(
+        os.environ,
+        GIT_AUTHOR_NAME="createos-bench", GIT_AUTHOR_EMAIL="bench@createos.invalid", GIT_AUTHOR_DATE=stamp,
+        GIT_COMMITTER_NAME="createos-bench", GIT_COMMITTER_EMAIL="bench@createos.invalid", GIT_COMMITTER_DATE=stamp,
+    )
+    with open(os.path.join(root, ".gitignore"), "w", encoding="utf-8") as f:
+        f.write(GITIGNORE)
+    for args in (["init", "-q", "-b", "main"], ["add", "-A"], ["commit", "-q", "--no-gpg-sign", "-m", "Synthetic Creation"]):
+        subprocess.run(["git", *args], cwd=root, env=env, check=True)
+
+
+def generate(root, files=DEFAULTS["files"], depth=DEFAULTS["depth"], files_per_dir=DEFAULTS["files_per_dir"],
+             memory_entries=DEFAULTS["memory_entries"], tasks=DEFAULTS["tasks"], fanout=DEFAULTS["fanout"],
+             years=DEFAULTS["years"], seed=DEFAULTS["seed"], creation_id="S01", with_tools=True, with_git=True):
+    """Write a synthetic Creation at root (which must not exist) and return its parameters."""
+    from tools import progress_catalog
+    from tools.close_session import latest_document
+
+    rng = random.Random(seed)
+    name = f"Synthetic Creation {creation_id}"
+    os.makedirs(root)
+    write_descriptor(root, creation_id, name)
+    paths = config.creation_paths(root)
+    for key, path in paths.items():
+        os.makedirs(path if key.endswith("_dir") else os.path.dirname(path), exist_ok=True)
+    with open(os.path.join(paths["state_dir"], "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump({"creation_id": creation_id, "default_branch": "main", "synthetic": True}, f, indent=2)
+        f.write("\n")
+
+    write_artifacts(paths["artifacts_dir"], files, depth, files_per_dir, rng)
+
+    task_list = make_tasks(tasks, fanout, rng)
+    with open(paths["tasks_file"], "w", encoding="utf-8") as f:
+        json.dump(task_list, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+
+    end = datetime.datetime.combine(END_DATE, datetime.time(18))
+    start = end - datetime.timedelta(days=365.25 * years)
+    write_memory(paths["memory_file"], name, memory_entries, start, end, rng)
+
+    newest = write_progress(paths["progress_dir"], task_list, years, rng)
+    progress_catalog.rebuild(paths["progress_dir"])
+    if newest:
+        date, filename, summary, next_steps, sha = newest
+        rel = os.path.relpath(os.path.join(paths["progress_dir"], filename), root).replace(os.sep, "/")
+        with open(os.path.join(paths["progress_dir"], "LATEST.json"), "w", encoding="utf-8") as f:
+            json.dump(latest_document(date, rel, sha, summary, next_steps), f, indent=2, ensure_ascii=False)
+            f.write("\n")
+
+    if with_tools:
+        shutil.copytree(
+            os.path.join(REPO_ROOT, "tools"),
+            os.path.join(root, "tools"),
+            ignore=shutil.ignore_patterns("__pycache__"),
+        )
+
+    if with_git:
+        init_git(root)
+
+    return {
+        "files": files,
+        "depth": depth,
+        "files_per_dir": files_per_dir,
+        "memory_entries": memory_entries,
+        "tasks": tasks,
+        "fanout": fanout,
+        "years": years,
+        "seed": seed,
+    }
+
+
+def add_size_arguments(parser):
+    """Generator options, shared with bench_tools.py."""
+    parser.add_argument("--files", type=int, default=DEFAULTS["files"], help="Artifact files.")
+    parser.add_argument("--depth", type=int, default=DEFAULTS["depth"], help="Directory levels under 04-artifacts.")
+    parser.add_argument("--files-per-dir", type=int, default=DEFAULTS["files_per_dir"], help="Files per leaf directory.")
+    parser.add_argument("--memory-entries", type=int, default=DEFAULTS["memory_entries"], help="Entries in memory.md.")
+    parser.add_argument("--tasks", type=int, default=DEFAULTS["tasks"], help="Tasks in tasks.json.")
+    parser.add_argument("--fanout", type=int, default=DEFAULTS["fanout"], help="Maximum dependencies per task.")
+    parser.add_argument("--years", type=float, default=DEFAULTS["years"], help="Years of daily progress logs.")
+    parser.add_argument("--seed", type=int, default=DEFAULTS["seed"], help="Random seed.")
+
+
+def size_arguments(args):
+    return {key: getattr(args, key) for key in DEFAULTS}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic Creation for benchmarks.")
+    parser.add_argument("root", help="Directory to create (must not exist).")
+    parser.add_argument("--creation-id", default="S01", help="creation_id written to creation.yaml.")
+    parser.add_argument("--no-tools", action="store_true", help="Do not copy tools/ into the Creation.")
+    parser.add_argument("--no-git", action="store_true", help="Do not commit the Creation to a git repository.")
+    add_size_arguments(parser)
+    args = parser.parse_args()
+
+    if os.path.exists(args.root):
+        print(f"Error: {args.root} already exists", file=sys.stderr)
+        sys.exit(1)
+    params = generate(args.root, creation_id=args.creation_id, with_tools=not args.no_tools,
+                      with_git=not args.no_git, **size_arguments(args))
+    print(json.dumps({"root": os.path.abspath(args.root), **params}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Tool: git_refs.py
+Purpose: Resolve git refs to commit SHAs without spawning git
+Creation: C01 – CreateOS Bootstrap
+
+Reads HEAD, loose refs and packed-refs straight from the repository,
+following `.git` files (worktrees, submodules) and `commondir`. File contents
+are cached per process keyed by (mtime_ns, size), so repeated lookups cost a
+stat each. Anything this module does not understand (rev expressions such as
+HEAD~2, abbreviated SHAs, reftable repositories) falls back to
+`git rev-parse`.
+
+Examples:
+  python tools/git_refs.py HEAD
+  python tools/git_refs.py main
+"""
+
+import os
+import re
+import sys
+import argparse
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+SHA_RE = re.compile(r"^(?:[0-9a-f]{40}|[0-9a-f]{64})$")
+SYMREF_PREFIX = "ref: "
+MAX_SYMREF_DEPTH = 5
+# Refs that live in the per-worktree git dir rather than the common dir
+PER_WORKTREE_PREFIXES = ("refs/bisect/", "refs/worktree/", "refs/rewritten/")
+# Lookup order of `git rev-parse <name>` (gitrevisions(7))
+NAME_RULES = ("{}", "refs/{}", "refs/tags/{}", "refs/heads/{}", "refs/remotes/{}", "refs/remotes/{}/HEAD")
+EXOTIC_CHARS = set("~^:@{}*?[\\ ")
+
+_file_cache = {}
+_packed_cache = {}
+
+
+def _read_cached(path):
+    """Return the stripped text of path, or None; cached by (mtime_ns, size)."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    key = (st.st_mtime_ns, st.st_size)
+    cached = _file_cache.get(path)
+    if cached and cached[0] == key:
+        return cached[1]
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read().strip()
+    except (OSError, UnicodeDecodeError):
+        text = None
+    _file_cache[path] = (key, text)
+    return text
+
+
+def _packed_refs(common_dir):
+    path = os.path.join(common_dir, "packed-refs")
+    try:
+        st = os.stat(path)
+    except OSError:
+        return {}
+    key = (st.st_mtime_ns, st.st_size)
+    cached = _packed_cache.get(path)
+    if cached and cached[0] == key:
+        return cached[1]
+    refs = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            # Skip the header and peeled-tag lines ("^<sha>")
+            if line.startswith(("#", "^")):
+                continue
+            sha, _, name = line.rstrip("\n").partition(" ")
+            if name:
+                refs[name] = sha
+    _packed_cache[path] = (key, refs)
+    return refs
+
+
+def find_git_dir(root=REPO_ROOT):
+    """(git_dir, common_dir) for the work tree at root, or (None, None)."""
+    dot_git = os.path.join(root, ".git")
+    if os.path.isdir(dot_git):
+        git_dir = dot_git
+    else:
+        text = _read_cached(dot_git)
+        if not text or not text.startswith("gitdir:"):
+            return None, None
+        git_dir = os.path.normpath(os.path.join(root, text[len("gitdir:"):].strip()))
+    common = _read_cached(os.path.join(git_dir, "commondir"))
+    common_dir = os.path.normpath(os.path.join(git_dir, common)) if common else git_dir
+    return git_dir, common_dir
+
+
+def _ref_file(git_dir, common_dir, name):
+    if "/" not in name or name.startswith(PER_WORKTREE_PREFIXES):
+        return os.path.join(git_dir, name)
+    return os.path.join(common_dir, name)
+
+
+def read_ref(name, git_dir, common_dir, depth=0):
+    """Resolve a full ref name (HEAD, refs/heads/main, ...) to a SHA, or None."""
+    if depth > MAX_SYMREF_DEPTH:
+        return None
+    text = _read_cached(_ref_file(git_dir, common_dir, name))
+    if text is None and name.startswith("refs/"):
+        text = _packed_refs(common_dir).get(name)
+    if text is None:
+        return None
+    if text.startswith(SYMREF_PREFIX):
+        return read_ref(text[len(SYMREF_PREFIX):].strip(), git_dir, common_dir, depth + 1)
+    return text if SHA_RE.match(text) else None
+
+
+def _rev_parse(rev, root):
+    import subprocess
+
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--verify", "-q", f"{rev}^{{commit}}"],
+            cwd=root,
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+    except OSError:
+        return None
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+def resolve(rev="HEAD", root=REPO_ROOT):
+    """Resolve rev to a SHA the way `git rev-parse` would, or None.
+
+    Plain names and SHAs are handled in-process; rev expressions, short
+    SHAs and reftable repositories go through the git CLI.
+    """
+    git_dir, common_dir = find_git_dir(root)
+    if git_dir is None:
+        return _rev_parse(rev, root)
+    if SHA_RE.match(rev):
+        return rev
+    if EXOTIC_CHARS.intersection(rev) or os.path.isdir(os.path.join(common_dir, "reftable")):
+        return _rev_parse(rev, root)
+    for rule in NAME_RULES:
+        sha = read_ref(rule.format(rev), git_dir, common_dir)
+        if sha:
+            return sha
+    # Could still be an abbreviated SHA or something only git understands
+    if re.fullmatch(r"[0-9a-f]{4,63}", rev):
+        return _rev_parse(rev, root)
+    return None
+
+
+def head_sha(root=REPO_ROOT):
+    return resolve("HEAD", root)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resolve a git ref to a commit SHA without spawning git.")
+    parser.add_argument("rev", nargs="?", default="HEAD", help="Ref or branch name (default: HEAD).")
+    parser.add_argument("--root", default=REPO_ROOT, help="Work tree root.")
+    args = parser.parse_args()
+
+    sha = resolve(args.rev, args.root)
+    if not sha:
+        print(f"Error: cannot resolve {args.rev!r}", file=sys.stderr)
+        sys.exit(1)
+    print(sha)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Tool: index_query.py
+Purpose: Compact, memory-mapped companion to .createos/index.json with prefix/glob/exact lookups
+Creation: C01 – CreateOS Bootstrap
+
+File layout (.createos/index.bin, little-endian):
+
+  header   magic b"CIDX", u16 version, u16 block_size, u32 count, u32 block_count
+  offsets  block_count x u64 -- byte offset of each block, relative to the data section
+  data     blocks of up to block_size paths, sorted by UTF-8 bytes; each path is
+           varint(shared_prefix_len) varint(suffix_len) suffix, and the first path
+           of every block is stored whole (shared_prefix_len = 0)
+
+Lookups binary-search the first path of each block, then decode one block
+forward, so only the touched pages of the file are read.
+
+index.bin is a local, gitignored build artifact: refresh_index.py writes it
+next to index.json, and open_compact_index() rebuilds it from index.json when
+it is missing or older than index.json (e.g. after a fresh clone or a pull).
+
+Examples:
+  python tools/index_query.py prefix creation/04-artifacts/
+  python tools/index_query.py glob "creation/*/memory.md"
+  python tools/index_query.py has README.md
+"""
+
+import os
+import sys
+import json
+import mmap
+import struct
+import fnmatch
+import argparse
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Script mode only; see tools/__init__.py
+if not __package__ and REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from tools import createosd
+from tools.fsutil import write_bytes_atomic
+
+INDEX_REL_PATH = ".createos/index.json"
+COMPACT_INDEX_REL_PATH = ".createos/index.bin"
+MAGIC = b"CIDX"
+VERSION = 1
+DEFAULT_BLOCK_SIZE = 32
+HEADER = struct.Struct("<4sHHII")
+OFFSET = struct.Struct("<Q")
+GLOB_CHARS = "*?["
+
+
+def _encode_varint(n: int) -> bytes:
+    out = bytearray()
+    while True:
+        byte = n & 0x7F
+        n >>= 7
+        if n:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def _decode_varint(buf, pos: int):
+    result = 0
+    shift = 0
+    while True:
+        byte = buf[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, pos
+        shift += 7
+
+
+def _to_bytes(path: str) -> bytes:
+    return path.encode("utf-8", "surrogateescape")
+
+
+def _to_str(raw: bytes) -> str:
+    return raw.decode("utf-8", "surrogateescape")
+
+
+def encode_compact_index(files, block_size: int = DEFAULT_BLOCK_SIZE) -> bytes:
+    """Serialize paths into the front-coded block format."""
+    keys = sorted({_to_bytes(p) for p in files})
+    data = bytearray()
+    offsets = []
+    previous = b""
+    for i, key in enumerate(keys):
+        if i % block_size == 0:
+            offsets.append(len(data))
+            shared = 0
+        else:
+            shared = 0
+            limit = min(len(previous), len(key))
+            while shared < limit and previous[shared] == key[shared]:
+                shared += 1
+        suffix = key[shared:]
+        data += _encode_varint(shared)
+        data += _encode_varint(len(suffix))
+        data += suffix
+        previous = key
+
+    header = HEADER.pack(MAGIC, VERSION, block_size, len(keys), len(offsets))
+    return header + b"".join(OFFSET.pack(o) for o in offsets) + bytes(data)
+
+
+def write_compact_index(root: str, files) -> str:
+    out_path = os.path.join(root, COMPACT_INDEX_REL_PATH)
+    write_bytes_atomic(out_path, encode_compact_index(files))
+    return out_path
+
+
+class CompactIndex:
+    """Read-only view over an index.bin file; use as a context manager."""
+
+    def __init__(self, path: str):
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        if size < HEADER.size:
+            self._file.close()
+            raise ValueError(f"Not a compact index (too small): {path}")
+        self._buf = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, block_size, count, block_count = HEADER.unpack_from(self._buf, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"Not a compact index (bad magic/version): {path}")
+        self.block_size = block_size
+        self.count = count
+        self.block_count = block_count
+        self._offsets_at = HEADER.size
+        self._data_at = HEADER.size + block_count * OFFSET.size
+
+    def close(self):
+        self._buf.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.count
+
+    def _block_start(self, block: int) -> int:
+        return self._data_at + OFFSET.unpack_from(self._buf, self._offsets_at + block * OFFSET.size)[0]
+
+    def _first_key(self, block: int) -> bytes:
+        pos = self._block_start(block)
+        _, pos = _decode_varint(self._buf, pos)
+        length, pos = _decode_varint(self._buf, pos)
+        return self._buf[pos:pos + length]
+
+    def _iter_block_from(self, block: int):
+        """Yield keys (bytes) in order starting at the first key of block."""
+        pos = self._block_start(block)
+        remaining = self.count - block * self.block_size
+        previous = b""
+        for _ in range(remaining):
+            shared, pos = _decode_varint(self._buf, pos)
+            length, pos = _decode_varint(self._buf, pos)
+            key = previous[:shared] + self._buf[pos:pos + length]
+            pos += length
+            previous = key
+            yield key
+
+    def _seek_block(self, target: bytes) -> int:
+        """Index of the last block whose first key is <= target (0 if none)."""
+        lo, hi = 0, self.block_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._first_key(mid) <= target:
+                lo = mid + 1
+            else:
+                hi = mid
+        return max(0, lo - 1)
+
+    def iter_from(self, start: str):
+        """Yield paths >= start in sorted order."""
+        if not self.count:
+            return
+        target = _to_bytes(start)
+        for key in self._iter_block_from(self._seek_block(target)):
+            if key >= target:
+                yield _to_str(key)
+
+    def __contains__(self, path: str) -> bool:
+        for found in self.iter_from(path):
+            return found == path
+        return False
+
+    def prefix(self, prefix: str):
+        """Yield all paths starting with prefix."""
+        for path in self.iter_from(prefix):
+            if not path.startswith(prefix):
+                return
+            yield path
+
+    def glob(self, pattern: str):
+        """Yield paths matching an fnmatch pattern (`*` also matches `/`).
+
+        Only the range sharing the pattern's literal prefix is scanned.
+        """
+        cut = min((pattern.find(c) for c in GLOB_CHARS if c in pattern), default=len(pattern))
+        literal = pattern[:cut]
+        for path in self.prefix(literal):
+            if fnmatch.fnmatchcase(path, pattern):
+                yield path
+
+
+def build_compact_index(root: str = REPO_ROOT) -> int:
+    """Regenerate index.bin from index.json; returns the number of paths."""
+    with open(os.path.join(root, INDEX_REL_PATH), "r", encoding="utf-8") as f:
+        files = json.load(f)["files"]
+    write_compact_index(root, files)
+    return len(files)
+
+
+def ensure_compact_index(root: str = REPO_ROOT) -> str:
+    """Return the index.bin path, rebuilding it if it is missing or older than index.json."""
+    out_path = os.path.join(root, COMPACT_INDEX_REL_PATH)
+    try:
+        stale = os.stat(out_path).st_mtime_ns < os.stat(os.path.join(root, INDEX_REL_PATH)).st_mtime_ns
+    except FileNotFoundError:
+        stale = True
+    except OSError:  # index.json unreadable: use whatever index.bin there is
+        stale = False
+    if stale:
+        build_compact_index(root)
+    return out_path
+
+
+def open_compact_index(root: str = REPO_ROOT) -> CompactIndex:
+    return CompactIndex(ensure_compact_index(root))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the compact CreateOS file index.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    prefix_parser = subparsers.add_parser("prefix", help="List paths under a prefix.")
+    prefix_parser.add_argument("prefix")
+    glob_parser = subparsers.add_parser("glob", help="List paths matching a glob pattern.")
+    glob_parser.add_argument("pattern")
+    has_parser = subparsers.add_parser("has", help="Exit 0 if the path is indexed, 1 otherwise.")
+    has_parser.add_argument("path")
+    subparsers.add_parser("build", help="Rebuild index.bin from .createos/index.json.")
+
+    args = parser.parse_args()
+
+    if args.command == "build":
+        count = build_compact_index(REPO_ROOT)
+        print(f"Wrote {count} paths to {COMPACT_INDEX_REL_PATH}")
+        return
+
+    try:
+        if args.command == "prefix":
+            paths = createosd.call("index.query", root=REPO_ROOT, query="prefix", prefix=args.prefix)
+        elif args.command == "glob":
+            paths = createosd.call("index.query", root=REPO_ROOT, query="glob", pattern=args.pattern)
+        else:
+            found = createosd.call("index.query", root=REPO_ROOT, query="has", path=args.path)
+            print("yes" if found else "no")
+            sys.exit(0 if found else 1)
+        for path in paths:
+            print(path)
+        return
+    except createosd.Unavailable:
+        pass
+    except createosd.RemoteError as e:
+        print(f"Error: {e} (run: python tools/refresh_index.py)", file=sys.stderr)
+        sys.exit(2)
+
+    try:
+        index = open_compact_index()
+    except (OSError, ValueError) as e:
+        print(f"Error: {e} (run: python tools/refresh_index.py)", file=sys.stderr)
+        sys.exit(2)
+
+    with index:
+        if args.command == "prefix":
+            for path in index.prefix(args.prefix):
+                print(path)
+        elif args.command == "glob":
+            for path in index.glob(args.pattern):
+                print(path)
+        elif args.command == "has":
+            found = args.path in index
+            print("yes" if found else "no")
+            sys.exit(0 if found else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Tool: index_watch.py
+Purpose: Keep .createos/index.json live by patching it as the tree changes (refresh_index.py --watch)
+Creation: C01 – CreateOS Bootstrap
+
+Uses inotify (via ctypes, Linux) when available and falls back to polling
+directory mtimes through the refresh_index stat cache. Bursts of events are
+coalesced over a debounce window, then only the affected directories are
+re-listed and the index is rewritten atomically.
+"""
+
+import os
+import sys
+import time
+import errno
+import select
+import struct
+import ctypes
+import ctypes.util
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Script mode only; see tools/__init__.py
+if not __package__ and REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from tools.refresh_index import (
+    IGNORE_DIRS,
+    load_cache,
+    load_index,
+    save_cache,
+    write_index,
+    build_index_incremental,
+    _join_rel,
+)
+
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+EVENT_HEADER = struct.Struct("iIII")
+
+
+class _Inotify:
+    """Minimal recursive inotify watcher over the non-ignored directories."""
+
+    def __init__(self, root):
+        libc_name = ctypes.util.find_library("c")
+        if not sys.platform.startswith("linux") or not libc_name:
+            raise OSError(errno.ENOSYS, "inotify is not available on this platform")
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.root = root
+        self.wd_to_rel = {}
+        self.add_tree("")
+
+    def add_tree(self, rel):
+        """Watch rel and every non-ignored directory below it."""
+        stack = [rel]
+        while stack:
+            current = stack.pop()
+            full = os.path.join(self.root, current) if current else self.root
+            wd = self._libc.inotify_add_watch(self.fd, os.fsencode(full), WATCH_MASK)
+            if wd < 0:
+                err = ctypes.get_errno()
+                if err in (errno.ENOENT, errno.ENOTDIR):
+                    continue
+                raise OSError(err, f"inotify_add_watch failed for {full}")
+            self.wd_to_rel[wd] = current
+            try:
+                with os.scandir(full) as it:
+                    for entry in it:
+                        if entry.name not in IGNORE_DIRS and entry.is_dir(follow_symlinks=False):
+                            stack.append(_join_rel(current, entry.name))
+            except OSError:
+                pass
+
+    def read(self, timeout):
+        """Wait up to timeout seconds; return (dirty_dirs, event_count, overflowed)."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set(), 0, False
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set(), 0, False
+
+        dirty = set()
+        count = 0
+        overflowed = False
+        pos = 0
+        while pos < len(data):
+            wd, mask, _cookie, length = EVENT_HEADER.unpack_from(data, pos)
+            name = data[pos + EVENT_HEADER.size:pos + EVENT_HEADER.size + length].rstrip(b"\0")
+            pos += EVENT_HEADER.size + length
+            count += 1
+            if mask & IN_Q_OVERFLOW:
+                overflowed = True
+                continue
+            rel = self.wd_to_rel.get(wd)
+            if mask & IN_IGNORED:
+                self.wd_to_rel.pop(wd, None)
+                continue
+            if rel is None:
+                continue
+            dirty.add(rel)
+            name = os.fsdecode(name)
+            if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO) and name not in IGNORE_DIRS:
+                self.add_tree(_join_rel(rel, name))
+        return dirty, count, overflowed
+
+    def close(self):
+        os.close(self.fd)
+
+
+def _apply(root, index, cache, dirty):
+    """Patch index from disk and write it atomically; returns (index, cache, stats)."""
+    index, dirs, stats = build_index_incremental(root, index, cache, dirty)
+    if stats["added"] or stats["removed"]:
+        write_index(root, index)
+    if stats["relisted"] or stats["added"] or stats["removed"]:
+        save_cache(root, dirs)
+    return index, {"dirs": dirs}, stats
+
+
+def _report(stats, events, first_event_at, started_at, window_start, window_events):
+    now = time.monotonic()
+    rate = window_events / max(now - window_start, 1e-9)
+    print(
+        f"[watch] +{stats['added']} -{stats['removed']} "
+        f"(re-listed {stats['relisted']}/{stats['dirs']} dirs) "
+        f"patch {1000 * (now - started_at):.1f} ms, "
+        f"latency {1000 * (now - first_event_at):.1f} ms, "
+        f"{events} events in batch, {rate:.1f} events/s overall",
+        file=sys.stderr,
+        flush=True,
+    )
+
+
+def watch(root=REPO_ROOT, debounce=0.25, poll_interval=1.0, force_poll=False):
+    """Run until interrupted, keeping index.json in sync with the tree."""
+    cache = load_cache(root)
+    index = load_index(root) if cache is not None else None
+    index, dirs, _ = build_index_incremental(root, index, cache)
+    write_index(root, index)
+    save_cache(root, dirs)
+    cache = {"dirs": dirs}
+    print(f"[watch] indexed {index['file_count']} paths under {root}", file=sys.stderr, flush=True)
+
+    notifier = None
+    if not force_poll:
+        try:
+            notifier = _Inotify(root)
+            print(f"[watch] using inotify ({len(notifier.wd_to_rel)} directories)", file=sys.stderr, flush=True)
+        except OSError as e:
+            print(f"[watch] inotify unavailable ({e}); polling every {poll_interval}s", file=sys.stderr, flush=True)
+
+    window_start = time.monotonic()
+    window_events = 0
+    try:
+        while True:
+            if notifier is None:
+                time.sleep(poll_interval)
+                first_event_at = started_at = time.monotonic()
+                index, cache, stats = _apply(root, index, cache, None)
+                changes = stats["added"] + stats["removed"]
+                if changes:
+                    # Polling sees no events; count the path changes it found instead
+                    window_events += changes
+                    _report(stats, changes, first_event_at, started_at, window_start, window_events)
+                continue
+
+            dirty, events, overflowed = notifier.read(None)
+            if not events:
+                continue
+            first_event_at = time.monotonic()
+            # Coalesce the burst: keep reading until the tree is quiet for one
+            # debounce window (capped so a constant stream still gets applied).
+            deadline = first_event_at + debounce * 20
+            while time.monotonic() < deadline:
+                more, n, more_overflow = notifier.read(debounce)
+                if not n:
+                    break
+                dirty |= more
+                events += n
+                overflowed |= more_overflow
+            window_events += events
+
+            started_at = time.monotonic()
+            # After a queue overflow we cannot trust the dirty set; fall back
+            # to an mtime check of every directory.
+            index, cache, stats = _apply(root, index, cache, None if overflowed else dirty)
+            _report(stats, events, first_event_at, started_at, window_start, window_events)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if notifier is not None:
+            notifier.close()
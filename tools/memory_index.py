@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Tool: memory_index.py
+Purpose: Byte-offset sidecar index for creation/05-memory/memory.md
+Creation: C01 – CreateOS Bootstrap
+
+The sidecar (memory.md.idx, next to memory.md) is JSON Lines with one record
+per `### [timestamp]` entry: {"n", "ts", "event", "offset", "length"}, where n
+is the entry's ordinal in the file. It is
+append-only like memory.md itself: write_memory_entry() appends records for
+the entries it writes, and any drift (external edits, truncation, appends by
+other writers) is detected on the next use and repaired by scanning only what
+is needed. Only the active memory.md is indexed; the last/since/event
+queries also read entries sealed into segments (see memory_segments.py),
+which carry the segment's file name and offsets into its uncompressed text.
+
+Examples:
+  python tools/memory_index.py last 5
+  python tools/memory_index.py since 2025-12-11T00:00:00Z
+  python tools/memory_index.py event session_close
+"""
+
+import os
+import re
+import sys
+import json
+import argparse
+import datetime
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Script mode only; see tools/__init__.py
+if not __package__ and REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from tools import config
+from tools.fsutil import locked, read_last_jsonl_record
+
+MEMORY_FILE = config.MEMORY_FILE
+
+SIDECAR_SUFFIX = ".idx"
+HEADER_PREFIX = b"### ["
+HEADER_RE = re.compile(rb"^### \[([^\]]*)\]")
+EVENT_PREFIX = b"event:"
+
+
+def sidecar_path(memory_path: str) -> str:
+    return memory_path + SIDECAR_SUFFIX
+
+
+def parse_timestamp(ts: str):
+    """Parse an entry timestamp to an aware UTC datetime (None if unparseable)."""
+    try:
+        dt = datetime.datetime.fromisoformat(ts.strip().replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=datetime.timezone.utc)
+    return dt
+
+
+def scan_entries(data: bytes, base_offset: int = 0, first_n: int = 0):
+    """Return index records for every entry header found in data.
+
+    Each entry spans from its `### [` line to the next header (or the end of
+    data); offsets are absolute (base_offset + position in data) and ordinals
+    start at first_n.
+    """
+    records = []
+    pos = 0
+    current = None
+    for line in data.splitlines(keepends=True):
+        match = HEADER_RE.match(line)
+        if match:
+            if current is not None:
+                current["length"] = base_offset + pos - current["offset"]
+                records.append(current)
+            current = {
+                "n": first_n + len(records),
+                "ts": match.group(1).decode("utf-8", "replace"),
+                "event": None,
+                "offset": base_offset + pos,
+                "length": 0,
+            }
+        elif current is not None and current["event"] is None and line.startswith(EVENT_PREFIX):
+            current["event"] = line[len(EVENT_PREFIX):].strip().decode("utf-8", "replace")
+        pos += len(line)
+    if current is not None:
+        current["length"] = base_offset + pos - current["offset"]
+        records.append(current)
+    return records
+
+
+def _write_records(path: str, records, mode: str) -> None:
+    with open(path, mode, encoding="utf-8") as f:
+        for r in records:
+            f.write(json.dumps(r, ensure_ascii=False) + "\n")
+
+
+def rebuild_index(memory_path: str = MEMORY_FILE):
+    """Rescan memory.md in full and rewrite the sidecar."""
+    with open(memory_path, "rb") as f:
+        records = scan_entries(f.read())
+    _write_records(sidecar_path(memory_path), records, "w")
+    return records
+
+
+def sync_index(memory_path: str = MEMORY_FILE) -> None:
+    """Make sure the sidecar covers exactly the current memory.md.
+
+    Cheap in the common case: one stat, the sidecar's last line and a few
+    bytes of memory.md. Bytes appended by writers that don't maintain the
+    sidecar are scanned and indexed; anything else triggers a full rebuild.
+    The caller must hold the memory.md lock (see load_records).
+    """
+    try:
+        size = os.path.getsize(memory_path)
+    except OSError:
+        return
+    idx_path = sidecar_path(memory_path)
+    last = read_last_jsonl_record(idx_path)
+    if last is None:
+        rebuild_index(memory_path)
+        return
+
+    if "n" not in last:
+        rebuild_index(memory_path)
+        return
+
+    covered = last["offset"] + last["length"]
+    with open(memory_path, "rb") as f:
+        f.seek(last["offset"])
+        if f.read(len(HEADER_PREFIX)) != HEADER_PREFIX or covered > size:
+            rebuild_index(memory_path)
+            return
+        if covered == size:
+            return
+        f.seek(covered)
+        tail = f.read()
+    # Appended bytes must start a new entry (after optional blank lines);
+    # otherwise the last indexed entry grew and its length is stale.
+    if not tail.lstrip(b"\r\n").startswith(HEADER_PREFIX):
+        rebuild_index(memory_path)
+        return
+    _write_records(idx_path, scan_entries(tail, covered, last["n"] + 1), "a")
+
+
+def entry_count(memory_path: str = MEMORY_FILE) -> int:
+    """Number of entries in the synced sidecar (caller holds the memory.md lock)."""
+    last = read_last_jsonl_record(sidecar_path(memory_path))
+    return last["n"] + 1 if last else 0
+
+
+def record_append(memory_path: str, offset: int, data: bytes) -> None:
+    """Index entries that were just appended at offset (called by write_memory_entry)."""
+    _write_records(sidecar_path(memory_path), scan_entries(data, offset, entry_count(memory_path)), "a")
+
+
+def load_records(memory_path: str = MEMORY_FILE):
+    """Sync and read the sidecar under the memory.md lock."""
+    # Imported here: memory_segments imports this module
+    from tools import memory_segments
+
+    records = []
+    try:
+        with open(memory_path, "rb") as lock_file, locked(lock_file):
+            memory_segments.recover(memory_path)
+            sync_index(memory_path)
+            with open(sidecar_path(memory_path), "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        records.append(json.loads(line))
+    except FileNotFoundError:
+        pass
+    return records
+
+
+def read_entries(memory_path: str, records):
+    """Attach each record's entry text by seeking straight to its offset."""
+    entries = []
+    with open(memory_path, "rb") as f:
+        for r in records:
+            f.seek(r["offset"])
+            text = f.read(r["length"]).decode("utf-8", "replace").rstrip()
+            entries.append({**r, "text": text})
+    return entries
+
+
+def _sealed_entries(memory_path: str, segment: dict):
+    """Entries of one sealed segment, scanned from its decompressed text."""
+    # Imported here: memory_segments imports this module
+    from tools import memory_segments
+
+    data = memory_segments.read_segment(memory_path, segment)
+    entries = []
+    for r in scan_entries(data):
+        text = data[r["offset"]:r["offset"] + r["length"]].decode("utf-8", "replace").rstrip()
+        entries.append({**r, "segment": segment["file"], "text": text})
+    return entries
+
+
+def _sealed_segments(memory_path: str, since=None):
+    from tools import memory_segments
+
+    return memory_segments.segments_in_range(memory_path, since)
+
+
+def last_entries(n: int, memory_path: str = MEMORY_FILE):
+    if n <= 0:
+        return []
+    records = load_records(memory_path)
+    entries = read_entries(memory_path, records[-n:])
+    # Older entries come from sealed segments, newest segment first
+    for segment in reversed(_sealed_segments(memory_path)):
+        if len(entries) >= n:
+            break
+        sealed = _sealed_entries(memory_path, segment)
+        entries = sealed[max(0, len(sealed) - (n - len(entries))):] + entries
+    return entries
+
+
+def entries_since(since: str, memory_path: str = MEMORY_FILE):
+    threshold = parse_timestamp(since)
+    if threshold is None:
+        raise ValueError(f"Invalid timestamp: {since}")
+
+    def matches(r):
+        ts = parse_timestamp(r["ts"])
+        return ts is not None and ts >= threshold
+
+    entries = []
+    for segment in _sealed_segments(memory_path, since):
+        entries.extend(e for e in _sealed_entries(memory_path, segment) if matches(e))
+    return entries + read_entries(memory_path, [r for r in load_records(memory_path) if matches(r)])
+
+
+def entries_with_event(event: str, memory_path: str = MEMORY_FILE):
+    entries = []
+    for segment in _sealed_segments(memory_path):
+        entries.extend(e for e in _sealed_entries(memory_path, segment) if e.get("event") == event)
+    selected = [r for r in load_records(memory_path) if r.get("event") == event]
+    return entries + read_entries(memory_path, selected)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query memory.md through its byte-offset sidecar index.")
+    parser.add_argument("--memory-file", default=MEMORY_FILE, help="Path to memory.md.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("rebuild", help="Rescan memory.md and rewrite the sidecar.")
+    last_parser = subparsers.add_parser("last", help="Last N entries.")
+    last_parser.add_argument("n", type=int)
+    since_parser = subparsers.add_parser("since", help="Entries at or after an ISO-8601 timestamp.")
+    since_parser.add_argument("timestamp")
+    event_parser = subparsers.add_parser("event", help="Entries whose event matches exactly.")
+    event_parser.add_argument("event")
+
+    args = parser.parse_args()
+
+    if args.command == "rebuild":
+        with open(args.memory_file, "rb") as f, locked(f):
+            records = rebuild_index(args.memory_file)
+        print(f"Indexed {len(records)} entries in {sidecar_path(args.memory_file)}")
+        return
+
+    try:
+        if args.command == "last":
+            entries = last_entries(args.n, args.memory_file)
+        elif args.command == "since":
+            entries = entries_since(args.timestamp, args.memory_file)
+        else:
+            entries = entries_with_event(args.event, args.memory_file)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(2)
+    print(json.dumps(entries, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
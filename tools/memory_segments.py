@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+Tool: memory_segments.py
+Purpose: Segment rollover, compaction and range reads for creation/05-memory/memory.md (T006)
+Creation: C01 – CreateOS Bootstrap
+
+memory.md is the active segment. `seal` moves its entries into a numbered,
+gzip-compressed segment under creation/05-memory/segments/ and truncates
+memory.md back to its preamble. segments/manifest.json lists sealed segments
+oldest-first with their time ranges, so readers only decompress the segments
+a query needs.
+
+Automatic rollover is opt-in: appends seal the active segment once it passes
+a threshold only if the creation.yaml of the Creation that holds the memory
+file sets one, e.g.
+
+  memory:
+    rollover_max_bytes: 1048576
+    rollover_max_entries: 1000
+
+While a seal is in progress the manifest records the byte range of memory.md
+that was sealed (`pending_cut`). If the process dies before memory.md is
+truncated, readers skip that range and the next locked writer trims it, so
+sealed entries are never returned twice.
+
+Examples:
+  python tools/memory_segments.py status
+  python tools/memory_segments.py seal
+  python tools/memory_segments.py compact --target-bytes 8388608
+"""
+
+import os
+import sys
+import json
+import hashlib
+import argparse
+import datetime
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Script mode only; see tools/__init__.py
+if not __package__ and REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from tools import config
+from tools import memory_index
+from tools.fsutil import locked, write_bytes_atomic, write_json_atomic
+
+SEGMENTS_DIRNAME = "segments"
+MANIFEST_NAME = "manifest.json"
+COMPACT_TARGET_BYTES = 8 << 20
+
+
+def segments_dir(memory_path: str) -> str:
+    return os.path.join(os.path.dirname(os.path.abspath(memory_path)), SEGMENTS_DIRNAME)
+
+
+def load_manifest(memory_path: str) -> dict:
+    path = os.path.join(segments_dir(memory_path), MANIFEST_NAME)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"segments": []}
+
+
+def _save_manifest(memory_path: str, manifest: dict) -> None:
+    path = os.path.join(segments_dir(memory_path), MANIFEST_NAME)
+    write_json_atomic(path, manifest, trailing_newline=True)
+
+
+def _segment_name(number: int) -> str:
+    return f"{number:06d}.md.gz"
+
+
+def _next_number(manifest: dict) -> int:
+    return max((s["number"] for s in manifest["segments"]), default=0) + 1
+
+
+def _time_range(records):
+    stamps = [memory_index.parse_timestamp(r["ts"]) for r in records]
+    stamps = [t for t in stamps if t is not None]
+    if not stamps:
+        return None, None
+    fmt = lambda t: t.astimezone(datetime.timezone.utc).isoformat().replace("+00:00", "Z")
+    return fmt(min(stamps)), fmt(max(stamps))
+
+
+def _write_segment(memory_path: str, number: int, data: bytes, records) -> dict:
+    name = _segment_name(number)
+    # mtime=0 keeps the compressed bytes deterministic for identical content
+    import gzip
+
+    write_bytes_atomic(os.path.join(segments_dir(memory_path), name), gzip.compress(data, mtime=0))
+    first_ts, last_ts = _time_range(records)
+    return {
+        "number": number,
+        "file": name,
+        "first_ts": first_ts,
+        "last_ts": last_ts,
+        "entries": len(records),
+        "raw_bytes": len(data),
+    }
+
+
+def rollover_limits(root: str = config.REPO_ROOT):
+    """(max_bytes, max_entries) from creation.yaml's `memory:` block, or None if rollover is off.
+
+    Either limit may be None when only the other one is configured.
+    """
+    settings = config.section("memory", root)
+    limits = []
+    for key in ("rollover_max_bytes", "rollover_max_entries"):
+        try:
+            limits.append(int(settings[key]) if key in settings else None)
+        except ValueError:
+            raise ValueError(f"creation.yaml: memory.{key} must be an integer, got {settings[key]!r}") from None
+    return tuple(limits) if any(limits) else None
+
+
+def _cut_digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def pending_cut(memory_path: str, manifest=None):
+    """(start, end) of an already sealed byte range still present in memory.md, else None.
+
+    A range is only reported while memory.md still holds exactly the bytes
+    that were sealed, so the check is safe to repeat.
+    """
+    cut = (manifest or load_manifest(memory_path)).get("pending_cut")
+    if not cut:
+        return None
+    try:
+        with open(memory_path, "rb") as f:
+            f.seek(cut["start"])
+            data = f.read(cut["end"] - cut["start"])
+    except OSError:
+        return None
+    if len(data) != cut["end"] - cut["start"] or _cut_digest(data) != cut["sha256"]:
+        return None
+    return cut["start"], cut["end"]
+
+
+def recover(memory_path: str) -> bool:
+    """Finish a seal interrupted between the manifest save and the truncate (lock held).
+
+    Removes the sealed range from memory.md if it is still there and clears
+    the manifest's pending_cut. Returns True if memory.md was trimmed.
+    """
+    manifest = load_manifest(memory_path)
+    if "pending_cut" not in manifest:
+        return False
+    span = pending_cut(memory_path, manifest)
+    if span is not None:
+        start, end = span
+        # Rewrite in place so the lock (held on this inode) stays valid
+        with open(memory_path, "r+b") as f:
+            f.seek(end)
+            rest = f.read()
+            f.seek(start)
+            f.write(rest)
+            f.truncate()
+        memory_index.rebuild_index(memory_path)
+    del manifest["pending_cut"]
+    _save_manifest(memory_path, manifest)
+    return span is not None
+
+
+def seal_active(memory_path: str, f) -> dict:
+    """Seal memory.md's entries into a new segment and truncate it to its preamble.
+
+    f is memory.md opened for appending with the memory lock held. Truncating
+    in place (rather than replacing the file) keeps the lock valid for writers
+    already waiting on it. The manifest is saved with the sealed range as
+    pending_cut before the truncate and without it afterwards, so a crash in
+    between is repaired by recover(). Returns the new manifest record, or None
+    if there is nothing to seal.
+    """
+    f.flush()
+    recover(memory_path)
+    with open(memory_path, "rb") as src:
+        content = src.read()
+    records = memory_index.scan_entries(content)
+    if not records:
+        return None
+    start = records[0]["offset"]
+    data = content[start:]
+    # The preamble keeps a single trailing newline; the blank line before the
+    # first entry is cut with the entries, as the next append brings its own.
+    keep = len(content[:start].rstrip(b"\r\n"))
+    for newline in (b"\r\n", b"\n"):
+        if keep and content.startswith(newline, keep):
+            keep += len(newline)
+            break
+
+    manifest = load_manifest(memory_path)
+    record = _write_segment(memory_path, _next_number(manifest), data, records)
+    manifest["segments"].append(record)
+    manifest["pending_cut"] = {"start": keep, "end": len(content), "sha256": _cut_digest(content[keep:])}
+    _save_manifest(memory_path, manifest)
+
+    os.ftruncate(f.fileno(), keep)
+    memory_index.rebuild_index(memory_path)
+    del manifest["pending_cut"]
+    _save_manifest(memory_path, manifest)
+    return record
+
+
+def maybe_roll(memory_path: str, f, size: int, limits=None):
+    """Seal the active segment if it passed a configured rollover threshold (lock held).
+
+    limits defaults to the rollover_limits() of the Creation that owns
+    memory_path (see config.owning_root); without configured limits, or
+    outside any Creation, this never seals.
+    """
+    if limits is None:
+        root = config.owning_root(memory_path)
+        limits = rollover_limits(root) if root else None
+    if not limits:
+        return None
+    max_bytes, max_entries = limits
+    if (max_bytes is None or size < max_bytes) and (
+        max_entries is None or memory_index.entry_count(memory_path) < max_entries
+    ):
+        return None
+    return seal_active(memory_path, f)
+
+
+def read_segment(memory_path: str, segment: dict) -> bytes:
+    import gzip
+
+    with gzip.open(os.path.join(segments_dir(memory_path), segment["file"]), "rb") as f:
+        return f.read()
+
+
+def open_segment_text(memory_path: str, segment: dict):
+    """Open a sealed segment as a streaming text file."""
+    import gzip
+
+    return gzip.open(os.path.join(segments_dir(memory_path), segment["file"]), "rt", encoding="utf-8")
+
+
+def segments_in_range(memory_path: str, since=None, until=None):
+    """Sealed segments (oldest-first) whose time range overlaps [since, until].
+
+    since/until are ISO-8601 strings; segments without timestamps are always
+    included.
+    """
+    lo = memory_index.parse_timestamp(since) if since else None
+    hi = memory_index.parse_timestamp(until) if until else None
+    selected = []
+    for segment in load_manifest(memory_path)["segments"]:
+        first = memory_index.parse_timestamp(segment["first_ts"]) if segment.get("first_ts") else None
+        last = memory_index.parse_timestamp(segment["last_ts"]) if segment.get("last_ts") else None
+        if lo is not None and last is not None and last < lo:
+            continue
+        if hi is not None and first is not None and first > hi:
+            continue
+        selected.append(segment)
+    return selected
+
+
+def compact(memory_path: str, target_bytes: int = COMPACT_TARGET_BYTES):
+    """Merge runs of consecutive sealed segments up to target_bytes of raw text each.
+
+    Returns (segments_before, segments_after).
+    """
+    with open(memory_path, "rb") as lock_file, locked(lock_file):
+        recover(memory_path)
+        manifest = load_manifest(memory_path)
+        before = manifest["segments"]
+        groups = []
+        for segment in before:
+            if groups and sum(s["raw_bytes"] for s in groups[-1]) + segment["raw_bytes"] <= target_bytes:
+                groups[-1].append(segment)
+            else:
+                groups.append([segment])
+
+        after = []
+        obsolete = []
+        next_number = _next_number(manifest)
+        for group in groups:
+            if len(group) == 1:
+                after.append(group[0])
+                continue
+            data = b"".join(read_segment(memory_path, s) for s in group)
+            record = _write_segment(memory_path, next_number, data, memory_index.scan_entries(data))
+            record["merged_from"] = [s["number"] for s in group]
+            next_number += 1
+            after.append(record)
+            obsolete.extend(s["file"] for s in group)
+
+        manifest["segments"] = after
+        _save_manifest(memory_path, manifest)
+        for name in obsolete:
+            try:
+                os.remove(os.path.join(segments_dir(memory_path), name))
+            except FileNotFoundError:
+                pass
+    return len(before), len(after)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage sealed memory segments.")
+    parser.add_argument("--memory-file", default=memory_index.MEMORY_FILE, help="Path to memory.md.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("status", help="Show sealed segments and the active segment size.")
+    subparsers.add_parser("seal", help="Seal the active segment now, regardless of thresholds.")
+    compact_parser = subparsers.add_parser("compact", help="Merge consecutive sealed segments.")
+    compact_parser.add_argument(
+        "--target-bytes",
+        type=int,
+        default=COMPACT_TARGET_BYTES,
+        help=f"Maximum uncompressed size of a merged segment (default: {COMPACT_TARGET_BYTES}).",
+    )
+
+    args = parser.parse_args()
+
+    if args.command == "status":
+        with open(args.memory_file, "rb") as lock_file, locked(lock_file):
+            recover(args.memory_file)
+            memory_index.sync_index(args.memory_file)
+            active_entries = memory_index.entry_count(args.memory_file)
+        status = {
+            "active": {
+                "file": args.memory_file,
+                "bytes": os.path.getsize(args.memory_file),
+                "entries": active_entries,
+            },
+            "segments": load_manifest(args.memory_file)["segments"],
+        }
+        print(json.dumps(status, indent=2, ensure_ascii=False))
+    elif args.command == "seal":
+        with open(args.memory_file, "ab") as f, locked(f):
+            memory_index.sync_index(args.memory_file)
+            record = seal_active(args.memory_file, f)
+        if record is None:
+            print("Nothing to seal: the active segment has no entries.")
+        else:
+            print(f"Sealed {record['entries']} entries into segments/{record['file']}")
+    elif args.command == "compact":
+        before, after = compact(args.memory_file, args.target_bytes)
+        print(f"Compacted {before} segments into {after}.")
+
+
+if __name__ == "__main__":
+    main()
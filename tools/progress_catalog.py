@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Tool: progress_catalog.py
+Purpose: Dated catalog of creation/08-progress logs (catalog.json)
+Creation: C01 – CreateOS Bootstrap
+
+catalog.json lists one record per progress file, sorted by date:
+{"date", "file", "kind", "summary", "completed", "sha"}. kind is "log" for
+the daily YYYY-MM-DD.md file and the name suffix otherwise (e.g. "plan" for
+YYYY-MM-DD-plan.md); within a date other kinds sort before the log, so the
+last record is the newest daily log. The catalog is authoritative: load()
+and latest() read only catalog.json, which close_session.py and
+start_session.py update as they write progress files and which is
+committed alongside them. Files that arrive any other way (written by hand,
+or merged from branches whose catalogs conflicted) are picked up by
+`refresh`, which lists the directory and describes only files the catalog
+does not have yet; `rebuild` rescans every file. A missing or unreadable
+catalog is rebuilt on first load.
+
+Examples:
+  python tools/progress_catalog.py refresh
+  python tools/progress_catalog.py rebuild
+  python tools/progress_catalog.py latest
+  python tools/progress_catalog.py range 2025-12-01 2025-12-31
+"""
+
+import os
+import re
+import sys
+import json
+import bisect
+import argparse
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Script mode only; see tools/__init__.py
+if not __package__ and REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from tools import config
+from tools.fsutil import write_json_atomic
+
+PROGRESS_DIR = config.PROGRESS_DIR
+CATALOG_NAME = "catalog.json"
+CATALOG_VERSION = 1
+
+NAME_RE = re.compile(r"^(\d{4}-\d{2}-\d{2})(?:-(.+))?\.md$")
+TASK_ID_RE = re.compile(r"\bT\d{3,}\b")
+SHA_RE = re.compile(r"HEAD SHA:\s*([0-9a-f]{7,64})")
+
+
+def catalog_path(progress_dir: str = PROGRESS_DIR) -> str:
+    return os.path.join(progress_dir, CATALOG_NAME)
+
+
+def parse_name(filename: str):
+    """(date, kind) for a progress file name, or None if it is not dated."""
+    match = NAME_RE.match(filename)
+    if not match:
+        return None
+    return match.group(1), match.group(2) or "log"
+
+
+def _sort_key(record):
+    return (record["date"], record["kind"] == "log", record["file"])
+
+
+def _sections(text: str):
+    """Map lower-cased `## heading` -> list of its non-empty lines."""
+    sections = {}
+    current = None
+    for line in text.splitlines():
+        if line.startswith("## "):
+            current = sections.setdefault(line[3:].strip().lower(), [])
+        elif current is not None and line.strip():
+            current.append(line.strip())
+    return sections
+
+
+def describe(progress_dir: str, filename: str):
+    """Catalog record for one progress file (None if the name is not dated)."""
+    parsed = parse_name(filename)
+    if parsed is None:
+        return None
+    with open(os.path.join(progress_dir, filename), "r", encoding="utf-8") as f:
+        text = f.read()
+    sections = _sections(text)
+    summary = next((lines[0] for heading, lines in sections.items() if heading.startswith("summary") and lines), None)
+    completed = []
+    for heading, lines in sections.items():
+        if heading.startswith("completed"):
+            for line in lines:
+                completed.extend(tid for tid in TASK_ID_RE.findall(line) if tid not in completed)
+    if summary is None:
+        # Free-form files (plans, TODO lists): fall back to their first text line
+        summary = next((l.strip() for l in text.splitlines() if l.strip() and not l.startswith(("#", "---"))), None)
+    sha = SHA_RE.search(text)
+    return make_record(
+        parsed[0],
+        filename,
+        summary[2:] if summary and summary.startswith("- ") else summary,
+        completed,
+        sha.group(1) if sha else None,
+        kind=parsed[1],
+    )
+
+
+def make_record(date: str, filename: str, summary=None, completed=None, sha=None, kind="log"):
+    return {
+        "date": date,
+        "file": filename,
+        "kind": kind,
+        "summary": summary,
+        "completed": list(completed or []),
+        "sha": sha or None,
+    }
+
+
+def dated_files(progress_dir: str = PROGRESS_DIR) -> set:
+    """Names of the dated progress files in progress_dir (one directory listing, no reads)."""
+    with os.scandir(progress_dir) as it:
+        return {entry.name for entry in it if parse_name(entry.name) and entry.is_file()}
+
+
+def rebuild(progress_dir: str = PROGRESS_DIR):
+    """Rescan progress_dir and rewrite catalog.json; returns the records."""
+    records = [describe(progress_dir, name) for name in dated_files(progress_dir)]
+    records.sort(key=_sort_key)
+    _save(progress_dir, records)
+    return records
+
+
+def refresh(progress_dir: str = PROGRESS_DIR):
+    """Bring catalog.json in line with the dated files present; returns the records.
+
+    Records of files that are gone are dropped and only files the catalog
+    does not list yet are read. catalog.json is rewritten only if it changed.
+    """
+    records = _read_catalog(progress_dir)
+    if records is None:
+        return rebuild(progress_dir)
+    names = dated_files(progress_dir)
+    known = {r["file"] for r in records}
+    if known == names:
+        return records
+    records = [r for r in records if r["file"] in names]
+    records.extend(describe(progress_dir, name) for name in names - known)
+    records.sort(key=_sort_key)
+    _save(progress_dir, records)
+    return records
+
+
+def catalog_document(records) -> dict:
+    return {"version": CATALOG_VERSION, "entries": records}
+
+
+def _save(progress_dir: str, records) -> None:
+    write_json_atomic(catalog_path(progress_dir), catalog_document(records), trailing_newline=True)
+
+
+def _read_catalog(progress_dir: str):
+    """Records from catalog.json, or None if it is missing, unreadable or another version."""
+    try:
+        with open(catalog_path(progress_dir), "r", encoding="utf-8") as f:
+            catalog = json.load(f)
+        if catalog.get("version") == CATALOG_VERSION:
+            return catalog["entries"]
+    except (OSError, ValueError, KeyError):
+        pass
+    return None
+
+
+def load(progress_dir: str = PROGRESS_DIR):
+    """Catalog records sorted by date, read from catalog.json alone.
+
+    The catalog is rebuilt only if it is missing or unreadable; files added
+    outside the write paths need `refresh` (see the module docstring).
+    """
+    records = _read_catalog(progress_dir)
+    if records is not None:
+        return records
+    if not os.path.isdir(progress_dir):
+        return []
+    return rebuild(progress_dir)
+
+
+def with_record(entry: dict, progress_dir: str = PROGRESS_DIR):
+    """Catalog records with entry inserted (or replacing the record for its file)."""
+    records = [r for r in load(progress_dir) if r["file"] != entry["file"]]
+    records.insert(bisect.bisect_right(records, _sort_key(entry), key=_sort_key), entry)
+    return records
+
+
+def record(entry: dict, progress_dir: str = PROGRESS_DIR) -> None:
+    """Insert or replace the record for entry["file"], keeping date order."""
+    _save(progress_dir, with_record(entry, progress_dir))
+
+
+def latest(progress_dir: str = PROGRESS_DIR):
+    """Newest record (the newest daily log if the date has one), or None."""
+    records = load(progress_dir)
+    return records[-1] if records else None
+
+
+def in_range(records, start=None, end=None):
+    """Records with start <= date <= end (YYYY-MM-DD; either bound optional)."""
+    lo = bisect.bisect_left(records, start, key=lambda r: r["date"]) if start else 0
+    hi = bisect.bisect_right(records, end, key=lambda r: r["date"]) if end else len(records)
+    return records[lo:hi]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query or rebuild the progress catalog.")
+    parser.add_argument("--progress-dir", default=PROGRESS_DIR, help="Progress directory.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("refresh", help="Add files the catalog does not list yet and drop removed ones.")
+    subparsers.add_parser("rebuild", help="Rescan the progress directory and rewrite catalog.json.")
+    subparsers.add_parser("latest", help="Newest progress record.")
+    range_parser = subparsers.add_parser("range", help="Records between two dates (inclusive).")
+    range_parser.add_argument("start", help="YYYY-MM-DD")
+    range_parser.add_argument("end", nargs="?", help="YYYY-MM-DD (default: open-ended)")
+
+    args = parser.parse_args()
+
+    if args.command == "rebuild":
+        records = rebuild(args.progress_dir)
+        print(f"Cataloged {len(records)} progress files in {catalog_path(args.progress_dir)}")
+    elif args.command == "refresh":
+        records = refresh(args.progress_dir)
+        print(f"Catalog lists {len(records)} progress files: {catalog_path(args.progress_dir)}")
+    elif args.command == "latest":
+        print(json.dumps(latest(args.progress_dir), indent=2, ensure_ascii=False))
+    else:
+        records = in_range(load(args.progress_dir), args.start, args.end)
+        print(json.dumps(records, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,40 @@
 # tools/refresh_index.py
 import os
+import sys
 import json
+import mmap
+import queue
+import hashlib
+import argparse
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
+# Script mode only; see tools/__init__.py
+if not __package__ and REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from tools import git_refs
+from tools import tracing
+from tools.fsutil import fingerprint, is_racy, write_json_atomic
+from tools.index_query import write_compact_index
+
+INDEX_REL_PATH = ".createos/index.json"
+CACHE_REL_PATH = ".createos/index-cache.json"
+CACHE_VERSION = 1
+
+HASH_ALGORITHMS = ("blake2b", "sha256")
+# Files at least this large are hashed through a read-only memory map
+MMAP_THRESHOLD = 1 << 20
+READ_CHUNK = 1 << 16
+
+# Listing is dominated by syscall/network latency rather than Python work, so
+# oversubscribing the cores is fine.
+DEFAULT_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
 IGNORE_DIRS = {
     ".git",
     ".idea",
@@ -19,7 +49,10 @@ IGNORE_FILES = {
     # add anything large or irrelevant if needed
 }
 
-def build_index(root: str) -> dict:
+def build_index(root: str, workers: int = 0) -> dict:
+    if workers and workers > 1:
+        return _make_index(walk_parallel(root, workers))
+
     files = []
 
     for dirpath, dirnames, filenames in os.walk(root):
@@ -33,6 +66,145 @@ def build_index(root: str) -> dict:
             rel = os.path.relpath(full, root).replace("\\", "/")
             files.append(rel)
 
+    return _make_index(files)
+
+
+def list_git_files(root: str) -> list:
+    """Return tracked paths from the repository's index via one `git ls-files -z`.
+
+    Respects .gitignore (untracked files never appear) and does no directory
+    traversal. IGNORE_DIRS/IGNORE_FILES are still applied so the result matches
+    the walker on a clean checkout. Submodules appear as a single gitlink path.
+    """
+    result = subprocess.run(
+        ["git", "ls-files", "-z", "--cached"],
+        cwd=root,
+        capture_output=True,
+        check=True,
+    )
+    files = []
+    for raw in result.stdout.split(b"\0"):
+        if not raw:
+            continue
+        path = raw.decode("utf-8", "surrogateescape")
+        if not _is_ignored_path(path):
+            files.append(path)
+    return files
+
+
+def _is_ignored_path(path: str) -> bool:
+    parts = path.split("/")
+    return parts[-1] in IGNORE_FILES or any(p in IGNORE_DIRS for p in parts[:-1])
+
+
+def git_head_sha(root: str):
+    return git_refs.head_sha(root)
+
+
+def build_index_from_git(root: str) -> dict:
+    index = _make_index(list_git_files(root))
+    commit = git_head_sha(root)
+    if commit:
+        index["commit"] = commit
+    return index
+
+
+def git_diff_paths(root: str, base: str, head=None):
+    """Return (added, removed, modified) tracked paths between two commits.
+
+    One `git diff --name-status -z -M` call; renames contribute to both added
+    and removed, copies to added. With head=None, base is compared with the
+    working tree. Returns None if the diff cannot be computed (unknown or
+    missing commit, e.g. outside a shallow clone's history).
+    """
+    revs = [base, head] if head else [base]
+    result = subprocess.run(
+        ["git", "diff", "--name-status", "-z", "-M", "--no-ext-diff", *revs, "--"],
+        cwd=root,
+        capture_output=True,
+        check=False,
+    )
+    if result.returncode != 0:
+        return None
+
+    fields = [f.decode("utf-8", "surrogateescape") for f in result.stdout.split(b"\0")]
+    added, removed, modified = set(), set(), set()
+    i = 0
+    while i < len(fields) and fields[i]:
+        status = fields[i][0]
+        if status in ("R", "C"):
+            old, new = fields[i + 1], fields[i + 2]
+            if status == "R":
+                removed.add(old)
+            added.add(new)
+            i += 3
+            continue
+        path = fields[i + 1]
+        if status == "A":
+            added.add(path)
+        elif status == "D":
+            removed.add(path)
+        else:
+            modified.add(path)
+        i += 2
+    ignored = _is_ignored_path
+    return (
+        {p for p in added if not ignored(p)},
+        {p for p in removed if not ignored(p)},
+        {p for p in modified if not ignored(p)},
+    )
+
+
+def build_index_from_diff(root: str, previous_index, algorithm=None):
+    """Patch previous_index with the changes between its recorded commit and HEAD.
+
+    Falls back to a full build_index_from_git() when the previous index has no
+    commit or the diff is unavailable. Returns (index, stats); stats["mode"] is
+    "diff" or "full".
+    """
+    head = git_head_sha(root)
+    base = (previous_index or {}).get("commit")
+    changes = git_diff_paths(root, base, head) if base and head else None
+    if changes is None:
+        index = build_index_from_git(root)
+        if algorithm:
+            add_content_hashes(root, index, {}, algorithm, previous_index)
+        return index, {"mode": "full"}
+
+    added, removed, modified = changes
+    files = set(previous_index["files"])
+    files.difference_update(removed)
+    files.update(added)
+    index = _make_index(list(files))
+    index["commit"] = head
+
+    if algorithm:
+        hashes = {}
+        if previous_index.get("hash_algorithm") == algorithm:
+            hashes = previous_index.get("hashes") or {}
+        stale = added | modified
+        started_ns = time.time_ns()
+        for path in index["files"]:
+            if path in stale or path not in hashes:
+                full = os.path.join(root, path)
+                try:
+                    mtime_ns = os.stat(full).st_mtime_ns
+                    size, digest = hash_file(full, algorithm)
+                except OSError:
+                    hashes.pop(path, None)
+                    continue
+                # Same entry shape as add_content_hashes(), so --hash walks can reuse it
+                racy = is_racy(mtime_ns, started_ns)
+                hashes[path] = {"size": size, "mtime_ns": None if racy else mtime_ns, "digest": digest}
+        for path in removed:
+            hashes.pop(path, None)
+        index["hash_algorithm"] = algorithm
+        index["hashes"] = {p: hashes[p] for p in index["files"] if p in hashes}
+
+    return index, {"mode": "diff", "added": len(added), "removed": len(removed), "modified": len(modified)}
+
+
+def _make_index(files: list) -> dict:
     files.sort()
     return {
         "generated_at": datetime.utcnow().isoformat(timespec="seconds") + "Z",
@@ -41,16 +213,415 @@ def build_index(root: str) -> dict:
         "files": files,
     }
 
+
+def _join_rel(rel_dir: str, name: str) -> str:
+    return f"{rel_dir}/{name}" if rel_dir else name
+
+
+def _scan_dir(full: str, with_stats: bool = True):
+    """List one directory with os.scandir.
+
+    Returns (subdirs, files) where subdirs are the names to descend into and
+    files maps each file name to [size, mtime_ns, inode] (None if it cannot be
+    stat'ed, e.g. a dangling symlink, or if with_stats is False).
+    Classification matches os.walk: symlinks to directories are neither
+    descended into nor listed as files.
+    """
+    subdirs = []
+    files = {}
+    try:
+        with os.scandir(full) as it:
+            for entry in it:
+                name = entry.name
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                if is_dir:
+                    if name not in IGNORE_DIRS and not entry.is_symlink():
+                        subdirs.append(name)
+                    continue
+                if name in IGNORE_FILES:
+                    continue
+                if not with_stats:
+                    files[name] = None
+                    continue
+                try:
+                    st = entry.stat()
+                    files[name] = [st.st_size, st.st_mtime_ns, st.st_ino]
+                except OSError:
+                    files[name] = None
+    except OSError:
+        pass
+    subdirs.sort()
+    return subdirs, files
+
+
+def walk_parallel(root: str, workers: int = DEFAULT_WORKERS) -> list:
+    """Collect relative file paths, listing sibling subtrees concurrently.
+
+    Each directory is one os.scandir call on a thread pool; finished listings
+    feed their subdirectories back into the pool. Honors IGNORE_DIRS and
+    IGNORE_FILES exactly like build_index(). The result is unsorted.
+    """
+    files = []
+    results = queue.Queue()
+
+    def submit(pool, rel):
+        full = os.path.join(root, rel) if rel else root
+        future = pool.submit(_scan_dir, full, False)
+        future.add_done_callback(lambda fut: results.put((rel, fut)))
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        submit(pool, "")
+        outstanding = 1
+        while outstanding:
+            rel, future = results.get()
+            outstanding -= 1
+            subdirs, names = future.result()
+            files.extend(_join_rel(rel, name) for name in names)
+            for name in subdirs:
+                submit(pool, _join_rel(rel, name))
+                outstanding += 1
+    return files
+
+
+def _walk_with_cache(root: str, cached_dirs: dict, started_ns: int, dirty=None):
+    """Walk the tree, re-listing only directories whose mtime changed.
+
+    If dirty is given (e.g. from filesystem notifications), cached directories
+    outside it are trusted without a stat. Returns (dirs, relisted) where dirs
+    is the new per-directory cache (rel_dir -> {"mtime_ns", "dirs", "files"})
+    and relisted is the set of directories whose listing was refreshed.
+    """
+    dirs = {}
+    relisted = set()
+    stack = [""]
+    while stack:
+        rel = stack.pop()
+        record = cached_dirs.get(rel)
+        if dirty is not None and record is not None and rel not in dirty:
+            dirs[rel] = record
+            stack.extend(_join_rel(rel, name) for name in record["dirs"])
+            continue
+
+        full = os.path.join(root, rel) if rel else root
+        try:
+            mtime_ns = os.stat(full).st_mtime_ns
+        except OSError:
+            continue
+
+        if record is None or record["mtime_ns"] != mtime_ns or dirty is not None:
+            subdirs, files = _scan_dir(full)
+            trusted = None if is_racy(mtime_ns, started_ns) else mtime_ns
+            record = {"mtime_ns": trusted, "dirs": subdirs, "files": files}
+            relisted.add(rel)
+
+        dirs[rel] = record
+        for name in record["dirs"]:
+            stack.append(_join_rel(rel, name))
+    return dirs, relisted
+
+
+def _files_from_dirs(dirs: dict) -> list:
+    files = []
+    for rel, record in dirs.items():
+        files.extend(_join_rel(rel, name) for name in record["files"])
+    return files
+
+
+def _cache_key() -> dict:
+    return {
+        "version": CACHE_VERSION,
+        "ignore_dirs": sorted(IGNORE_DIRS),
+        "ignore_files": sorted(IGNORE_FILES),
+    }
+
+
+def load_cache(root: str):
+    """Load the stat cache, or None if it is missing or no longer matches the index."""
+    cache_path = os.path.join(root, CACHE_REL_PATH)
+    index_path = os.path.join(root, INDEX_REL_PATH)
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if cache.get("key") != _cache_key():
+        return None
+    # The cache only describes the index it was written alongside; if index.json
+    # was regenerated elsewhere (e.g. pulled from CI) the cache is stale.
+    if cache.get("index_fingerprint") != fingerprint(index_path):
+        return None
+    return cache
+
+
+def save_cache(root: str, dirs: dict) -> None:
+    cache = {
+        "key": _cache_key(),
+        "index_fingerprint": fingerprint(os.path.join(root, INDEX_REL_PATH)),
+        "dirs": dirs,
+    }
+    write_json_atomic(os.path.join(root, CACHE_REL_PATH), cache, indent=None)
+
+
+def build_index_incremental(root: str, previous_index=None, cache=None, dirty=None):
+    """Build the index using the stat cache, patching previous_index in place.
+
+    Without a usable previous index/cache this degrades to a full scan that
+    also seeds the cache. dirty optionally restricts which cached directories
+    are re-checked (see _walk_with_cache). Returns (index, dirs, stats); the
+    output is identical to build_index() on the same tree.
+    """
+    started_ns = time.time_ns()
+    if previous_index is None or cache is None:
+        dirs, relisted = _walk_with_cache(root, {}, started_ns)
+        index = _make_index(_files_from_dirs(dirs))
+        return index, dirs, {"relisted": len(relisted), "dirs": len(dirs), "added": index["file_count"], "removed": 0}
+
+    cached_dirs = cache["dirs"]
+    dirs, relisted = _walk_with_cache(root, cached_dirs, started_ns, dirty)
+
+    added = []
+    removed = set()
+    for rel in relisted:
+        old_names = cached_dirs.get(rel, {}).get("files", {})
+        new_names = dirs[rel]["files"]
+        added.extend(_join_rel(rel, n) for n in new_names if n not in old_names)
+        removed.update(_join_rel(rel, n) for n in old_names if n not in new_names)
+    # Directories that vanished (or are no longer reachable) drop all their files.
+    for rel, record in cached_dirs.items():
+        if rel not in dirs:
+            removed.update(_join_rel(rel, n) for n in record["files"])
+
+    files = previous_index["files"]
+    if removed:
+        files = [p for p in files if p not in removed]
+    files.extend(added)
+    index = _make_index(files)
+    return index, dirs, {"relisted": len(relisted), "dirs": len(dirs), "added": len(added), "removed": len(removed)}
+
+
+def hash_file(path: str, algorithm: str = "blake2b"):
+    """Return (size, hex digest) of a file's contents."""
+    h = hashlib.new(algorithm)
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size >= MMAP_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                h.update(m)
+        else:
+            for chunk in iter(lambda: f.read(READ_CHUNK), b""):
+                h.update(chunk)
+    return size, h.hexdigest()
+
+
+def _stats_by_path(dirs: dict) -> dict:
+    stats = {}
+    for rel, record in dirs.items():
+        for name, st in record["files"].items():
+            stats[_join_rel(rel, name)] = st
+    return stats
+
+
+def add_content_hashes(root: str, index: dict, dirs: dict, algorithm: str = "blake2b",
+                       previous_index=None, previous_dirs=None) -> dict:
+    """Attach {"size", "mtime_ns", "digest"} per file to index["hashes"].
+
+    A digest is reused from previous_index when the file's (size, mtime_ns,
+    inode) still equals the stat recorded in previous_dirs (the stat cache the
+    digest was computed against), or, without a stat cache, when its (size,
+    mtime_ns) equals the one recorded next to the digest; only other files are
+    read. dirs is updated with the stats the new digests correspond to.
+    Returns counters.
+    """
+    started_ns = time.time_ns()
+    previous_hashes = {}
+    if previous_index and previous_index.get("hash_algorithm") == algorithm:
+        previous_hashes = previous_index.get("hashes") or {}
+    previous_stats = _stats_by_path(previous_dirs) if previous_dirs else {}
+
+    hashes = {}
+    counters = {"hashed": 0, "reused": 0, "bytes_read": 0}
+    for path in index["files"]:
+        full = os.path.join(root, path)
+        try:
+            st = os.stat(full)
+        except OSError:
+            continue
+        stat_key = [st.st_size, st.st_mtime_ns, st.st_ino]
+        # Don't let the next run trust the digest of a file written just now
+        racy = is_racy(st.st_mtime_ns, started_ns)
+        entry = previous_hashes.get(path)
+        if entry is not None and (
+            previous_stats.get(path) == stat_key
+            or (entry.get("size") == st.st_size and entry.get("mtime_ns") == st.st_mtime_ns)
+        ):
+            hashes[path] = {"size": entry["size"], "mtime_ns": None if racy else st.st_mtime_ns,
+                            "digest": entry["digest"]}
+            counters["reused"] += 1
+        else:
+            try:
+                size, digest = hash_file(full, algorithm)
+            except OSError:
+                continue
+            hashes[path] = {"size": size, "mtime_ns": None if racy else st.st_mtime_ns, "digest": digest}
+            counters["hashed"] += 1
+            counters["bytes_read"] += size
+
+        rel, _, name = path.rpartition("/")
+        if rel in dirs and name in dirs[rel]["files"]:
+            dirs[rel]["files"][name] = None if racy else stat_key
+
+    index["hash_algorithm"] = algorithm
+    index["hashes"] = hashes
+    return counters
+
+
+def load_index(root: str):
+    try:
+        with open(os.path.join(root, INDEX_REL_PATH), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_index(root: str, index: dict) -> str:
+    """Write index.json and its compact, queryable companion (index.bin)."""
+    out_path = os.path.join(root, INDEX_REL_PATH)
+    write_json_atomic(out_path, index, ensure_ascii=True)
+    write_compact_index(root, index["files"])
+    return out_path
+
+
 def main():
-    index = build_index(REPO_ROOT)
-    out_dir = os.path.join(REPO_ROOT, ".createos")
-    os.makedirs(out_dir, exist_ok=True)
-    out_path = os.path.join(out_dir, "index.json")
+    parser = argparse.ArgumentParser(description="Regenerate .createos/index.json.")
+    parser.add_argument(
+        "--source",
+        choices=["walk", "git"],
+        default="walk",
+        help="walk: scan the working tree (default); git: list tracked files from the git index.",
+    )
+    parser.add_argument(
+        "--diff",
+        action="store_true",
+        help="Apply only the paths changed between the index's recorded commit and HEAD "
+        "(one git diff); falls back to --source=git when that history is unavailable.",
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Ignore the stat cache and rebuild the index with a full tree walk.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        help=f"With --full, list directories on N threads (e.g. {DEFAULT_WORKERS}); 0 uses os.walk.",
+    )
+    parser.add_argument(
+        "--hash",
+        nargs="?",
+        const="blake2b",
+        choices=HASH_ALGORITHMS,
+        help="Record per-file size and content digest (default algorithm: blake2b).",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running and patch the index as files change (inotify, or polling as a fallback).",
+    )
+    parser.add_argument("--debounce", type=float, default=0.25, help="With --watch, seconds of quiet before applying a burst.")
+    parser.add_argument("--poll-interval", type=float, default=1.0, help="With --watch, seconds between polls when polling.")
+    parser.add_argument("--poll", action="store_true", help="With --watch, poll even if inotify is available.")
+    tracing.add_arguments(parser)
+    args = parser.parse_args()
+    tracing.start_from_args("refresh_index", args)
+
+    if args.watch:
+        if args.diff or args.hash or args.full or args.source != "walk":
+            parser.error("--watch only supports the default incremental walk mode")
+        from tools.index_watch import watch
+        watch(REPO_ROOT, debounce=args.debounce, poll_interval=args.poll_interval, force_poll=args.poll)
+        return
+
+    if args.diff:
+        try:
+            with tracing.span("index.load"):
+                previous = load_index(REPO_ROOT)
+            with tracing.span("index.diff"):
+                index, stats = build_index_from_diff(REPO_ROOT, previous, args.hash)
+        except (OSError, subprocess.CalledProcessError) as e:
+            print(f"Error: git index update failed: {e}", file=sys.stderr)
+            sys.exit(1)
+        with tracing.span("index.write"):
+            write_index(REPO_ROOT, index)
+        if stats["mode"] == "diff":
+            detail = f"+{stats['added']} -{stats['removed']} ~{stats['modified']} since last indexed commit"
+        else:
+            detail = "full rebuild: no usable base commit"
+        print(f"Wrote {index['file_count']} tracked paths to .createos/index.json ({detail})")
+        return
+
+    if args.source == "git":
+        try:
+            with tracing.span("index.git_ls_files"):
+                index = build_index_from_git(REPO_ROOT)
+        except (OSError, subprocess.CalledProcessError) as e:
+            print(f"Error: git ls-files failed: {e}", file=sys.stderr)
+            sys.exit(1)
+        if args.hash:
+            with tracing.span("index.hash"):
+                add_content_hashes(REPO_ROOT, index, {}, args.hash, load_index(REPO_ROOT))
+        with tracing.span("index.write"):
+            write_index(REPO_ROOT, index)
+        print(f"Wrote {index['file_count']} tracked paths to .createos/index.json")
+        return
+
+    if args.full:
+        with tracing.span("index.walk", workers=args.workers):
+            index = build_index(REPO_ROOT, args.workers)
+        if args.hash:
+            with tracing.span("index.hash"):
+                add_content_hashes(REPO_ROOT, index, {}, args.hash, load_index(REPO_ROOT))
+        with tracing.span("index.write"):
+            write_index(REPO_ROOT, index)
+        try:
+            os.remove(os.path.join(REPO_ROOT, CACHE_REL_PATH))
+        except FileNotFoundError:
+            pass
+        print(f"Wrote {index['file_count']} paths to .createos/index.json")
+        return
 
-    with open(out_path, "w", encoding="utf-8") as f:
-        json.dump(index, f, indent=2)
+    with tracing.span("index.load"):
+        cache = load_cache(REPO_ROOT)
+        previous = load_index(REPO_ROOT) if cache is not None else None
+    previous_hashes = None
+    if args.hash and previous is not None:
+        previous_hashes = {k: previous[k] for k in ("hash_algorithm", "hashes") if k in previous}
+    with tracing.span("index.walk") as span:
+        index, dirs, stats = build_index_incremental(REPO_ROOT, previous, cache)
+        span.set("relisted", stats["relisted"])
+    hash_note = ""
+    if args.hash:
+        with tracing.span("index.hash"):
+            counters = add_content_hashes(
+                REPO_ROOT, index, dirs, args.hash, previous_hashes, cache["dirs"] if cache else None
+            )
+        hash_note = (
+            f", hashed {counters['hashed']} files ({counters['bytes_read']} bytes), "
+            f"reused {counters['reused']} digests"
+        )
+    with tracing.span("index.write"):
+        write_index(REPO_ROOT, index)
+    with tracing.span("index.save_cache"):
+        save_cache(REPO_ROOT, dirs)
 
-    print(f"Wrote {index['file_count']} paths to .createos/index.json")
+    print(
+        f"Wrote {index['file_count']} paths to .createos/index.json "
+        f"(re-listed {stats['relisted']}/{stats['dirs']} dirs, "
+        f"+{stats['added']} -{stats['removed']}{hash_note})"
+    )
 
 if __name__ == "__main__":
     main()
@@ -10,27 +10,32 @@ import json
 import os
 import argparse
 import datetime
-import subprocess
 import sys
 import random
+import time
 import string
 
 REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-PROGRESS_DIR = os.path.join(REPO_ROOT, "creation", "08-progress")
-TASKS_FILE = os.path.join(REPO_ROOT, "creation", "07-tasks", "tasks.json")
-MEMORY_FILE = os.path.join(REPO_ROOT, "creation", "05-memory", "memory.md")
+BOOT_CACHE_VERSION = 2
 
-# Ensure we can import local tools
-if REPO_ROOT not in sys.path:
+# Ensure we can import local tools (script mode only; see tools/__init__.py)
+if not __package__ and REPO_ROOT not in sys.path:
     sys.path.insert(0, REPO_ROOT)
 
-# Try to import memory tools
-try:
-    from tools.add_memory_entry import append_entry as _append_entry_func
-    from tools.add_memory_entry import write_memory_entry as _write_memory_entry_func
-except Exception:
-    _append_entry_func = None
-    _write_memory_entry_func = None
+from tools import config
+from tools import createosd
+from tools import git_refs
+from tools import memory_index
+from tools import progress_catalog
+from tools import task_store
+from tools import tasks as tasks_tool
+from tools import tracing
+from tools.fsutil import fingerprint, is_racy, write_json_atomic
+
+PROGRESS_DIR = config.PROGRESS_DIR
+TASKS_FILE = config.TASKS_FILE
+MEMORY_FILE = config.MEMORY_FILE
+BOOT_CACHE_FILE = os.path.join(config.STATE_DIR, "boot-cache.json")
 
 
 def ensure_dir(path):
@@ -39,42 +44,9 @@ def ensure_dir(path):
 
 
 def get_head_sha(branch="main"):
-    """Get the HEAD SHA for the specified branch."""
+    """Get the HEAD SHA for the specified branch (falling back to HEAD)."""
     try:
-        # Try to get SHA for the specified branch
-        result = subprocess.run(
-            ["git", "rev-parse", f"{branch}"],
-            cwd=REPO_ROOT,
-            capture_output=True,
-            text=True,
-            check=False,
-        )
-        if result.returncode == 0:
-            return result.stdout.strip()
-        
-        # If branch doesn't exist, try refs/heads/<branch>
-        result = subprocess.run(
-            ["git", "rev-parse", f"refs/heads/{branch}"],
-            cwd=REPO_ROOT,
-            capture_output=True,
-            text=True,
-            check=False,
-        )
-        if result.returncode == 0:
-            return result.stdout.strip()
-        
-        # If still no luck, use HEAD if we're on that branch or just use HEAD
-        result = subprocess.run(
-            ["git", "rev-parse", "HEAD"],
-            cwd=REPO_ROOT,
-            capture_output=True,
-            text=True,
-            check=False,
-        )
-        if result.returncode == 0:
-            return result.stdout.strip()
-        
-        return None
+        return git_refs.resolve(branch, REPO_ROOT) or git_refs.head_sha(REPO_ROOT)
     except Exception:
         return None
 
@@ -90,12 +62,9 @@ def generate_session_id():
 
 
 def load_tasks():
-    """Load tasks from tasks.json."""
-    if not os.path.exists(TASKS_FILE):
-        return []
+    """Load tasks from tasks.json (or the event-sourced task store)."""
     try:
-        with open(TASKS_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
+        return tasks_tool.load_tasks(TASKS_FILE)
     except Exception:
         return []
 
@@ -112,48 +81,52 @@ def load_latest_progress():
         except Exception:
             pass
     
-    # Fallback: find most recent progress file
+    # Fallback: newest daily log from the progress catalog
     try:
-        if os.path.exists(PROGRESS_DIR):
-            files = [f for f in os.listdir(PROGRESS_DIR) if f.endswith(".md") and f != "LATEST.json"]
-            if files:
-                files.sort(reverse=True)  # Most recent first
-                latest_file = files[0]
-                # Extract basic info from filename (YYYY-MM-DD.md)
-                date = latest_file.replace(".md", "")
-                return {
-                    "date": date,
-                    "file": f"creation/08-progress/{latest_file}",
-                    "summary": "Previous session progress available",
-                    "next_steps": []
-                }
+        latest = progress_catalog.latest(PROGRESS_DIR)
+        if latest:
+            return {
+                "date": latest["date"],
+                "file": _rel(os.path.join(PROGRESS_DIR, latest["file"])),
+                "summary": latest["summary"] or "Previous session progress available",
+                "next_steps": [],
+                "completed": latest["completed"],
+                "sha": latest["sha"] or "",
+            }
     except Exception:
         pass
     
     return None
 
 
-def get_open_tasks(tasks, max_count=6):
-    """Get a sample of open tasks."""
-    open_tasks = [t for t in tasks if isinstance(t, dict) and t.get("status") != "complete"]
-    return open_tasks[:max_count]
+def get_open_tasks(graph, analysis, max_count=6):
+    """Get a sample of open tasks (the first ones in file order) from the analysis."""
+    return [graph.by_id[tid] for tid in analysis["open"][:max_count]]
+
 
+def analyze_tasks(tasks):
+    """Build the task graph once and return (graph, analysis); see TaskGraph.analyze."""
+    with tracing.span("tasks.analyze", tasks=len(tasks)):
+        graph = tasks_tool.TaskGraph(tasks)
+        return graph, graph.analyze()
 
-def generate_suggested_actions(open_tasks):
-    """Generate suggested next actions from open tasks."""
+
+def generate_suggested_actions(graph, analysis, max_count=3):
+    """Suggest ready tasks, highest downstream impact first."""
     suggestions = []
-    
-    # Take up to 3 open tasks and convert them to action suggestions
-    for i, task in enumerate(open_tasks[:3], 1):
+    critical = set(analysis["critical_path"])
+    for i, task in enumerate(graph.ranked_ready(analysis)[:max_count], 1):
         task_id = task.get("id", "")
         description = task.get("description", "Continue work")
         suggestions.append({
             "id": f"A{i}",
             "action": f"Work on {task_id}: {description}",
-            "task_id": task_id
+            "task_id": task_id,
+            "unblocks_upper_bound": analysis["unblocks_upper_bound"].get(task_id, 0),
+            "on_critical_path": task_id in critical,
         })
-    
-    # Add a generic action if we have fewer than 3 tasks
+
+    # Nothing is ready: fall back to a generic action
     if len(suggestions) == 0:
         suggestions.append({
             "id": "A1",
@@ -166,40 +139,18 @@ def generate_suggested_actions(open_tasks):
 
 def append_session_boot_to_memory(session_id, head_sha):
     """Append a session_boot entry to memory.md."""
-    timestamp = datetime.datetime.now(datetime.timezone.utc).isoformat().replace('+00:00', 'Z')
-    
-    # Try import-based call first
-    if _append_entry_func and _write_memory_entry_func:
-        try:
-            changes = [
-                f"session_id: {session_id}",
-                f"head_sha: {head_sha}"
-            ]
-            entry_text = _append_entry_func(
-                event="session_boot",
-                reasoning=f"Started new Architect session {session_id}",
-                changes=changes
-            )
-            _write_memory_entry_func(entry_text)
-            return True
-        except Exception as e:
-            print(f"Warning: import-based memory append failed: {e}", file=sys.stderr)
-    
-    # Manual fallback: append directly to memory.md
+    from tools.add_memory_entry import append_entry, write_memory_entry
+
     try:
-        entry = f"""
-### [{timestamp}]
-event: session_boot
-reasoning: Started new Architect session {session_id}
-changes:
-  - session_id: {session_id}
-  - head_sha: {head_sha}
-"""
-        with open(MEMORY_FILE, "a", encoding="utf-8") as f:
-            f.write(entry)
+        entry_text = append_entry(
+            event="session_boot",
+            reasoning=f"Started new Architect session {session_id}",
+            changes=[f"session_id: {session_id}", f"head_sha: {head_sha}"],
+        )
+        write_memory_entry(entry_text, MEMORY_FILE)
         return True
     except Exception as e:
-        print(f"Warning: manual memory append failed: {e}", file=sys.stderr)
+        print(f"Warning: memory append failed: {e}", file=sys.stderr)
         return False
 
 
@@ -216,6 +167,7 @@ def ensure_todays_progress_file():
             f.write(f"# Progress Log — {today}\n\n")
             f.write("## Summary of Work Completed\n\n")
             f.write("- Session started\n\n")
+        progress_catalog.record(progress_catalog.make_record(today, filename, "Session started"), PROGRESS_DIR)
     
     return filepath, filename
 
@@ -224,16 +176,14 @@ def update_latest_json(date, filename, sha, summary):
     """Update LATEST.json to point to today's progress file."""
     latest = {
         "date": date,
-        "file": f"creation/08-progress/{filename}",
+        "file": _rel(os.path.join(PROGRESS_DIR, filename)),
         "sha": sha or "",
         "summary": summary,
         "next_steps": [],
         "generated_at": datetime.datetime.now(datetime.timezone.utc).isoformat().replace('+00:00', 'Z'),
     }
     latest_path = os.path.join(PROGRESS_DIR, "LATEST.json")
-    with open(latest_path, "w", encoding="utf-8") as f:
-        json.dump(latest, f, indent=2, ensure_ascii=False)
-        f.write("\n")
+    write_json_atomic(latest_path, latest, trailing_newline=True)
     return latest_path
 
 
@@ -241,13 +191,17 @@ def generate_boot_report(session_id, branch, head_sha, dry_run=True):
     """Generate the JSON boot report."""
     # Load tasks
     tasks = load_tasks()
-    open_tasks = get_open_tasks(tasks)
+    graph, analysis = analyze_tasks(tasks)
+    counts = analysis["counts"]
+    open_tasks = get_open_tasks(graph, analysis)
     
     # Load latest progress
-    latest_progress = load_latest_progress()
+    with tracing.span("progress.latest"):
+        latest_progress = load_latest_progress()
     
     # Generate suggested actions
-    suggested_actions = generate_suggested_actions(open_tasks)
+    with tracing.span("tasks.suggest"):
+        suggested_actions = generate_suggested_actions(graph, analysis)
     
     # Build the report
     report = {
@@ -258,13 +212,16 @@ def generate_boot_report(session_id, branch, head_sha, dry_run=True):
         "dry_run": dry_run,
         "state": {
             "latest_progress": latest_progress,
-            "memory_file": "creation/05-memory/memory.md",
-            "tasks_file": "creation/07-tasks/tasks.json"
+            "memory_file": _rel(MEMORY_FILE),
+            "tasks_file": _rel(TASKS_FILE)
         },
         "tasks": {
-            "total": len(tasks),
-            "open": len([t for t in tasks if isinstance(t, dict) and t.get("status") != "complete"]),
-            "complete": len([t for t in tasks if isinstance(t, dict) and t.get("status") == "complete"]),
+            "total": counts["total"],
+            "open": counts["open"],
+            "complete": counts["complete"],
+            "ready": counts["ready"],
+            "cyclic": counts["cyclic"],
+            "critical_path": analysis["critical_path"],
             "open_sample": [
                 {
                     "id": t.get("id"),
@@ -280,6 +237,193 @@ def generate_boot_report(session_id, branch, head_sha, dry_run=True):
     return report
 
 
+def boot_cache_key(branch, head_sha, dry_run):
+    """Everything a boot report depends on, besides its session_id and timestamp."""
+    state_paths = [
+        TASKS_FILE,
+        task_store.events_path(TASKS_FILE),
+        task_store.snapshot_path(TASKS_FILE),
+        os.path.join(PROGRESS_DIR, "LATEST.json"),
+        MEMORY_FILE,
+        PROGRESS_DIR,
+    ]
+    return {
+        "version": BOOT_CACHE_VERSION,
+        "branch": branch,
+        "head_sha": head_sha,
+        "dry_run": dry_run,
+        "files": {os.path.relpath(p, REPO_ROOT): fingerprint(p) for p in state_paths},
+    }
+
+
+def _is_racy(key, now_ns):
+    return any(fp and is_racy(fp[1], now_ns) for fp in key["files"].values())
+
+
+def load_boot_cache(key):
+    try:
+        with open(BOOT_CACHE_FILE, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if cache.get("key") != key:
+        return None
+    return cache.get("report")
+
+
+def cached_boot_report(session_id, branch, head_sha, dry_run=True, use_cache=True):
+    """generate_boot_report() memoized in .createos/boot-cache.json.
+
+    The cache is keyed by HEAD SHA plus (size, mtime) of the task, progress
+    and memory state. A hit returns the stored report with a fresh session_id
+    and generated_at. Returns (report, "hit" | "miss" | "disabled").
+    """
+    if not use_cache:
+        return generate_boot_report(session_id, branch, head_sha, dry_run), "disabled"
+
+    # Fingerprint before reading, so changes made while we generate show up as a miss next time
+    with tracing.span("boot_cache.lookup"):
+        key = boot_cache_key(branch, head_sha, dry_run)
+        report = load_boot_cache(key)
+    if report is not None:
+        report["session_id"] = session_id
+        report["generated_at"] = datetime.datetime.now(datetime.timezone.utc).isoformat().replace('+00:00', 'Z')
+        return report, "hit"
+
+    report = generate_boot_report(session_id, branch, head_sha, dry_run)
+    if not _is_racy(key, time.time_ns()):
+        try:
+            with tracing.span("boot_cache.write"):
+                write_json_atomic(BOOT_CACHE_FILE, {"key": key, "report": report}, indent=None)
+        except OSError as e:
+            print(f"Warning: could not write boot cache: {e}", file=sys.stderr)
+    return report, "miss"
+
+
+def _rel(path):
+    return os.path.relpath(path, REPO_ROOT).replace(os.sep, "/")
+
+
+def _git(*args):
+    """stdout bytes of a git command run in the repo, or None on failure."""
+    import subprocess
+
+    try:
+        with tracing.span("git." + args[0]):
+            result = subprocess.run(["git", *args], cwd=REPO_ROOT, capture_output=True, check=False)
+    except OSError:
+        return None
+    return result.stdout if result.returncode == 0 else None
+
+
+def find_session_boot(session_id=None, head_sha=None):
+    """Newest session_boot memory entry for session_id (or head_sha).
+
+    Returns {"session_id", "head_sha", "timestamp"} or None. Memory is read
+    newest-first, so recent sessions are found without scanning the log.
+    """
+    from tools.add_memory_entry import iter_entries_reverse
+
+    for entry in iter_entries_reverse(MEMORY_FILE):
+        if entry["event"] != "session_boot":
+            continue
+        fields = dict(c.split(": ", 1) for c in entry["changes"] if ": " in c)
+        if session_id and fields.get("session_id") != session_id:
+            continue
+        if head_sha and fields.get("head_sha") != head_sha:
+            continue
+        return {
+            "session_id": fields.get("session_id"),
+            "head_sha": fields.get("head_sha"),
+            "timestamp": entry["timestamp"],
+        }
+    return None
+
+
+def tasks_at_commit(sha):
+    """Task list as recorded at a commit (tasks.json or the event store)."""
+    log = _git("show", f"{sha}:{_rel(task_store.events_path(TASKS_FILE))}")
+    if log is not None:
+        snapshot = _git("show", f"{sha}:{_rel(task_store.snapshot_path(TASKS_FILE))}")
+        return task_store.tasks_from_bytes(snapshot, log)
+    data = _git("show", f"{sha}:{_rel(TASKS_FILE)}")
+    return json.loads(data) if data else []
+
+
+def diff_tasks(old_tasks, new_tasks):
+    """Added, removed and status-changed tasks between two task lists."""
+    by_id = lambda tasks: {t["id"]: t for t in tasks if isinstance(t, dict) and "id" in t}
+    old, new = by_id(old_tasks), by_id(new_tasks)
+    added = [
+        {"id": tid, "description": t.get("description"), "status": t.get("status")}
+        for tid, t in new.items()
+        if tid not in old
+    ]
+    status_changed = [
+        {"id": tid, "from": old[tid].get("status"), "to": t.get("status")}
+        for tid, t in new.items()
+        if tid in old and old[tid].get("status") != t.get("status")
+    ]
+    removed = [tid for tid in old if tid not in new]
+    return {"status_changed": status_changed, "added": added, "removed": removed}
+
+
+def generate_delta_report(session_id, branch, head_sha, since, dry_run=True):
+    """Boot report restricted to what changed since a previous session.
+
+    since is {"head_sha", "timestamp", "session_id"} (see find_session_boot);
+    without a timestamp the base commit's committer date is used.
+    """
+    from tools.add_memory_entry import query_since
+    from tools.refresh_index import _is_ignored_path, git_diff_paths
+
+    base = since["head_sha"]
+    since_ts = since.get("timestamp")
+    if not since_ts:
+        committed = _git("show", "-s", "--format=%cI", base)
+        since_ts = committed.decode().strip() if committed else None
+
+    threshold = memory_index.parse_timestamp(since_ts) if since_ts else None
+    new_entries = []
+    if threshold is not None:
+        for entry in query_since(since_ts, MEMORY_FILE):
+            # The previous session's own boot entry sits exactly at the threshold
+            if memory_index.parse_timestamp(entry["timestamp"]) > threshold:
+                new_entries.append({k: entry[k] for k in ("timestamp", "event", "reasoning")})
+
+    with tracing.span("git.diff"):
+        changes = git_diff_paths(REPO_ROOT, base)
+    if changes is None:
+        raise ValueError(f"Cannot diff against {base} (unknown commit or shallow history).")
+    added, removed, modified = (set(paths) for paths in changes)
+    untracked = _git("ls-files", "--others", "--exclude-standard", "-z")
+    if untracked:
+        # Same filter git_diff_paths applies, so tool state (.createos/...) stays out
+        added.update(
+            p for p in untracked.decode("utf-8", "surrogateescape").split("\0") if p and not _is_ignored_path(p)
+        )
+    progress_prefix = _rel(PROGRESS_DIR) + "/"
+
+    return {
+        "session_id": session_id,
+        "branch": branch,
+        "head_sha": head_sha or "unknown",
+        "generated_at": datetime.datetime.now(datetime.timezone.utc).isoformat().replace('+00:00', 'Z'),
+        "dry_run": dry_run,
+        "since": {"session_id": since.get("session_id"), "head_sha": base, "timestamp": since_ts},
+        "tasks": diff_tasks(tasks_at_commit(base), load_tasks()),
+        "memory": {"new_entries": len(new_entries), "entries": new_entries},
+        "progress": {
+            "new_files": sorted(p for p in added if p.startswith(progress_prefix) and p.endswith(".md")),
+        },
+        "changed_paths": {
+            "added": sorted(added),
+            "removed": sorted(removed),
+            "modified": sorted(modified),
+        },
+    }
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Generate CreateOS session boot report",
@@ -292,6 +436,12 @@ Examples:
   # Actual session start with memory entry
   python tools/start_session.py --branch main --commit
   
+  # Only what changed since a previous session
+  python tools/start_session.py --since-session ARCH_20251211_093000_ABCD
+
+  # Rebuild the report even if the cached one is still valid
+  python tools/start_session.py --no-cache
+
   # Just show help
   python tools/start_session.py --help
 """
@@ -312,8 +462,26 @@ Examples:
         action="store_true",
         help="Commit mode - write session_boot to memory and create progress files"
     )
+    since_group = parser.add_mutually_exclusive_group()
+    since_group.add_argument(
+        "--since-session",
+        metavar="SESSION_ID",
+        help="Only report changes since that session's recorded head_sha"
+    )
+    since_group.add_argument(
+        "--since-sha",
+        metavar="SHA",
+        help="Only report changes since this commit"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always rebuild the report instead of reusing .createos/boot-cache.json"
+    )
+    tracing.add_arguments(parser)
     
     args = parser.parse_args()
+    tracing.start_from_args("start_session", args)
     
     # If --commit is specified, turn off dry-run
     dry_run = args.dry_run and not args.commit
@@ -322,35 +490,83 @@ Examples:
     session_id = generate_session_id()
     
     # Get HEAD SHA
-    head_sha = get_head_sha(args.branch)
+    with tracing.span("git.head"):
+        head_sha = get_head_sha(args.branch)
     if not head_sha:
         print(f"Error: Could not determine HEAD SHA for branch '{args.branch}'", file=sys.stderr)
         sys.exit(1)
     
+    # A delta report is computed before this session writes its own entries
+    since = None
+    if args.since_session:
+        with tracing.span("delta.find_boot"):
+            since = find_session_boot(session_id=args.since_session)
+        if not since or not since["head_sha"]:
+            print(f"Error: no session_boot entry with a head_sha for session '{args.since_session}'", file=sys.stderr)
+            sys.exit(1)
+    elif args.since_sha:
+        base = git_refs.resolve(args.since_sha, REPO_ROOT)
+        if not base:
+            print(f"Error: unknown commit '{args.since_sha}'", file=sys.stderr)
+            sys.exit(1)
+        with tracing.span("delta.find_boot"):
+            since = find_session_boot(head_sha=base) or {"head_sha": base}
+    delta_report = None
+    if since:
+        try:
+            with tracing.span("delta.report"):
+                delta_report = generate_delta_report(session_id, args.branch, head_sha, since, dry_run)
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+
     # If not dry-run, write memory and progress files
     if not dry_run:
         # Append session_boot to memory
-        memory_success = append_session_boot_to_memory(session_id, head_sha)
+        with tracing.span("memory.append"):
+            memory_success = append_session_boot_to_memory(session_id, head_sha)
         if not memory_success:
             print("Warning: Failed to write session_boot to memory.md", file=sys.stderr)
         
         # Ensure today's progress file exists
-        progress_path, progress_filename = ensure_todays_progress_file()
+        with tracing.span("progress.ensure"):
+            progress_path, progress_filename = ensure_todays_progress_file()
         
         # Update LATEST.json
         today = datetime.date.today().isoformat()
-        latest_path = update_latest_json(
-            today,
-            progress_filename,
-            head_sha,
-            f"Session {session_id} started"
-        )
+        with tracing.span("progress.latest_json"):
+            latest_path = update_latest_json(
+                today,
+                progress_filename,
+                head_sha,
+                f"Session {session_id} started"
+            )
     
     # Generate and output the boot report
-    report = generate_boot_report(session_id, args.branch, head_sha, dry_run)
+    if delta_report is not None:
+        report = delta_report
+    else:
+        with tracing.span("boot_report") as span:
+            try:
+                served = createosd.call(
+                    "session.boot_report",
+                    session_id=session_id,
+                    branch=args.branch,
+                    head_sha=head_sha,
+                    dry_run=dry_run,
+                    use_cache=not args.no_cache,
+                )
+                report, cache_status = served["report"], served["cache"]
+            except createosd.Unavailable:
+                report, cache_status = cached_boot_report(
+                    session_id, args.branch, head_sha, dry_run, use_cache=not args.no_cache
+                )
+            span.set("cache", cache_status)
+        print(f"Boot report cache: {cache_status}", file=sys.stderr)
     
     # Output JSON to stdout
-    print(json.dumps(report, indent=2, ensure_ascii=False))
+    with tracing.span("output"):
+        print(json.dumps(report, indent=2, ensure_ascii=False))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,467 @@
+#!/usr/bin/env python3
+"""
+Tool: task_store.py
+Purpose: Optional event-sourced storage backend for creation/07-tasks (T007)
+Creation: C01 – CreateOS Bootstrap
+
+Instead of rewriting tasks.json on every change, mutations are appended to
+tasks.events.jsonl as one JSON event per line:
+
+  {"seq": 12, "ts": "...", "type": "created", "id": "T012", "task": {...}}
+  {"seq": 13, "ts": "...", "type": "status_changed", "id": "T012", "status": "complete"}
+  {"seq": 14, "ts": "...", "type": "deps_changed", "id": "T012", "dependencies": ["T001"]}
+  {"seq": 15, "ts": "...", "type": "deleted", "id": "T012"}
+
+tasks.snapshot.json materializes the task list as of event `seq`, together
+with the log offset replay resumes from. Current state is the snapshot plus
+the log tail. The snapshot is only rewritten by `compact`, which folds the
+whole log into it, so mutations never rewrite a file that is committed.
+Events are replayed by seq, so a crash between writing a snapshot and
+truncating the log is harmless.
+
+Commits validate against tasks.index.json instead of the snapshot: an
+id -> [status, dependencies] table keyed by the log offset (and seq) it was
+built at, plus the snapshot's stat fingerprint. A commit loads the table,
+applies the log tail written since, checks its operations against it and
+appends; the table file is rewritten (it is a local cache, not committed)
+once INDEX_INTERVAL events have accumulated. Long-lived processes such as
+createosd keep the table in memory between commits. After `compact`, a
+checkout or any mismatch, the table is rebuilt from the snapshot and log.
+
+The backend is active for a tasks.json path when its event log exists
+(`init` creates it); tools/tasks.py load_tasks() then reads from here and
+tasks.json is only refreshed by `export`.
+
+Examples:
+  python tools/task_store.py init
+  python tools/task_store.py status
+  python tools/task_store.py compact
+  python tools/task_store.py export
+"""
+
+import os
+import sys
+import json
+import argparse
+import datetime
+import contextlib
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Script mode only; see tools/__init__.py
+if not __package__ and REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from tools import config
+from tools.fsutil import fingerprint, locked, write_json_atomic
+
+TASKS_FILE = config.TASKS_FILE
+EVENTS_SUFFIX = ".events.jsonl"
+SNAPSHOT_SUFFIX = ".snapshot.json"
+INDEX_SUFFIX = ".index.json"
+SNAPSHOT_VERSION = 1
+INDEX_VERSION = 1
+INDEX_INTERVAL = 500
+
+# Absolute tasks path -> index from the last commit in this process
+_indexes = {}
+
+
+def events_path(tasks_path: str) -> str:
+    return os.path.splitext(tasks_path)[0] + EVENTS_SUFFIX
+
+
+def snapshot_path(tasks_path: str) -> str:
+    return os.path.splitext(tasks_path)[0] + SNAPSHOT_SUFFIX
+
+
+def index_path(tasks_path: str) -> str:
+    return os.path.splitext(tasks_path)[0] + INDEX_SUFFIX
+
+
+def enabled(tasks_path: str) -> bool:
+    """True when tasks_path is backed by an event log rather than tasks.json."""
+    return os.path.exists(events_path(tasks_path))
+
+
+def _load_snapshot(tasks_path: str) -> dict:
+    try:
+        with open(snapshot_path(tasks_path), "r", encoding="utf-8") as f:
+            snapshot = json.load(f)
+    except FileNotFoundError:
+        return {"version": SNAPSHOT_VERSION, "seq": 0, "log_offset": 0, "tasks": []}
+    if snapshot.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported task snapshot version: {snapshot.get('version')}")
+    return snapshot
+
+
+def _write_snapshot(tasks_path: str, tasks, seq: int, log_offset: int) -> None:
+    snapshot = {"version": SNAPSHOT_VERSION, "seq": seq, "log_offset": log_offset, "tasks": list(tasks)}
+    write_json_atomic(snapshot_path(tasks_path), snapshot, indent=None, trailing_newline=True)
+
+
+def _check_event(state: dict, event: dict) -> None:
+    """Raise ValueError unless event fits state (any mapping keyed by task id).
+
+    tasks.py validates every operation before its event is logged, so an
+    unknown event type, a second create of an id or a change to an id that
+    does not exist means the log is corrupt or belongs to another store.
+    """
+    kind = event.get("type")
+    tid = event.get("id")
+    where = f"(seq {event.get('seq')})"
+    if kind not in ("created", "deleted", "status_changed", "deps_changed"):
+        raise ValueError(f"Unknown task event type {kind!r} {where}.")
+    if kind == "created":
+        if tid in state:
+            raise ValueError(f"Task event creates {tid}, which already exists {where}.")
+    elif tid not in state:
+        raise ValueError(f"Task event {kind!r} refers to unknown task {tid} {where}.")
+
+
+def _apply_event(state: dict, event: dict) -> None:
+    """Apply one event to an id -> task state; raises ValueError if it does not fit."""
+    _check_event(state, event)
+    kind = event["type"]
+    tid = event["id"]
+    if kind == "created":
+        state[tid] = event["task"]
+    elif kind == "deleted":
+        del state[tid]
+    elif kind == "status_changed":
+        state[tid]["status"] = event["status"]
+    else:
+        state[tid]["dependencies"] = event["dependencies"]
+
+
+def _read_tail(log, pos: int, seq: int, apply):
+    """Apply the complete log lines from offset pos whose seq is above seq.
+
+    Returns (seq, applied, end, last): the last applied seq, how many events
+    were applied, the offset just past the last complete line, and
+    [start, seq] of that line (None if no line was read).
+    """
+    applied = 0
+    last = None
+    log.seek(pos)
+    for line in log:
+        if not line.endswith(b"\n"):
+            break  # torn final write; the next append overwrites it
+        start = pos
+        pos += len(line)
+        if not line.strip():
+            continue
+        event = json.loads(line)
+        last = [start, event["seq"]]
+        if event["seq"] <= seq:
+            continue
+        apply(event)
+        seq = event["seq"]
+        applied += 1
+    return seq, applied, pos, last
+
+
+def _replay(tasks_path: str, log):
+    """Rebuild state from the snapshot plus the log tail (log opened binary, lock held).
+
+    Returns (state, seq, since_snapshot, end): state is an ordered id -> task
+    dict, seq the last applied event, since_snapshot how many events the tail
+    held and end the offset just past the last complete log line.
+    """
+    snapshot = _load_snapshot(tasks_path)
+    state = {}
+    for t in snapshot["tasks"]:
+        state.setdefault(t["id"], t)
+
+    size = log.seek(0, os.SEEK_END)
+    # A log shorter than the recorded offset was compacted after the snapshot
+    # was taken; seq numbers tell which of its events are still new.
+    pos = snapshot["log_offset"] if snapshot["log_offset"] <= size else 0
+    seq, since_snapshot, end, _ = _read_tail(log, pos, snapshot["seq"], lambda e: _apply_event(state, e))
+    return state, seq, since_snapshot, end
+
+
+# --- commit index -------------------------------------------------------------
+# An index is {"snapshot", "seq", "log_offset", "last", "unsaved", "tasks",
+# "dangling"}: "tasks" maps id -> [status, dependencies], "dangling" is the
+# set of ids some task depends on that do not exist, "last" is [start, seq]
+# of the log line ending at log_offset and "unsaved" counts events applied
+# since the index file was written.
+
+
+def _new_index(tasks_path: str, tasks, seq: int, log_offset: int) -> dict:
+    table = {}
+    for t in tasks:
+        table.setdefault(t["id"], [t.get("status"), list(t.get("dependencies", []))])
+    return {
+        "snapshot": fingerprint(snapshot_path(tasks_path), inode=True),
+        "seq": seq,
+        "log_offset": log_offset,
+        "last": None,
+        "unsaved": 0,
+        "tasks": table,
+        "dangling": {dep for _, deps in table.values() for dep in deps if dep not in table},
+    }
+
+
+def _index_event(index: dict, event: dict) -> None:
+    """Apply one event to an index; raises ValueError if it does not fit."""
+    table = index["tasks"]
+    _check_event(table, event)
+    kind = event["type"]
+    tid = event["id"]
+    if kind == "created":
+        task = event["task"]
+        table[tid] = [task.get("status"), list(task.get("dependencies", []))]
+        index["dangling"].discard(tid)
+    elif kind == "deleted":
+        del table[tid]
+    elif kind == "status_changed":
+        table[tid][0] = event["status"]
+    else:
+        table[tid][1] = list(event["dependencies"])
+
+
+def _advance(index: dict, log, pos: int) -> None:
+    """Apply the log from pos to the index and move it to the end of the log."""
+    seq, applied, end, last = _read_tail(log, pos, index["seq"], lambda e: _index_event(index, e))
+    index["seq"] = seq
+    index["log_offset"] = end
+    index["unsaved"] += applied
+    if last is not None:
+        index["last"] = last
+
+
+def _read_index_file(tasks_path: str):
+    """The saved index, or None if it is missing or unreadable (it is only a cache)."""
+    try:
+        with open(index_path(tasks_path), "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get("version") != INDEX_VERSION:
+        return None
+    try:
+        data["dangling"] = set(data["dangling"])
+    except (KeyError, TypeError):
+        return None
+    data["unsaved"] = 0
+    return data
+
+
+def _write_index(tasks_path: str, index: dict) -> None:
+    data = {k: index[k] for k in ("snapshot", "seq", "log_offset", "last", "tasks")}
+    data["dangling"] = sorted(index["dangling"])
+    write_json_atomic(index_path(tasks_path), {"version": INDEX_VERSION, **data}, indent=None, trailing_newline=True)
+    index["unsaved"] = 0
+
+
+def _index_current(tasks_path: str, index: dict, log, size: int) -> bool:
+    """True if the index still describes a prefix of this log on top of this snapshot."""
+    if index["snapshot"] != fingerprint(snapshot_path(tasks_path), inode=True) or index["log_offset"] > size:
+        return False
+    if index["last"] is None:
+        return True
+    start, seq = index["last"]
+    log.seek(start)
+    try:
+        return json.loads(log.read(index["log_offset"] - start))["seq"] == seq
+    except (ValueError, KeyError, TypeError):
+        return False
+
+
+def _load_index(tasks_path: str, log) -> dict:
+    """The index as of the end of the log (log opened binary, exclusive lock held).
+
+    Reuses the in-process index or the index file when it still matches the
+    log and applies only the events written since; otherwise rebuilds it
+    from the snapshot and the whole log and saves it.
+    """
+    key = os.path.abspath(tasks_path)
+    size = log.seek(0, os.SEEK_END)
+    index = _indexes.pop(key, None) or _read_index_file(tasks_path)
+    if index is not None and _index_current(tasks_path, index, log, size):
+        _advance(index, log, index["log_offset"])
+    else:
+        snapshot = _load_snapshot(tasks_path)
+        index = _new_index(tasks_path, snapshot["tasks"], snapshot["seq"], 0)
+        _advance(index, log, snapshot["log_offset"] if snapshot["log_offset"] <= size else 0)
+        _write_index(tasks_path, index)
+    _indexes[key] = index
+    return index
+
+
+def tasks_from_bytes(snapshot_data, log_data: bytes):
+    """Task list from raw snapshot and log contents (e.g. read from a past commit).
+
+    snapshot_data may be None (no snapshot yet); log events at or below the
+    snapshot's seq are skipped, so the recorded offset is not needed.
+    """
+    snapshot = json.loads(snapshot_data) if snapshot_data else {"seq": 0, "tasks": []}
+    state = {}
+    for t in snapshot["tasks"]:
+        state.setdefault(t["id"], t)
+    for line in log_data.splitlines(keepends=True):
+        if not line.endswith(b"\n") or not line.strip():
+            continue
+        event = json.loads(line)
+        if event["seq"] > snapshot["seq"]:
+            _apply_event(state, event)
+    return list(state.values())
+
+
+def load_tasks(tasks_path: str = TASKS_FILE):
+    """Current task list (legacy tasks.json shape) from snapshot + log tail."""
+    with open(events_path(tasks_path), "rb") as log, locked(log, shared=True):
+        state, _, _, _ = _replay(tasks_path, log)
+    return list(state.values())
+
+
+def operation_events(ops):
+    """Translate tasks.py apply operations into unsequenced store events."""
+    events = []
+    for op in ops:
+        kind = op["op"]
+        if kind == "add":
+            task = {
+                "id": op["id"],
+                "description": op.get("description", ""),
+                "status": "pending",
+                "dependencies": list(op.get("dependencies", [])),
+            }
+            events.append({"type": "created", "id": op["id"], "task": task})
+        elif kind == "update-status":
+            events.append({"type": "status_changed", "id": op["id"], "status": op["status"]})
+        elif kind == "set-dependencies":
+            events.append({"type": "deps_changed", "id": op["id"], "dependencies": list(op.get("dependencies", []))})
+        elif kind == "delete":
+            events.append({"type": "deleted", "id": op["id"]})
+    return events
+
+
+@contextlib.contextmanager
+def transaction(tasks_path: str = TASKS_FILE, fsync: bool = False):
+    """Validate-and-append under the log's exclusive lock.
+
+    Yields (index, events): the commit index, whose "tasks" table
+    (id -> [status, dependencies]) and "dangling" set the caller mutates in
+    place to validate its changes (see tasks.TaskIndex), and an empty list
+    to fill with the matching events. On normal exit the events are appended
+    as one write. If the block raises, nothing is written and the in-process
+    index is dropped.
+    """
+    key = os.path.abspath(tasks_path)
+    with open(events_path(tasks_path), "r+b") as log, locked(log):
+        index = _load_index(tasks_path, log)
+        try:
+            events = []
+            yield index, events
+            if not events:
+                return
+
+            ts = datetime.datetime.utcnow().isoformat() + "Z"
+            lines = []
+            seq = index["seq"]
+            for event in events:
+                seq += 1
+                lines.append(json.dumps({"seq": seq, "ts": ts, **event}, ensure_ascii=False).encode("utf-8") + b"\n")
+            data = b"".join(lines)
+            end = index["log_offset"]
+            log.seek(end)
+            log.truncate()
+            log.write(data)
+            log.flush()
+            if fsync:
+                os.fsync(log.fileno())
+            index["seq"] = seq
+            index["log_offset"] = end + len(data)
+            index["last"] = [index["log_offset"] - len(lines[-1]), seq]
+            index["unsaved"] += len(events)
+            if index["unsaved"] >= INDEX_INTERVAL:
+                _write_index(tasks_path, index)
+        except BaseException:
+            _indexes.pop(key, None)
+            raise
+
+
+def init(tasks_path: str = TASKS_FILE) -> int:
+    """Start an event log for tasks_path, seeding the snapshot from tasks.json."""
+    if enabled(tasks_path):
+        raise ValueError(f"Event log already exists: {events_path(tasks_path)}")
+    with open(tasks_path, "r", encoding="utf-8") as f:
+        tasks = json.load(f)
+    state = {}
+    for t in tasks:
+        state.setdefault(t["id"], t)
+    _write_snapshot(tasks_path, state.values(), 0, 0)
+    with open(events_path(tasks_path), "xb"):
+        pass
+    return len(state)
+
+
+def compact(tasks_path: str = TASKS_FILE):
+    """Fold the whole log into a fresh snapshot and empty the log.
+
+    Returns (events_folded, tasks).
+    """
+    with open(events_path(tasks_path), "r+b") as log, locked(log):
+        state, seq, since_snapshot, _ = _replay(tasks_path, log)
+        _write_snapshot(tasks_path, state.values(), seq, 0)
+        log.truncate(0)
+        index = _new_index(tasks_path, state.values(), seq, 0)
+        _write_index(tasks_path, index)
+        _indexes[os.path.abspath(tasks_path)] = index
+    return since_snapshot, len(state)
+
+
+def export(tasks_path: str = TASKS_FILE, out_path: str = None) -> int:
+    """Write current state in the legacy tasks.json format."""
+    tasks = load_tasks(tasks_path)
+    write_json_atomic(out_path or tasks_path, tasks, trailing_newline=True)
+    return len(tasks)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the event-sourced task store.")
+    parser.add_argument("--tasks-file", default=TASKS_FILE, help="Path to tasks.json.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("init", help="Create the event log, seeding the snapshot from tasks.json.")
+    subparsers.add_parser("status", help="Show snapshot and log sizes.")
+    subparsers.add_parser("compact", help="Fold the event log into the snapshot and empty the log.")
+    export_parser = subparsers.add_parser("export", help="Write current state as legacy tasks.json.")
+    export_parser.add_argument("--output", help="Destination (default: the tasks.json path).")
+
+    args = parser.parse_args()
+
+    try:
+        if args.command == "init":
+            count = init(args.tasks_file)
+            print(f"Initialized task event log with {count} tasks: {events_path(args.tasks_file)}")
+            return
+        if not enabled(args.tasks_file):
+            raise ValueError(f"No event log at {events_path(args.tasks_file)} (run `init` first).")
+        if args.command == "status":
+            with open(events_path(args.tasks_file), "rb") as log, locked(log, shared=True):
+                state, seq, since_snapshot, end = _replay(args.tasks_file, log)
+            status = {
+                "tasks": len(state),
+                "seq": seq,
+                "events_since_snapshot": since_snapshot,
+                "log_bytes": end,
+                "snapshot_seq": seq - since_snapshot,
+            }
+            print(json.dumps(status, indent=2))
+        elif args.command == "compact":
+            folded, count = compact(args.tasks_file)
+            print(f"Compacted {folded} events into a snapshot of {count} tasks.")
+        elif args.command == "export":
+            count = export(args.tasks_file, args.output)
+            print(f"Exported {count} tasks to {args.output or args.tasks_file}")
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
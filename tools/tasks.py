@@ -3,26 +3,479 @@
 Tool: tasks.py
 Purpose: Manage the task graph in creation/07-tasks/tasks.json
 Creation: C01 – CreateOS Bootstrap
+
+When creation/07-tasks/tasks.events.jsonl exists, tasks are read from and
+written to the event-sourced store in task_store.py instead of tasks.json.
+CLI commands are served by createosd.py when it is running.
 """
 
 import os
+import sys
 import json
 import argparse
-from typing import List, Dict
+from collections import deque
+from typing import List, Dict, Optional
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+# Script mode only; see tools/__init__.py
+if not __package__ and REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from tools import config
+
+TASKS_FILE_PATH = config.TASKS_FILE
+VALID_STATUSES = {"pending", "in_progress", "complete"}
+# Placeholder left in TaskGraph.tasks by remove(compact=False)
+_REMOVED = None
+
+
+def load_tasks(path: str = TASKS_FILE_PATH) -> List[Dict]:
+    from tools import task_store, tracing
+
+    with tracing.span("tasks.load"):
+        if task_store.enabled(path):
+            return task_store.load_tasks(path)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Tasks file not found at: {path}")
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+
+def save_tasks(tasks: List[Dict], path: str = TASKS_FILE_PATH) -> None:
+    """Write the task list atomically (temp file + rename)."""
+    from tools.fsutil import write_json_atomic
+
+    write_json_atomic(path, tasks, trailing_newline=True)
+
+
+def _cycle_through(task_id: str, dependencies: List[str], dependencies_of) -> Optional[List[str]]:
+    """The cycle [task_id, ..., task_id] closed by task_id depending on dependencies, or None.
+
+    dependencies_of(tid) returns a task's dependencies, or None for an
+    unknown id. Searches only what those dependencies (transitively) depend on.
+    """
+    parent: Dict[str, str] = {}
+    stack = []
+    for dep in dependencies:
+        if dependencies_of(dep) is not None and dep not in parent:
+            parent[dep] = task_id
+            stack.append(dep)
+    while stack:
+        tid = stack.pop()
+        if tid == task_id:
+            path = [task_id]
+            tid = parent[task_id]
+            while tid != task_id:
+                path.append(tid)
+                tid = parent[tid]
+            path.append(task_id)
+            path.reverse()
+            return path
+        for dep in dependencies_of(tid):
+            if dependencies_of(dep) is not None and dep not in parent:
+                parent[dep] = tid
+                stack.append(dep)
+    return None
+
+
+class TaskGraph:
+    """Indexed view over a task list, built once per load.
+
+    Keeps id -> task and id -> dependents maps, plus the ready set (pending
+    tasks whose dependencies are all complete), which set_status() and add()
+    maintain incrementally. The underlying list (and its order) is shared
+    with the caller, so save_tasks(graph.tasks) persists mutations. Batched
+    removals (remove(compact=False)) leave placeholders in the list until
+    compact() drops them all in one pass.
+    """
+
+    def __init__(self, tasks: List[Dict]):
+        self.tasks = tasks
+        self.by_id: Dict[str, Dict] = {}
+        self.position: Dict[str, int] = {}
+        self.dependents: Dict[str, List[str]] = {}
+        self.duplicates: List[str] = []
+        self._unmet: Dict[str, int] = {}
+        self._ready = set()
+        self._removed = 0
+
+        for i, t in enumerate(tasks):
+            if not isinstance(t, dict) or "id" not in t:
+                continue
+            if t["id"] in self.by_id:
+                self.duplicates.append(t["id"])
+                continue
+            self.by_id[t["id"]] = t
+            self.position[t["id"]] = i
+        for tid, t in self.by_id.items():
+            for dep in t.get("dependencies", []):
+                self.dependents.setdefault(dep, []).append(tid)
+        for tid in self.by_id:
+            self._refresh(tid)
+
+    @classmethod
+    def load(cls, path: str = TASKS_FILE_PATH) -> "TaskGraph":
+        return cls(load_tasks(path))
+
+    def _is_complete(self, tid: str) -> bool:
+        t = self.by_id.get(tid)
+        return t is not None and t.get("status") == "complete"
+
+    def _refresh(self, tid: str) -> None:
+        t = self.by_id[tid]
+        self._unmet[tid] = sum(1 for dep in t.get("dependencies", []) if not self._is_complete(dep))
+        self._update_ready(tid)
+
+    def _update_ready(self, tid: str) -> None:
+        if self.by_id[tid].get("status") == "pending" and self._unmet[tid] == 0:
+            self._ready.add(tid)
+        else:
+            self._ready.discard(tid)
+
+    def get(self, task_id: str) -> Dict:
+        try:
+            return self.by_id[task_id]
+        except KeyError:
+            raise ValueError(f"Task with id {task_id} not found.") from None
+
+    def ready(self) -> List[Dict]:
+        """Ready tasks in file order."""
+        return [self.by_id[tid] for tid in sorted(self._ready, key=self.position.__getitem__)]
+
+    def set_status(self, task_id: str, status: str) -> None:
+        if status not in VALID_STATUSES:
+            raise ValueError(f"Invalid status '{status}'. Must be one of {VALID_STATUSES}.")
+        t = self.get(task_id)
+        was_complete = t.get("status") == "complete"
+        t["status"] = status
+        now_complete = status == "complete"
+        if was_complete != now_complete:
+            delta = -1 if now_complete else 1
+            for dependent in self.dependents.get(task_id, []):
+                self._unmet[dependent] += delta
+                self._update_ready(dependent)
+        self._update_ready(task_id)
+
+    def add(self, task_id: str, description: str, dependencies: List[str]) -> Dict:
+        if task_id in self.by_id:
+            raise ValueError(f"Task with id {task_id} already exists.")
+        missing = [d for d in dependencies if d not in self.by_id]
+        if missing:
+            raise ValueError(f"Task {task_id} depends on unknown task(s): {', '.join(missing)}.")
+        new_task = {
+            "id": task_id,
+            "description": description,
+            "status": "pending",
+            "dependencies": dependencies,
+        }
+        self.tasks.append(new_task)
+        self.by_id[task_id] = new_task
+        self.position[task_id] = len(self.tasks) - 1
+        for dep in dependencies:
+            self.dependents.setdefault(dep, []).append(task_id)
+        self._refresh(task_id)
+        # Existing tasks may already list this id as a (previously missing)
+        # dependency; they now have one more unmet dependency to track.
+        for dependent in self.dependents.get(task_id, []):
+            self._refresh(dependent)
+        if task_id in self.dependents:
+            cycle = _cycle_through(task_id, dependencies, self._dependencies_of)
+            if cycle:
+                self.remove(task_id)
+                raise ValueError(f"Adding {task_id} would create a dependency cycle: {' -> '.join(cycle)}.")
+        return new_task
+
+    def set_dependencies(self, task_id: str, dependencies: List[str]) -> None:
+        t = self.get(task_id)
+        missing = [d for d in dependencies if d not in self.by_id]
+        if missing:
+            raise ValueError(f"Task {task_id} depends on unknown task(s): {', '.join(missing)}.")
+        previous = t.get("dependencies", [])
+        self._relink(task_id, previous, dependencies)
+        # Only the new edges out of task_id can close a cycle
+        cycle = _cycle_through(task_id, [d for d in dependencies if d not in previous], self._dependencies_of)
+        if cycle:
+            self._relink(task_id, dependencies, previous)
+            raise ValueError(f"New dependencies for {task_id} would create a cycle: {' -> '.join(cycle)}.")
+
+    def _dependencies_of(self, tid: str) -> Optional[List[str]]:
+        t = self.by_id.get(tid)
+        return t.get("dependencies", []) if t is not None else None
+
+    def _relink(self, task_id: str, old: List[str], new: List[str]) -> None:
+        for dep in old:
+            siblings = self.dependents.get(dep, [])
+            if task_id in siblings:
+                siblings.remove(task_id)
+        for dep in new:
+            self.dependents.setdefault(dep, []).append(task_id)
+        self.by_id[task_id]["dependencies"] = list(new)
+        self._refresh(task_id)
+
+    def blockers(self, task_id: str) -> List[str]:
+        """Existing tasks that depend on task_id."""
+        return [d for d in self.dependents.get(task_id, []) if d in self.by_id]
+
+    def remove(self, task_id: str, compact: bool = True) -> Dict:
+        """Remove a task; tasks that depend on it keep a dangling reference.
+
+        With compact=False the task's slot in self.tasks is only marked, so
+        a batch of removals costs one compact() instead of one list shift each.
+        """
+        t = self.get(task_id)
+        self.tasks[self.position.pop(task_id)] = _REMOVED
+        self._removed += 1
+        del self.by_id[task_id]
+        del self._unmet[task_id]
+        self._ready.discard(task_id)
+        for dep in t.get("dependencies", []):
+            siblings = self.dependents.get(dep, [])
+            if task_id in siblings:
+                siblings.remove(task_id)
+        for dependent in self.dependents.get(task_id, []):
+            if dependent in self.by_id:
+                self._refresh(dependent)
+        if compact:
+            self.compact()
+        return t
+
+    def compact(self) -> None:
+        """Drop the slots of removed tasks from self.tasks and renumber positions."""
+        if not self._removed:
+            return
+        self.tasks[:] = [t for t in self.tasks if t is not _REMOVED]
+        self._removed = 0
+        for i, t in enumerate(self.tasks):
+            if isinstance(t, dict) and self.by_id.get(t.get("id")) is t:
+                self.position[t["id"]] = i
+
+    def missing_dependencies(self) -> List[tuple]:
+        """(task_id, dependency) pairs whose dependency does not exist."""
+        return [
+            (tid, dep)
+            for tid, t in self.by_id.items()
+            for dep in t.get("dependencies", [])
+            if dep not in self.by_id
+        ]
+
+    def find_cycle(self) -> Optional[List[str]]:
+        """Return one dependency cycle as [a, b, ..., a], or None (iterative DFS)."""
+        state = {}  # tid -> 1 visiting, 2 done
+        for root in self.by_id:
+            if root in state:
+                continue
+            stack = [(root, iter(self.by_id[root].get("dependencies", [])))]
+            path = [root]
+            state[root] = 1
+            while stack:
+                tid, deps = stack[-1]
+                advanced = False
+                for dep in deps:
+                    if dep not in self.by_id:
+                        continue
+                    if state.get(dep) == 1:
+                        return path[path.index(dep):] + [dep]
+                    if dep not in state:
+                        state[dep] = 1
+                        stack.append((dep, iter(self.by_id[dep].get("dependencies", []))))
+                        path.append(dep)
+                        advanced = True
+                        break
+                if not advanced:
+                    state[tid] = 2
+                    stack.pop()
+                    path.pop()
+        return None
+
+    def topological_order(self) -> List[str]:
+        """Task ids with every task after its dependencies (Kahn's algorithm).
+
+        Ties keep file order; missing dependencies are ignored. Raises
+        ValueError if the graph has a cycle.
+        """
+        indegree = {
+            tid: sum(1 for dep in t.get("dependencies", []) if dep in self.by_id)
+            for tid, t in self.by_id.items()
+        }
+        queue = deque(tid for tid in self.by_id if indegree[tid] == 0)
+        order = []
+        while queue:
+            tid = queue.popleft()
+            order.append(tid)
+            for dependent in self.dependents.get(tid, []):
+                indegree[dependent] -= 1
+                if indegree[dependent] == 0:
+                    queue.append(dependent)
+        if len(order) != len(self.by_id):
+            cycle = self.find_cycle()
+            raise ValueError(f"Dependency cycle: {' -> '.join(cycle or [])}")
+        return order
+
+    def analyze(self) -> Dict:
+        """Counts, depth, unblock counts and critical path over the open tasks.
+
+        Linear in tasks + edges: one counting pass, one Kahn pass over open
+        tasks (complete dependencies are already satisfied and ignored) and
+        one reverse pass. For each open task:
+          depth    - longest chain of open dependencies below it
+          height   - longest chain of open dependents above it
+          unblocks_upper_bound - open tasks it transitively gates, summed
+                     along dependency paths: exact for trees, an over-count
+                     (capped at the open-task count) where chains re-join
+        "open" lists the open task ids in file order. The critical path is
+        the longest chain of open tasks. Tasks caught in a dependency cycle
+        get no metrics and are counted as "cyclic".
+        """
+        counts = {"total": len(self.by_id), "open": 0, "complete": 0, "pending": 0, "in_progress": 0}
+        open_ids = []
+        for tid, t in self.by_id.items():
+            status = t.get("status")
+            if status in counts:
+                counts[status] += 1
+            if status != "complete":
+                counts["open"] += 1
+                open_ids.append(tid)
+        counts["ready"] = len(self._ready)
+
+        is_open = set(open_ids)
+        indegree = {
+            tid: sum(1 for dep in self.by_id[tid].get("dependencies", []) if dep in is_open) for tid in open_ids
+        }
+        depth = {tid: 0 for tid in open_ids if indegree[tid] == 0}
+        parent: Dict[str, str] = {}
+        queue = deque(depth)
+        order = []
+        while queue:
+            tid = queue.popleft()
+            order.append(tid)
+            for dependent in self.dependents.get(tid, []):
+                if dependent not in is_open:
+                    continue
+                if depth[tid] + 1 > depth.get(dependent, -1):
+                    depth[dependent] = depth[tid] + 1
+                    parent[dependent] = tid
+                indegree[dependent] -= 1
+                if indegree[dependent] == 0:
+                    queue.append(dependent)
+        counts["cyclic"] = len(open_ids) - len(order)
+
+        height: Dict[str, int] = {}
+        unblocks: Dict[str, int] = {}
+        cap = max(len(order) - 1, 0)
+        for tid in reversed(order):
+            h = u = 0
+            for dependent in self.dependents.get(tid, []):
+                if dependent in height:
+                    h = max(h, height[dependent] + 1)
+                    u += 1 + unblocks[dependent]
+            height[tid] = h
+            unblocks[tid] = min(u, cap)
 
-TASKS_FILE_PATH = "creation/07-tasks/tasks.json"
+        critical_path = []
+        if order:
+            tid = max(order, key=depth.__getitem__)
+            while tid is not None:
+                critical_path.append(tid)
+                tid = parent.get(tid)
+            critical_path.reverse()
 
+        return {
+            "counts": counts,
+            "open": open_ids,
+            "depth": {tid: depth[tid] for tid in order},
+            "height": height,
+            "unblocks_upper_bound": unblocks,
+            "critical_path": critical_path,
+        }
 
-def load_tasks() -> List[Dict]:
-    if not os.path.exists(TASKS_FILE_PATH):
-        raise FileNotFoundError(f"Tasks file not found at: {TASKS_FILE_PATH}")
-    with open(TASKS_FILE_PATH, "r", encoding="utf-8") as f:
-        return json.load(f)
+    def ranked_ready(self, analysis: Optional[Dict] = None) -> List[Dict]:
+        """Ready tasks by downstream impact: longest open chain above, then unblock bound, then file order."""
+        analysis = analysis or self.analyze()
+        height = analysis["height"]
+        unblocks = analysis["unblocks_upper_bound"]
+        return sorted(
+            self.ready(),
+            key=lambda t: (-height.get(t["id"], 0), -unblocks.get(t["id"], 0), self.position[t["id"]]),
+        )
 
+    def validate(self) -> List[str]:
+        """Human-readable problems: duplicate ids, unknown dependencies, cycles."""
+        problems = [f"Duplicate task id {tid}." for tid in self.duplicates]
+        problems += [f"Task {tid} depends on unknown task {dep}." for tid, dep in self.missing_dependencies()]
+        cycle = self.find_cycle()
+        if cycle:
+            problems.append(f"Dependency cycle: {' -> '.join(cycle)}.")
+        return problems
 
-def save_tasks(tasks: List[Dict]) -> None:
-    with open(TASKS_FILE_PATH, "w", encoding="utf-8") as f:
-        json.dump(tasks, f, indent=2, ensure_ascii=False)
+
+class TaskIndex:
+    """Commit-time checks over the event store's id -> [status, dependencies] table.
+
+    Implements the part of TaskGraph that apply_operations() uses, with the
+    same errors, but without descriptions, dependents or the ready set, so
+    nothing is built per commit. Status changes and adds look up only the
+    ids involved; a dependency change walks what its new dependencies depend
+    on; delete scans the table for tasks that depend on the deleted one.
+    `dangling` holds ids that tasks depend on but that do not exist: only
+    adding one of those can close a cycle.
+    """
+
+    def __init__(self, table: Dict[str, List], dangling: set):
+        self.table = table
+        self.dangling = dangling
+
+    def _get(self, task_id: str) -> List:
+        try:
+            return self.table[task_id]
+        except KeyError:
+            raise ValueError(f"Task with id {task_id} not found.") from None
+
+    def _check_known(self, task_id: str, dependencies: List[str]) -> None:
+        missing = [d for d in dependencies if d not in self.table]
+        if missing:
+            raise ValueError(f"Task {task_id} depends on unknown task(s): {', '.join(missing)}.")
+
+    def _dependencies_of(self, tid: str) -> Optional[List[str]]:
+        entry = self.table.get(tid)
+        return entry[1] if entry is not None else None
+
+    def set_status(self, task_id: str, status: str) -> None:
+        if status not in VALID_STATUSES:
+            raise ValueError(f"Invalid status '{status}'. Must be one of {VALID_STATUSES}.")
+        self._get(task_id)[0] = status
+
+    def add(self, task_id: str, description: str, dependencies: List[str]) -> None:
+        if task_id in self.table:
+            raise ValueError(f"Task with id {task_id} already exists.")
+        self._check_known(task_id, dependencies)
+        self.table[task_id] = ["pending", list(dependencies)]
+        if task_id in self.dangling:
+            cycle = _cycle_through(task_id, dependencies, self._dependencies_of)
+            if cycle:
+                del self.table[task_id]
+                raise ValueError(f"Adding {task_id} would create a dependency cycle: {' -> '.join(cycle)}.")
+            self.dangling.discard(task_id)
+
+    def set_dependencies(self, task_id: str, dependencies: List[str]) -> None:
+        entry = self._get(task_id)
+        self._check_known(task_id, dependencies)
+        previous = entry[1]
+        entry[1] = list(dependencies)
+        cycle = _cycle_through(task_id, [d for d in dependencies if d not in previous], self._dependencies_of)
+        if cycle:
+            entry[1] = previous
+            raise ValueError(f"New dependencies for {task_id} would create a cycle: {' -> '.join(cycle)}.")
+
+    def blockers(self, task_id: str) -> List[str]:
+        """Existing tasks that depend on task_id."""
+        return [tid for tid, (_, deps) in self.table.items() if task_id in deps]
+
+    def remove(self, task_id: str, compact: bool = True) -> None:
+        self._get(task_id)
+        del self.table[task_id]
+
+    def compact(self) -> None:
+        pass
 
 
 def list_tasks(tasks: List[Dict]) -> None:
@@ -32,35 +485,133 @@ def list_tasks(tasks: List[Dict]) -> None:
 
 
 def add_task(tasks: List[Dict], task_id: str, description: str, dependencies: List[str]) -> List[Dict]:
-    existing_ids = {t["id"] for t in tasks}
-    if task_id in existing_ids:
-        raise ValueError(f"Task with id {task_id} already exists.")
-
-    new_task = {
-        "id": task_id,
-        "description": description,
-        "status": "pending",
-        "dependencies": dependencies,
-    }
-    tasks.append(new_task)
+    TaskGraph(tasks).add(task_id, description, dependencies)
     return tasks
 
 
 def update_status(tasks: List[Dict], task_id: str, status: str) -> List[Dict]:
-    valid_statuses = {"pending", "in_progress", "complete"}
-    if status not in valid_statuses:
-        raise ValueError(f"Invalid status '{status}'. Must be one of {valid_statuses}.")
-
-    for t in tasks:
-        if t["id"] == task_id:
-            t["status"] = status
-            break
-    else:
-        raise ValueError(f"Task with id {task_id} not found.")
+    TaskGraph(tasks).set_status(task_id, status)
     return tasks
 
 
+def read_operations(stream) -> List[Dict]:
+    """Parse JSON Lines operations, one object per line."""
+    ops = []
+    for lineno, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            op = json.loads(line)
+        except ValueError as e:
+            raise ValueError(f"Line {lineno}: invalid JSON ({e}).") from None
+        if not isinstance(op, dict):
+            raise ValueError(f"Line {lineno}: expected a JSON object.")
+        ops.append(op)
+    return ops
+
+
+def apply_operations(graph, ops: List[Dict]) -> Dict[str, int]:
+    """Apply add / update-status / delete operations in order to a TaskGraph or TaskIndex.
+
+    Operations look like:
+      {"op": "add", "id": "T012", "description": "...", "dependencies": ["T001"]}
+      {"op": "update-status", "id": "T012", "status": "complete"}
+      {"op": "set-dependencies", "id": "T012", "dependencies": ["T001", "T004"]}
+      {"op": "delete", "id": "T012"}
+    Each one is validated against the graph as it stands after the previous
+    ones; deleting a task that remaining tasks depend on is rejected. Deleted
+    tasks are dropped from graph.tasks in one pass at the end. Raises
+    ValueError naming the failing operation, in which case the caller should
+    discard the graph rather than save it. Returns per-op counts.
+    """
+    counts = {"add": 0, "update-status": 0, "set-dependencies": 0, "delete": 0}
+    for i, op in enumerate(ops, 1):
+        kind = op.get("op")
+        try:
+            if "id" not in op:
+                raise ValueError("missing 'id'.")
+            if kind == "add":
+                graph.add(op["id"], op.get("description", ""), list(op.get("dependencies", [])))
+            elif kind == "update-status":
+                graph.set_status(op["id"], op.get("status"))
+            elif kind == "set-dependencies":
+                graph.set_dependencies(op["id"], list(op.get("dependencies", [])))
+            elif kind == "delete":
+                blockers = graph.blockers(op["id"])
+                if blockers:
+                    raise ValueError(f"Task {op['id']} is a dependency of {', '.join(blockers)}.")
+                graph.remove(op["id"], compact=False)
+            else:
+                raise ValueError(f"unknown op {kind!r} (expected add, update-status, set-dependencies or delete).")
+        except ValueError as e:
+            raise ValueError(f"Operation {i} ({kind}): {e}") from None
+        counts[kind] += 1
+    graph.compact()
+    return counts
+
+
+def query(graph: TaskGraph, command: str):
+    """Read-only CLI queries as JSON-ready data (shared with createosd).
+
+    list/ready/order return task lists; validate returns {"problems", "count"}.
+    """
+    if command == "list":
+        return graph.tasks
+    if command == "ready":
+        return graph.ranked_ready()
+    if command == "order":
+        return [graph.by_id[tid] for tid in graph.topological_order()]
+    if command == "validate":
+        return {"problems": graph.validate(), "count": len(graph.by_id)}
+    raise ValueError(f"unknown query {command!r}")
+
+
+def _run_query(command: str, path: str = TASKS_FILE_PATH):
+    from tools import createosd, tracing
+
+    try:
+        return createosd.call("tasks.query", path=os.path.abspath(path), command=command)
+    except createosd.Unavailable:
+        graph = TaskGraph.load(path)
+    with tracing.span("tasks.query", command=command):
+        return query(graph, command)
+
+
+def _run_commit(ops: List[Dict], path: str = TASKS_FILE_PATH) -> Dict[str, int]:
+    from tools import createosd
+
+    try:
+        return createosd.call("tasks.commit", path=os.path.abspath(path), ops=ops)
+    except createosd.Unavailable:
+        return commit_operations(ops, path)
+
+
+def commit_operations(ops: List[Dict], path: str = TASKS_FILE_PATH, fsync: bool = False) -> Dict[str, int]:
+    """Load, apply and persist operations as one unit; returns per-op counts.
+
+    With the event store enabled the operations are checked against the
+    store's commit index (TaskIndex) and appended as one event each under
+    the log lock; otherwise tasks.json is loaded and rewritten once. Nothing
+    is written if any operation fails.
+    """
+    from tools import task_store, tracing
+    from tools.fsutil import write_json_atomic
+
+    with tracing.span("tasks.commit", ops=len(ops)):
+        if task_store.enabled(path):
+            with task_store.transaction(path, fsync=fsync) as (index, events):
+                counts = apply_operations(TaskIndex(index["tasks"], index["dangling"]), ops)
+                events.extend(task_store.operation_events(ops))
+            return counts
+        graph = TaskGraph.load(path)
+        counts = apply_operations(graph, ops)
+        write_json_atomic(path, graph.tasks, trailing_newline=True, fsync=fsync)
+        return counts
+
+
 def main():
+    from tools import tracing
+
     parser = argparse.ArgumentParser(description="Manage the Creation task graph.")
     subparsers = parser.add_subparsers(dest="command", required=True)
 
@@ -88,19 +639,68 @@ def main():
         help="New status for the task.",
     )
 
+    # apply
+    apply_parser = subparsers.add_parser(
+        "apply", help="Apply a JSONL stream of add/update-status/set-dependencies/delete operations in one pass."
+    )
+    apply_parser.add_argument("file", nargs="?", default="-", help="JSONL file of operations (default: stdin).")
+
+    # ready / order / validate
+    subparsers.add_parser("ready", help="List pending tasks whose dependencies are all complete, by impact.")
+    subparsers.add_parser("order", help="List tasks in dependency (topological) order.")
+    subparsers.add_parser("validate", help="Check for duplicate ids, unknown dependencies and cycles.")
+    for subparser in subparsers.choices.values():
+        tracing.add_arguments(subparser)
+
     args = parser.parse_args()
-    tasks = load_tasks()
-
-    if args.command == "list":
-        list_tasks(tasks)
-    elif args.command == "add":
-        tasks = add_task(tasks, args.id, args.description, args.dependencies)
-        save_tasks(tasks)
-        print(f"Task {args.id} added.")
-    elif args.command == "update-status":
-        tasks = update_status(tasks, args.id, args.status)
-        save_tasks(tasks)
-        print(f"Task {args.id} status updated to {args.status}.")
+    tracing.start_from_args("tasks", args)
+
+    if args.command in ("add", "update-status"):
+        if args.command == "add":
+            op = {"op": "add", "id": args.id, "description": args.description, "dependencies": args.dependencies}
+        else:
+            op = {"op": "update-status", "id": args.id, "status": args.status}
+        try:
+            _run_commit([op])
+        except (OSError, ValueError) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(2)
+        if args.command == "add":
+            print(f"Task {args.id} added.")
+        else:
+            print(f"Task {args.id} status updated to {args.status}.")
+        return
+    if args.command == "apply":
+        try:
+            if args.file == "-":
+                ops = read_operations(sys.stdin)
+            else:
+                with open(args.file, "r", encoding="utf-8") as f:
+                    ops = read_operations(f)
+            counts = _run_commit(ops)
+        except (OSError, ValueError) as e:
+            print(f"Error: {e} No changes written.", file=sys.stderr)
+            sys.exit(1)
+        print(
+            f"Applied {len(ops)} operations "
+            f"({counts['add']} added, {counts['update-status']} status updates, "
+            f"{counts['set-dependencies']} dependency updates, {counts['delete']} deleted)."
+        )
+        return
+
+    try:
+        result = _run_query(args.command)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    if args.command == "validate":
+        for problem in result["problems"]:
+            print(problem)
+        if result["problems"]:
+            sys.exit(1)
+        print(f"{result['count']} tasks OK.")
+    else:
+        list_tasks(result)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Tool: tracing.py
+Purpose: Opt-in phase tracing (Chrome trace JSON) and cProfile hooks for the session tools
+Creation: C01 – CreateOS Bootstrap
+
+Tools wrap their phases in `with tracing.span("name"):`. Tracing is off unless
+the tool runs with --trace[=PATH] or CREATEOS_TRACE is set ("1" for the
+default path, otherwise the output path); while off, span() returns a shared
+no-op object, so the cost is one function call and a flag check.
+
+When on, every span becomes a complete ("X") event in Chrome trace format,
+loadable in chrome://tracing or https://ui.perfetto.dev. An audit hook
+attributes files opened, bytes of files opened for reading (their size) and
+subprocesses spawned to the innermost open span; writers add bytes_written
+with tracing.add(). Counts are the span's own, excluding child spans. The
+trace is written when the process exits, by default to
+.createos/traces/<tool>-<timestamp>-<pid>.json. Requests answered by
+createosd show up as a single daemon.<op> span.
+
+--profile PATH (or CREATEOS_PROFILE=PATH) additionally dumps cProfile stats
+for the whole run (read them with `python -m pstats PATH`).
+
+Examples:
+  python tools/start_session.py --trace
+  CREATEOS_TRACE=/tmp/close.json python tools/close_session.py --summary "..."
+  python tools/refresh_index.py --trace /tmp/index.json --profile /tmp/index.prof
+  python tools/tracing.py summary /tmp/close.json
+"""
+
+import os
+import sys
+import time
+
+TRACE_ENV = "CREATEOS_TRACE"
+PROFILE_ENV = "CREATEOS_PROFILE"
+COUNTERS = ("files_opened", "bytes_read", "bytes_written", "subprocesses")
+
+_active = False
+_events = []
+_local = None
+_tool = None
+_output = None
+_profiler = None
+_profile_output = None
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def add(self, key, n=1):
+        pass
+
+    def set(self, key, value):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    __slots__ = ("name", "args", "start_ns")
+
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        _stack().append(self)
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end_ns = time.perf_counter_ns()
+        stack = _stack()
+        if stack and stack[-1] is self:
+            stack.pop()
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        _events.append({
+            "name": self.name,
+            "cat": _tool,
+            "ph": "X",
+            "ts": self.start_ns / 1000,
+            "dur": (end_ns - self.start_ns) / 1000,
+            "pid": os.getpid(),
+            "tid": _local.tid,
+            "args": self.args,
+        })
+        return False
+
+    def add(self, key, n=1):
+        self.args[key] = self.args.get(key, 0) + n
+
+    def set(self, key, value):
+        self.args[key] = value
+
+
+def _stack():
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        import threading
+
+        stack = _local.stack = []
+        _local.tid = threading.get_native_id()
+    return stack
+
+
+def enabled():
+    return _active
+
+
+def span(name, **args):
+    """Context manager timing one phase; extra keyword args land in the event."""
+    if not _active:
+        return _NULL_SPAN
+    return Span(name, args)
+
+
+def add(key, n=1):
+    """Add n to a counter on the innermost open span (no-op when tracing is off)."""
+    if _active:
+        stack = _stack()
+        if stack:
+            stack[-1].add(key, n)
+
+
+def _audit(event, args):
+    if not _active:
+        return
+    if event == "open":
+        path, mode, flags = args
+        if not isinstance(path, (str, bytes)):
+            return
+        add("files_opened")
+        if not (flags or 0) & (os.O_WRONLY | os.O_RDWR | os.O_CREAT | os.O_APPEND):
+            try:
+                add("bytes_read", os.stat(path).st_size)
+            except OSError:
+                pass
+    elif event == "subprocess.Popen":
+        add("subprocesses")
+
+
+def default_output(tool):
+    from tools import config
+
+    stamp = time.strftime("%Y%m%dT%H%M%S")
+    return os.path.join(config.STATE_DIR, "traces", f"{tool}-{stamp}-{os.getpid()}.json")
+
+
+def start(tool, output=None, profile=None):
+    """Turn tracing on for this process (idempotent) and open the root span.
+
+    output=None reads CREATEOS_TRACE; "" or "1" means the default path.
+    profile=None reads CREATEOS_PROFILE. Nothing happens when neither is set.
+    """
+    global _active, _local, _tool, _output, _profiler, _profile_output
+    if _active or _profiler is not None:
+        return
+    if output is None:
+        output = os.environ.get(TRACE_ENV)
+    if profile is None:
+        profile = os.environ.get(PROFILE_ENV) or None
+    if output is None and not profile:
+        return
+
+    import atexit
+    import threading
+
+    _tool = tool
+    if output is not None:
+        _output = default_output(tool) if output in ("", "1") else output
+        _local = threading.local()
+        _active = True
+        sys.addaudithook(_audit)
+        root = Span(tool, {"argv": sys.argv[1:]})
+        root.__enter__()
+        atexit.register(_finish, root)
+    if profile:
+        import cProfile
+
+        _profile_output = profile
+        _profiler = cProfile.Profile()
+        _profiler.enable()
+        atexit.register(_finish_profile)
+
+
+def add_arguments(parser):
+    """--trace / --profile options shared by the traced tools."""
+    parser.add_argument(
+        "--trace",
+        nargs="?",
+        const="",
+        metavar="PATH",
+        help=f"Write a Chrome trace JSON of this run (default: .createos/traces/; or set {TRACE_ENV}).",
+    )
+    parser.add_argument("--profile", metavar="PATH", help=f"Dump cProfile stats to PATH (or set {PROFILE_ENV}).")
+
+
+def start_from_args(tool, args):
+    start(tool, getattr(args, "trace", None), getattr(args, "profile", None))
+
+
+def _finish_profile():
+    _profiler.disable()
+    os.makedirs(os.path.dirname(os.path.abspath(_profile_output)), exist_ok=True)
+    _profiler.dump_stats(_profile_output)
+    print(f"Profile written to {_profile_output}", file=sys.stderr)
+
+
+def trace_document(events, tool):
+    return {
+        "traceEvents": sorted(events, key=lambda e: (e["tid"], e["ts"])),
+        "displayTimeUnit": "ms",
+        "otherData": {"tool": tool, "argv": sys.argv, "python": sys.version.split()[0]},
+    }
+
+
+def _finish(root):
+    global _active
+    root.__exit__(None, None, None)
+    _active = False
+    import json
+
+    os.makedirs(os.path.dirname(os.path.abspath(_output)), exist_ok=True)
+    with open(_output, "w", encoding="utf-8") as f:
+        json.dump(trace_document(_events, _tool), f, indent=1)
+        f.write("\n")
+    print(f"Trace written to {_output}", file=sys.stderr)
+
+
+def summarize(document):
+    """Per span name: calls, total ms and summed counters, slowest first."""
+    totals = {}
+    for event in document.get("traceEvents", []):
+        if event.get("ph") != "X":
+            continue
+        row = totals.setdefault(event["name"], {"calls": 0, "ms": 0.0, **{c: 0 for c in COUNTERS}})
+        row["calls"] += 1
+        row["ms"] += event["dur"] / 1000
+        for counter in COUNTERS:
+            row[counter] += event.get("args", {}).get(counter, 0)
+    return sorted(totals.items(), key=lambda item: -item[1]["ms"])
+
+
+def main():
+    import json
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Summarize a trace written by --trace.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    summary_parser = subparsers.add_parser("summary", help="Per-phase totals of a trace file.")
+    summary_parser.add_argument("file")
+    args = parser.parse_args()
+
+    with open(args.file, "r", encoding="utf-8") as f:
+        document = json.load(f)
+    print(f"{'span':32s} {'calls':>5s} {'ms':>10s} {'opened':>7s} {'read B':>10s} {'written B':>10s} {'procs':>5s}")
+    for name, row in summarize(document):
+        print(
+            f"{name[:32]:32s} {row['calls']:5d} {row['ms']:10.2f} {row['files_opened']:7d} "
+            f"{row['bytes_read']:10d} {row['bytes_written']:10d} {row['subprocesses']:5d}"
+        )
+
+
+if __name__ == "__main__":
+    main()